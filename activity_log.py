@@ -0,0 +1,181 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Append-only per-league log of processed roster activity, plus a high-water-mark cursor.
+# Each run pages through league.recent_activity() only until it reaches the newest activity
+# already logged, so nothing is re-downloaded and busy weeks past one page aren't lost.
+# Records are appended oldest first, which keeps "everything since X" a tail read. Ingests
+# of one league hold an flock on its .lock file, so jobs sharing a log (roster and summary in
+# the daemon, or separate processes) each pick up from the cursor the other left.
+ACTIVITY_DIR = os.environ.get("ACTIVITY_DIR", ".cache/activity").strip()
+ACTIVITY_PAGE_SIZE = int(os.environ.get("ACTIVITY_PAGE_SIZE", "50"))
+ACTIVITY_MAX_PAGES = int(os.environ.get("ACTIVITY_MAX_PAGES", "40"))
+
+
+def activity_ms(date) -> Optional[int]:
+    # espn_api gives epoch milliseconds; accept ISO strings too
+    if isinstance(date, (int, float)):
+        return int(date)
+    try:
+        from dateutil import parser
+        return int(parser.isoparse(str(date)).timestamp() * 1000)
+    except (ValueError, OverflowError):
+        return None
+
+
+def activity_records(activity) -> List[Dict]:
+    date = activity_ms(activity.date)
+    if date is None:
+        return []
+    out = []
+    for team, action, player, bid_amount in activity.actions:
+        out.append({
+            "date": date,
+            "team_id": getattr(team, "team_id", None),
+            "team": getattr(team, "team_name", ""),
+            "action": action,
+            "player_id": getattr(player, "playerId", player if isinstance(player, int) else None),
+            "player": getattr(player, "name", str(player)),
+            "position": getattr(player, "position", ""),
+            "bid": bid_amount or 0,
+        })
+    return out
+
+
+def _record_key(record: Dict) -> str:
+    return f"{record['date']}|{record['team_id']}|{record['action']}|{record['player_id']}"
+
+
+class ActivityLog:
+    def __init__(self, league_id, season, root: str = ACTIVITY_DIR):
+        base = os.path.join(root, f"{league_id}_{season}")
+        self.path = base + ".jsonl"
+        self.cursor_path = base + ".cursor.json"
+        self.lock_path = base + ".lock"
+        self.cursor = self._load_cursor()
+
+    @contextmanager
+    def _locked(self):
+        import fcntl
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load_cursor(self) -> Dict:
+        try:
+            with open(self.cursor_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"date": None, "keys": []}
+
+    def _save_cursor(self) -> None:
+        tmp = f"{self.cursor_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.cursor, f)
+        os.replace(tmp, self.cursor_path)
+
+    def _seen(self, record: Dict) -> bool:
+        mark = self.cursor.get("date")
+        if mark is None:
+            return False
+        return record["date"] < mark or (record["date"] == mark and _record_key(record) in self.cursor["keys"])
+
+    def ingest(self, league, page_size: int = ACTIVITY_PAGE_SIZE, max_pages: int = ACTIVITY_MAX_PAGES) -> List[Dict]:
+        """Fetch activity newer than the cursor, append it to the log and return it (oldest first)."""
+        with self._locked():
+            # Another job may have ingested since this log was opened
+            self.cursor = self._load_cursor()
+            return self._ingest(league, page_size, max_pages)
+
+    def _ingest(self, league, page_size: int, max_pages: int) -> List[Dict]:
+        new: List[Dict] = []
+        for page in range(max_pages):
+            activities = league.recent_activity(size=page_size, offset=page * page_size)
+            reached_cursor = False
+            for activity in activities:
+                records = activity_records(activity)
+                if records and self._seen(records[0]):
+                    reached_cursor = True
+                    break
+                new.extend(records)
+            if reached_cursor or len(activities) < page_size:
+                break
+        if not new:
+            return []
+
+        new.sort(key=lambda r: r["date"])
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in new:
+                f.write(json.dumps(record) + "\n")
+        newest = new[-1]["date"]
+        keys = [_record_key(r) for r in new if r["date"] == newest]
+        if self.cursor.get("date") == newest:
+            keys = self.cursor["keys"] + keys
+        self.cursor = {"date": newest, "keys": keys}
+        self._save_cursor()
+        return new
+
+    def _reverse_lines(self, block: int = 65536) -> Iterator[str]:
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return
+        with f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            tail = b""
+            while pos > 0:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + tail).split(b"\n")
+                tail = lines[0]
+                for line in reversed(lines[1:]):
+                    if line.strip():
+                        yield line.decode("utf-8")
+            if tail.strip():
+                yield tail.decode("utf-8")
+
+    def since(self, since_ms: int) -> List[Dict]:
+        """Logged records at or after since_ms, oldest first; reads only the tail of the log."""
+        out = []
+        for line in self._reverse_lines():
+            record = json.loads(line)
+            if record["date"] < since_ms:
+                break
+            out.append(record)
+        out.reverse()
+        return out
+
+    def read_from(self, offset: int = 0) -> Tuple[List[Dict], int]:
+        """Records appended after byte offset, and the offset to resume from next time."""
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return [], offset
+        with f:
+            f.seek(offset)
+            data = f.read()
+        # Only whole lines; a record still being appended is picked up next time
+        end = data.rfind(b"\n") + 1
+        records = [json.loads(line) for line in data[:end].split(b"\n") if line.strip()]
+        return records, offset + end
+
+    def all(self) -> List[Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except OSError:
+            return []
+
+
+def log_for(league, root: Optional[str] = None) -> ActivityLog:
+    return ActivityLog(league.league_id, league.year, root or ACTIVITY_DIR)
@@ -0,0 +1,112 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# All-play engine for weekly_summary: every team's weekly score is compared against every
+# other team's score that week. Scores live in a (week x team) matrix with NaN for weeks a
+# team did not play; any leading axes (seasons, leagues) are treated as extra weeks.
+
+
+def completed_weeks(league) -> List[int]:
+    # Regular-season matchup periods that are already final
+    last = league.currentMatchupPeriod - 1
+    reg_season = getattr(league.settings, "reg_season_count", 0) or last
+    return list(range(1, min(last, reg_season) + 1))
+
+
+def week_scores(league, week: int) -> Dict[int, Tuple[float, int, float]]:
+    """team_id -> (score, opponent team_id, opponent score) for one week's regular-season matchups."""
+    out: Dict[int, Tuple[float, int, float]] = {}
+    for matchup in league.scoreboard(week):
+        if matchup.is_playoff:
+            continue
+        home = getattr(matchup, "home_team", None)
+        away = getattr(matchup, "away_team", None)
+        if home is None or away is None:
+            # Bye week: no opponent to compare against
+            continue
+        out[home.team_id] = (float(matchup.home_score), away.team_id, float(matchup.away_score))
+        out[away.team_id] = (float(matchup.away_score), home.team_id, float(matchup.home_score))
+    return out
+
+
+def score_matrix(team_ids: Sequence[int], weekly: List[Dict[int, Tuple[float, int, float]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build week x team matrices from week_scores output: scores, opponent scores and
+    opponent column index (-1 where the team did not play).
+    """
+    col = {tid: j for j, tid in enumerate(team_ids)}
+    scores = np.full((len(weekly), len(team_ids)), np.nan)
+    opp = np.full_like(scores, np.nan)
+    opp_idx = np.full(scores.shape, -1, dtype=np.int64)
+    for w, week in enumerate(weekly):
+        for tid, (score, opp_id, opp_score) in week.items():
+            j = col.get(tid)
+            if j is not None:
+                scores[w, j] = score
+                opp[w, j] = opp_score
+                opp_idx[w, j] = col.get(opp_id, -1)
+    return scores, opp, opp_idx
+
+
+def all_play(scores) -> np.ndarray:
+    """
+    Per-week all-play win rate: (teams outscored + 0.5 * teams tied) / (teams playing - 1).
+    One lexsort over every (week, score) pair; NaN where the team did not play.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    n_teams = scores.shape[-1]
+    flat = scores.reshape(-1, n_teams)
+    played = ~np.isnan(flat)
+    g_idx, t_idx = np.nonzero(played)
+    vals = flat[played]
+    order = np.lexsort((vals, g_idx))
+    v_s, g_s, t_s = vals[order], g_idx[order], t_idx[order]
+
+    n = len(v_s)
+    pos = np.arange(n)
+    week_start = np.ones(n, dtype=bool)
+    week_start[1:] = g_s[1:] != g_s[:-1]
+    new_group = week_start.copy()
+    new_group[1:] |= v_s[1:] != v_s[:-1]
+    first_in_week = np.maximum.accumulate(np.where(week_start, pos, 0))
+    first_in_group = np.maximum.accumulate(np.where(new_group, pos, 0))
+    group_id = np.cumsum(new_group) - 1
+    ties = np.bincount(group_id, minlength=1)[group_id] - 1
+    lower = first_in_group - first_in_week
+    opponents = np.bincount(g_s, minlength=flat.shape[0])[g_s] - 1
+
+    rate = np.divide(lower + 0.5 * ties, opponents, out=np.zeros(n), where=opponents > 0)
+    out = np.full(flat.shape, np.nan)
+    out[g_s, t_s] = rate
+    return out.reshape(scores.shape)
+
+
+def luck_and_sos(scores, opp, opp_idx, wins) -> Dict[str, np.ndarray]:
+    """
+    Season arrays per team: pf, pa, expected wins (sum of weekly all-play rates),
+    luck (actual wins - expected wins) and strength of schedule (mean season all-play
+    rate of the opponents actually faced, so 0.5 is an average schedule).
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    opp = np.asarray(opp, dtype=np.float64)
+    opp_idx = np.asarray(opp_idx, dtype=np.int64)
+    rates = all_play(scores)
+    expected = np.nansum(rates, axis=-2)
+    games = np.sum(~np.isnan(rates), axis=-2)
+    strength = np.divide(expected, games, out=np.zeros_like(expected), where=games > 0)
+
+    # Look up each week's opponent strength; weeks without an opponent don't count
+    faced = np.take_along_axis(
+        np.broadcast_to(strength[..., None, :], scores.shape), np.maximum(opp_idx, 0), axis=-1)
+    faced = np.where(opp_idx >= 0, faced, 0.0)
+    n_faced = np.sum(opp_idx >= 0, axis=-2)
+    sos = np.divide(faced.sum(axis=-2), n_faced, out=np.zeros_like(expected), where=n_faced > 0)
+
+    return {
+        "pf": np.nansum(scores, axis=-2),
+        "pa": np.nansum(opp, axis=-2),
+        "expected_wins": expected,
+        "luck": np.asarray(wins, dtype=np.float64) - expected,
+        "sos": sos,
+    }
@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from main import fetch_league_json, LEAGUE_ID, SEASON, SWID, ESPN_S2
+from rate_limit import request_priority, PRIORITY_BACKFILL, PRIORITY_CURRENT
+
+# Multi-season league history archive. Each league gets a directory of column files
+# (<table>.<column>.npy) that are memory-mapped on load, so cross-season reports never
+# touch ESPN:
+#   teams:  season, team_id, name_idx, wins, losses, ties, pf, pa
+#   weekly: season, week, team_id, score, opp_id, opp_score, playoff
+# Team names live in names.json and are referenced by name_idx.
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", ".cache/archive").strip()
+BACKFILL_CONCURRENCY = int(os.environ.get("BACKFILL_CONCURRENCY", "6"))
+HISTORY_VIEWS = ("mTeam", "mStandings", "mMatchupScore")
+
+TEAM_COLUMNS = {
+    "season": np.int16, "team_id": np.int16, "name_idx": np.int32, "wins": np.int16,
+    "losses": np.int16, "ties": np.int16, "pf": np.float64, "pa": np.float64,
+}
+WEEKLY_COLUMNS = {
+    "season": np.int16, "week": np.int16, "team_id": np.int16, "score": np.float64,
+    "opp_id": np.int16, "opp_score": np.float64, "playoff": np.bool_,
+}
+
+
+def season_columns(data: dict, season: int) -> Dict[str, Dict[str, list]]:
+    teams: Dict[str, list] = {c: [] for c in TEAM_COLUMNS}
+    teams["name"] = []
+    for t in data.get("teams", []):
+        rec = (t.get("record") or {}).get("overall", {})
+        teams["season"].append(season)
+        teams["team_id"].append(int(t.get("id") or 0))
+        teams["name"].append(f"{t.get('location','')} {t.get('nickname','')}".strip() or t.get("name", ""))
+        teams["wins"].append(int(rec.get("wins") or 0))
+        teams["losses"].append(int(rec.get("losses") or 0))
+        teams["ties"].append(int(rec.get("ties") or 0))
+        teams["pf"].append(float(rec.get("pointsFor") or 0.0))
+        teams["pa"].append(float(rec.get("pointsAgainst") or 0.0))
+
+    weekly: Dict[str, list] = {c: [] for c in WEEKLY_COLUMNS}
+    for m in data.get("schedule", []):
+        if m.get("winner", "UNDECIDED") == "UNDECIDED" or "away" not in m or "home" not in m:
+            continue
+        playoff = m.get("playoffTierType", "NONE") != "NONE"
+        for side, other in (("home", "away"), ("away", "home")):
+            weekly["season"].append(season)
+            weekly["week"].append(int(m.get("matchupPeriodId") or 0))
+            weekly["team_id"].append(int(m[side].get("teamId") or 0))
+            weekly["score"].append(float(m[side].get("totalPoints") or 0.0))
+            weekly["opp_id"].append(int(m[other].get("teamId") or 0))
+            weekly["opp_score"].append(float(m[other].get("totalPoints") or 0.0))
+            weekly["playoff"].append(playoff)
+    return {"teams": teams, "weekly": weekly}
+
+
+def load_archive(league_id, root: str = ARCHIVE_DIR, mmap: bool = True) -> Optional[Dict]:
+    path = os.path.join(root, str(league_id))
+    if not os.path.isdir(path):
+        return None
+    mode = "r" if mmap else None
+    out: Dict = {"teams": {}, "weekly": {}}
+    with open(os.path.join(path, "names.json"), "r", encoding="utf-8") as f:
+        out["names"] = json.load(f)
+    for table, columns in (("teams", TEAM_COLUMNS), ("weekly", WEEKLY_COLUMNS)):
+        for col in columns:
+            out[table][col] = np.load(os.path.join(path, f"{table}.{col}.npy"), mmap_mode=mode)
+    return out
+
+
+def write_archive(league_id, seasons: List[Dict[str, Dict[str, list]]], root: str = ARCHIVE_DIR) -> None:
+    """Merge freshly fetched seasons into the archive, replacing any seasons already stored."""
+    existing = load_archive(league_id, root, mmap=False)
+    replaced = {s["teams"]["season"][0] for s in seasons if s["teams"]["season"]}
+    names: List[str] = []
+    name_idx: Dict[str, int] = {}
+    cols: Dict[str, Dict[str, list]] = {
+        "teams": {c: [] for c in TEAM_COLUMNS}, "weekly": {c: [] for c in WEEKLY_COLUMNS}}
+
+    def intern(name: str) -> int:
+        if name not in name_idx:
+            name_idx[name] = len(names)
+            names.append(name)
+        return name_idx[name]
+
+    if existing:
+        keep_t = ~np.isin(existing["teams"]["season"], list(replaced))
+        keep_w = ~np.isin(existing["weekly"]["season"], list(replaced))
+        for col in TEAM_COLUMNS:
+            if col == "name_idx":
+                cols["teams"][col].extend(intern(existing["names"][i]) for i in existing["teams"][col][keep_t])
+            else:
+                cols["teams"][col].extend(existing["teams"][col][keep_t].tolist())
+        for col in WEEKLY_COLUMNS:
+            cols["weekly"][col].extend(existing["weekly"][col][keep_w].tolist())
+    for s in seasons:
+        for col in TEAM_COLUMNS:
+            if col == "name_idx":
+                cols["teams"][col].extend(intern(n) for n in s["teams"]["name"])
+            else:
+                cols["teams"][col].extend(s["teams"][col])
+        for col in WEEKLY_COLUMNS:
+            cols["weekly"][col].extend(s["weekly"][col])
+
+    # Write to a sibling directory and swap it in so readers never see a half-written archive
+    path = os.path.join(root, str(league_id))
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    order_t = np.lexsort((cols["teams"]["team_id"], cols["teams"]["season"]))
+    order_w = np.lexsort((cols["weekly"]["team_id"], cols["weekly"]["week"], cols["weekly"]["season"]))
+    for table, columns, order in (("teams", TEAM_COLUMNS, order_t), ("weekly", WEEKLY_COLUMNS, order_w)):
+        for col, dtype in columns.items():
+            np.save(os.path.join(tmp, f"{table}.{col}.npy"), np.asarray(cols[table][col], dtype=dtype)[order])
+    with open(os.path.join(tmp, "names.json"), "w", encoding="utf-8") as f:
+        json.dump(names, f)
+    old = f"{path}.old"
+    if os.path.isdir(path):
+        # A crash between the swaps (or a concurrent writer) can leave the old copy behind;
+        # os.replace can't overwrite a non-empty directory
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def backfill(league_id: str, swid: str, espn_s2: str, seasons: Optional[Sequence[int]] = None,
+             current_season: Optional[str] = None, concurrency: int = BACKFILL_CONCURRENCY,
+             root: str = ARCHIVE_DIR) -> List[int]:
+    """
+    Fetch every season (default: all of the league's previous seasons plus the current one)
+    concurrently and write them to the archive. Returns the seasons written.
+    """
+    current = str(current_season or SEASON)
+    if seasons is None:
+        data = fetch_league_json(league_id, current, swid, espn_s2, views=HISTORY_VIEWS)
+        seasons = sorted(set(data.get("status", {}).get("previousSeasons", [])) | {int(current)})
+
+    def fetch(season: int) -> Dict[str, Dict[str, list]]:
+        # Past seasons queue behind current-week fetches on the shared rate limiter
+        priority = PRIORITY_CURRENT if str(season) == current else PRIORITY_BACKFILL
+        with request_priority(priority):
+            data = fetch_league_json(league_id, str(season), swid, espn_s2, views=HISTORY_VIEWS)
+        return season_columns(data, int(season))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        fetched = list(pool.map(fetch, seasons))
+    write_archive(league_id, fetched, root)
+    return list(seasons)
+
+
+def history_table(arch: Dict) -> List[Dict]:
+    """
+    Per-franchise career line: seasons played, record, PF/PA, average luck (PF/PA rank
+    minus standings rank, as in main.py) and all-play expected wins over regular seasons.
+    """
+    from ranking import rank_table
+    from allplay import all_play
+    teams, weekly, names = arch["teams"], arch["weekly"], arch["names"]
+    season = np.asarray(teams["season"])
+    team_id = np.asarray(teams["team_id"])
+    ranks = rank_table([names[i] for i in teams["name_idx"]], teams["wins"], teams["pf"], teams["pa"],
+                       league=season)
+
+    # Regular-season all-play: scatter weekly scores into (season-week) x team
+    reg = ~np.asarray(weekly["playoff"])
+    w_season, w_week = np.asarray(weekly["season"])[reg], np.asarray(weekly["week"])[reg]
+    w_team, w_score = np.asarray(weekly["team_id"])[reg], np.asarray(weekly["score"])[reg]
+    ids = np.unique(team_id)
+    col = np.searchsorted(ids, w_team)
+    slots, row = np.unique(np.stack([w_season, w_week]), axis=1, return_inverse=True) \
+        if len(w_season) else (np.zeros((2, 0)), np.zeros(0, dtype=np.int64))
+    matrix = np.full((slots.shape[1], len(ids)), np.nan)
+    matrix[row.reshape(-1), col] = w_score
+    expected = np.nansum(all_play(matrix), axis=0) if len(matrix) else np.zeros(len(ids))
+
+    latest_name = {}
+    for tid, ni in zip(team_id.tolist(), np.asarray(teams["name_idx"]).tolist()):
+        latest_name[tid] = names[ni]
+    out = []
+    for j, tid in enumerate(ids.tolist()):
+        mask = team_id == tid
+        out.append({
+            "team_id": tid,
+            "name": latest_name[tid],
+            "seasons": int(mask.sum()),
+            "wins": int(np.asarray(teams["wins"])[mask].sum()),
+            "losses": int(np.asarray(teams["losses"])[mask].sum()),
+            "pf": float(np.asarray(teams["pf"])[mask].sum()),
+            "pa": float(np.asarray(teams["pa"])[mask].sum()),
+            "avgLuck": float(ranks["luck"][mask].mean()),
+            "expectedWins": float(expected[j]),
+        })
+    out.sort(key=lambda r: (-r["avgLuck"], r["name"]))
+    return out
+
+
+def build_history_markdown(rows: List[Dict]) -> str:
+    header = "| Team Name | Seasons | Record | PF | PA | Avg Luck | All-Play Wins |\n|---|---|---|---|---|---|---|"
+    lines = []
+    for r in rows:
+        luck_str = f"+{r['avgLuck']:.2f}" if r['avgLuck'] >= 0 else f"{r['avgLuck']:.2f}"
+        lines.append(f"| {r['name']} | {r['seasons']} | {r['wins']}-{r['losses']} | {r['pf']:.1f} | "
+                     f"{r['pa']:.1f} | {luck_str} | {r['expectedWins']:.1f} |")
+    return header + "\n" + "\n".join(lines)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+    if command == "backfill":
+        seasons = backfill(LEAGUE_ID, SWID, ESPN_S2)
+        print(f"Archived seasons {', '.join(str(s) for s in seasons)} for league {LEAGUE_ID}.")
+    elif command == "report":
+        arch = load_archive(LEAGUE_ID)
+        if arch is None:
+            raise RuntimeError(f"No archive for league {LEAGUE_ID}; run `python archive.py backfill` first.")
+        print(build_history_markdown(history_table(arch)))
+    else:
+        raise RuntimeError("Usage: python archive.py [backfill|report]")
+
+
+if __name__ == "__main__":
+    main()
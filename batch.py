@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional
+
+from main import (fetch_league_json, extract_table, rank_table, build_markdown, build_luck_report, table_digest,
+                  report_fields, send_report, smtp_outbox, SWID, ESPN_S2, SUBJECT, SENDGRID_API_KEY)
+from personalize import deliver, load_managers, render_template
+from run_journal import default_journal
+
+# Batch luck rankings for many leagues. Specs come from a JSON file (path as argv[1] or
+# LEAGUES_FILE), one object per league:
+#   {"league_id": "82740197", "season": "2025", "swid": "...", "espn_s2": "...", "recipient": "..."}
+# swid/espn_s2 fall back to the SWID/ESPN_S2 env vars; leagues without a recipient are only rendered.
+# An optional "managers" object ({"email": team_id, ...}) sends each manager a personalized copy
+# (personalize.py) instead of the one report to "recipient".
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+
+
+def load_specs(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        specs = json.load(f)
+    if not isinstance(specs, list):
+        raise RuntimeError(f"{path}: expected a JSON list of league specs")
+    return specs
+
+
+def run_league(spec: Dict, send: bool = True, outbox=None) -> Dict:
+    league_id = str(spec.get("league_id", "")).strip()
+    season = str(spec.get("season", "")).strip()
+    data = fetch_league_json(league_id, season, spec.get("swid") or SWID, spec.get("espn_s2") or ESPN_S2,
+                             fields=report_fields())
+    journal = default_journal()
+    table = extract_table(data)
+    digest = table_digest(table)
+    recipient = spec.get("recipient")
+    result = {"league_id": league_id, "season": season, "recipient": recipient, "digest": digest, "sent": False}
+    managers = load_managers(spec)
+    if send and managers:
+        if all(journal.delivered("luck", digest, r) for r in managers):
+            result.update(markdown=journal.rendered("luck", digest), skipped=True)
+            return result
+        # Per-manager copies of the one rendering, delivered over their own outbox
+        # Rivals come from the standings; ranking then sets the report's own (luck) order
+        standings = table.order_by("wins", "pf", descending=True).tolist()
+        rank_table(table)
+        template = render_template("luck", digest, lambda: build_luck_report(table), table.name, standings)
+        subject = spec.get("subject") or SUBJECT
+        sent, failed = deliver("luck", digest, template, managers, table.row_of, subject)
+        result.update(markdown=template.fill(None), sent=sent > 0)
+        if failed:
+            # The others are journaled; the next run only retries these
+            result["error"] = "delivery failed: " + "; ".join(failed)
+        return result
+    if send and recipient and journal.delivered("luck", digest, recipient):
+        # Unchanged since the last report this recipient got
+        result.update(markdown=journal.rendered("luck", digest), skipped=True)
+        return result
+    # Rendered once per distinct standings, whoever it goes to
+    md = journal.render("luck", digest, lambda: build_markdown(rank_table(table)))
+    result["markdown"] = md
+    if send and recipient:
+        subject = spec.get("subject") or SUBJECT
+        if outbox is not None:
+            # Delivered in one pass over pooled connections once every league is rendered
+            result["outbox_id"] = outbox.add(recipient, subject, md)
+        else:
+            send_report(md, recipient=recipient, subject=subject)
+            journal.mark_delivered("luck", digest, recipient)
+            result["sent"] = True
+    return result
+
+
+def run_batch(specs: List[Dict], concurrency: int = BATCH_CONCURRENCY, send: bool = True) -> List[Dict]:
+    """
+    Fetch, rank and render every league over a bounded thread pool. A failing league
+    yields a result with an "error" entry instead of aborting the rest. Results keep
+    the order of specs. Without SendGrid, mail goes through one SMTP outbox after rendering.
+    """
+    results: List[Optional[Dict]] = [None] * len(specs)
+    # Only leagues mailed to a single recipient go through the shared outbox; a batch that
+    # only renders (or only sends personalized copies) needs no SMTP secrets here
+    mailed = any(spec.get("recipient") and not spec.get("managers") for spec in specs)
+    outbox = smtp_outbox() if send and mailed and not SENDGRID_API_KEY else None
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(run_league, spec, send, outbox): i for i, spec in enumerate(specs)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                results[i] = fut.result()
+            except Exception as e:
+                spec = specs[i]
+                results[i] = {
+                    "league_id": str(spec.get("league_id", "")),
+                    "season": str(spec.get("season", "")),
+                    "error": f"{type(e).__name__}: {e}",
+                }
+    if outbox is not None:
+        by_id = {r["outbox_id"]: r for r in results if "outbox_id" in r}
+        for delivery in outbox.flush():
+            r = by_id[delivery["id"]]
+            if "error" in delivery:
+                r["error"] = f"delivery failed: {delivery['error']}"
+            else:
+                r["sent"] = True
+                default_journal().mark_delivered("luck", r["digest"], r["recipient"])
+    return results
+
+
+def main():
+    from main import in_active_season, today_eastern
+    path = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("LEAGUES_FILE", "").strip()
+    if not path:
+        raise RuntimeError("Usage: python batch.py leagues.json (or set LEAGUES_FILE)")
+    today = today_eastern()
+    if not in_active_season(today):
+        print("Outside active season. Skipping email.")
+        return
+
+    specs = load_specs(path)
+    start = time.perf_counter()
+    results = run_batch(specs)
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if "error" in r]
+    for r in failed:
+        print(f"League {r['league_id']} ({r['season']}) failed: {r['error']}")
+    print(f"Processed {len(results)} leagues in {elapsed:.1f}s ({len(failed)} failed).")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Local stand-in for the ESPN fantasy API, for end-to-end and load testing without
+# cookies or network. Point the jobs at it with ESPN_BASE_URL=http://127.0.0.1:PORT.
+#   python -m benchmarks.espn_server [--port 8765] [--latency 40] [--error-rate 0.02] ...
+# Serves the league endpoint (every view espn_api and fetch_league_json ask for, plus
+# /communication/ activity), leagueHistory, the season endpoint (pro schedule, /players)
+# and news. Responses are synthetic (benchmarks.synthetic, one league per league id) or,
+# with --replay DIR, bodies recorded in an ESPN response cache directory. Latency, injected
+# 429/503 errors, player-card injury statuses and padded payload sizes are configurable;
+# ETag/If-None-Match and gzip behave like the real API so cache revalidation and transport
+# paths are exercised too.
+
+from benchmarks.synthetic import activity_topics, full_league_json, pro_players, pro_schedule
+
+GAMES = "/apis/v3/games/ffl"
+LEAGUE_PATH = re.compile(rf"^{GAMES}/seasons/(\d+)/segments/0/leagues/(\d+)(/communication/?)?$")
+HISTORY_PATH = re.compile(rf"^{GAMES}/leagueHistory/(\d+)(/communication/?)?$")
+SEASON_PATH = re.compile(rf"^{GAMES}/seasons/(\d+)(/players)?$")
+NEWS_PATH = re.compile(r"^/apis/fantasy/v3/games/ffl/news/")
+INJURY_STATUSES = ("QUESTIONABLE", "DOUBTFUL", "OUT", "INJURY_RESERVE")
+
+
+class ServerConfig:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 retry_after: float = 1.0, teams: int = 12, weeks: int = 14, played: Optional[int] = None,
+                 roster_size: int = 16, free_agents: int = 500, activity: int = 60, pad_kb: int = 0,
+                 gzip: bool = True, replay: str = "", seed: int = 0, cache_leagues: int = 256,
+                 injury_rate: float = 0.08, injury_period: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.teams = teams
+        self.weeks = weeks
+        self.played = played
+        self.roster_size = roster_size
+        self.free_agents = free_agents
+        self.activity = activity
+        self.pad_kb = pad_kb
+        self.gzip = gzip
+        self.replay = replay
+        self.seed = seed
+        self.cache_leagues = cache_leagues
+        self.injury_rate = injury_rate
+        self.injury_period = injury_period
+
+
+def request_key(path: str, params: Dict, fantasy_filter: str) -> str:
+    """Match key for a request: path, views in any order, other params, filter header."""
+    params = dict(params)
+    views = params.pop("view", [])
+    if isinstance(views, str):
+        views = [views]
+    parts = {
+        "path": path.rstrip("/"),
+        "view": sorted(views),
+        "params": sorted((str(k), str(v[0] if isinstance(v, list) and len(v) == 1 else v)) for k, v in params.items()),
+        "filter": fantasy_filter,
+    }
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_replay(root: str) -> Dict[str, bytes]:
+    """Index the entries of an espn_cache directory that recorded their request."""
+    out: Dict[str, bytes] = {}
+    for name in sorted(os.listdir(root)):
+        if not name.endswith(".meta"):
+            continue
+        base = os.path.join(root, name[:-len(".meta")])
+        try:
+            with open(base + ".meta", "r", encoding="utf-8") as f:
+                request = json.load(f).get("request")
+            if not request:
+                continue
+            with open(base + ".body", "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            continue
+        url = urlsplit(request["url"])
+        params = dict(request.get("params") or {})
+        params.update({k: v for k, v in parse_qs(url.query).items()})
+        out[request_key(url.path, params, request.get("filter", ""))] = body
+    return out
+
+
+class EspnStub:
+    """Builds response bodies; shared by every handler thread."""
+
+    def __init__(self, config: ServerConfig):
+        self.config = config
+        self.started_ms = int(time.time() * 1000)
+        self.replay = load_replay(config.replay) if config.replay else {}
+        self._lock = threading.Lock()
+        self._leagues: "OrderedDict[Tuple[int, int], Dict]" = OrderedDict()
+        self._season: Dict[Tuple[int, str], bytes] = {}
+        self.stats = {"requests": 0, "bytes": 0, "errors": 0, "not_modified": 0, "not_found": 0}
+
+    def count(self, **deltas) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                self.stats[k] += v
+
+    def league(self, league_id: int, season: int) -> Dict:
+        key = (league_id, season)
+        with self._lock:
+            data = self._leagues.get(key)
+            if data is not None:
+                self._leagues.move_to_end(key)
+                return data
+        c = self.config
+        data = full_league_json(c.teams, c.weeks, c.played, seed=c.seed + league_id, season=season,
+                                roster_size=c.roster_size)
+        data["id"] = league_id
+        data["topics"] = activity_topics(data, c.activity, self.started_ms, seed=c.seed + league_id)
+        with self._lock:
+            self._leagues[key] = data
+            while len(self._leagues) > c.cache_leagues:
+                self._leagues.popitem(last=False)
+        return data
+
+    def pad(self, payload):
+        # Unread filler so body size can be dialed up without changing what the jobs see
+        if self.config.pad_kb and isinstance(payload, dict):
+            payload = dict(payload, padding="x" * (self.config.pad_kb * 1024))
+        return payload
+
+    def league_body(self, data: Dict, params: Dict, fantasy_filter: Dict, communication: bool):
+        views = set(params.get("view", []))
+        if communication:
+            topics = fantasy_filter.get("topics", {})
+            offset = int(topics.get("offset", 0))
+            limit = int(topics.get("limit", 25))
+            return {"topics": data["topics"][offset:offset + limit]}
+        if "kona_playercard" in views:
+            wanted = set(fantasy_filter.get("players", {}).get("filterIds", {}).get("value", []))
+            season = data.get("seasonId", 0)
+            players = []
+            for t in data["teams"]:
+                for e in t["roster"]["entries"]:
+                    if e["playerId"] in wanted:
+                        pool = e["playerPoolEntry"]
+                        status = self.injury_status(e["playerId"], season)
+                        players.append(dict(pool, player=dict(pool["player"], injuryStatus=status,
+                                                              injured=status != "ACTIVE")))
+            return {"players": players}
+        if views == {"mPositionalRatings"}:
+            return {"positionAgainstOpponent": {"positionalRatings": {}}}
+        body = {k: v for k, v in data.items() if k != "topics"}
+        periods = fantasy_filter.get("schedule", {}).get("filterMatchupPeriodIds", {}).get("value")
+        if periods:
+            # espn_api sends matchup period ids as strings or ints
+            periods = {int(p) for p in periods}
+            body["schedule"] = [m for m in data["schedule"] if m["matchupPeriodId"] in periods]
+        if "mScoreboard" in views and params.get("scoringPeriodId"):
+            body["schedule"] = [self.box_score(data, m, int(params["scoringPeriodId"][0]))
+                                for m in body["schedule"]]
+        return body
+
+    def injury_status(self, player_id: int, season: int) -> str:
+        # Same player, same status in every league; re-rolled every injury_period seconds
+        bucket = int(time.time() // self.config.injury_period) if self.config.injury_period else 0
+        roll = int(hashlib.md5(f"{player_id}:{season}:{bucket}".encode()).hexdigest()[:8], 16)
+        if roll % 10000 >= self.config.injury_rate * 10000:
+            return "ACTIVE"
+        return INJURY_STATUSES[(roll // 10000) % len(INJURY_STATUSES)]
+
+    @staticmethod
+    def box_score(data: Dict, matchup: Dict, scoring_period: int) -> Dict:
+        # Each side's lineup with only that scoring period's stats, as ESPN's box score views return
+        rosters = {t["id"]: t["roster"]["entries"] for t in data["teams"]}
+        out = dict(matchup)
+        for side in ("home", "away"):
+            if side not in matchup:
+                continue
+            entries = []
+            for e in rosters.get(matchup[side]["teamId"], []):
+                player = e["playerPoolEntry"]["player"]
+                stats = [s for s in player["stats"] if s["scoringPeriodId"] == scoring_period]
+                pool = dict(e["playerPoolEntry"], player=dict(player, stats=stats),
+                            appliedStatTotal=sum(s["appliedTotal"] for s in stats if s["statSourceId"] == 0))
+                entries.append(dict(e, playerPoolEntry=pool))
+            out[side] = dict(matchup[side], rosterForCurrentScoringPeriod={"entries": entries})
+        return out
+
+    def season_body(self, season: int, players: bool) -> bytes:
+        key = (season, "players" if players else "schedule")
+        body = self._season.get(key)
+        if body is None:
+            if players:
+                payload = pro_players(self.league(0, season), self.config.free_agents, seed=self.config.seed)
+            else:
+                payload = self.pad(pro_schedule(season, seed=self.config.seed))
+            body = json.dumps(payload).encode("utf-8")
+            self._season[key] = body
+        return body
+
+    def respond(self, path: str, params: Dict, fantasy_filter_raw: str) -> Tuple[int, bytes]:
+        if self.replay:
+            body = self.replay.get(request_key(path, params, fantasy_filter_raw))
+            if body is not None:
+                return 200, body
+        try:
+            fantasy_filter = json.loads(fantasy_filter_raw) if fantasy_filter_raw else {}
+        except ValueError:
+            fantasy_filter = {}
+        m = LEAGUE_PATH.match(path)
+        if m:
+            data = self.league(int(m.group(2)), int(m.group(1)))
+            payload = self.pad(self.league_body(data, params, fantasy_filter, bool(m.group(3))))
+            return 200, json.dumps(payload).encode("utf-8")
+        m = HISTORY_PATH.match(path)
+        if m:
+            season = int((params.get("seasonId") or ["2017"])[0])
+            data = self.league(int(m.group(1)), season)
+            payload = self.pad(self.league_body(data, params, fantasy_filter, bool(m.group(2))))
+            return 200, json.dumps([payload]).encode("utf-8")
+        m = SEASON_PATH.match(path)
+        if m:
+            return 200, self.season_body(int(m.group(1)), bool(m.group(2)))
+        if NEWS_PATH.match(path):
+            return 200, json.dumps({"feed": []}).encode("utf-8")
+        return 404, json.dumps({"messages": ["not found"], "details": [{"message": path}]}).encode("utf-8")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stub: EspnStub
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, headers: Optional[Dict] = None) -> None:
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        stub, config = self.stub, self.stub.config
+        if config.latency_ms or config.jitter_ms:
+            time.sleep((config.latency_ms + random.uniform(0, config.jitter_ms)) / 1000.0)
+        stub.count(requests=1)
+        if config.error_rate and random.random() < config.error_rate:
+            stub.count(errors=1)
+            status = random.choice((429, 503))
+            self.send_body(status, b'{"messages":["throttled"]}',
+                           {"Content-Type": "application/json", "Retry-After": f"{config.retry_after:g}"})
+            return
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        status, body = stub.respond(url.path, params, self.headers.get("x-fantasy-filter", ""))
+        if status == 404:
+            stub.count(not_found=1)
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            stub.count(not_modified=1)
+            self.send_body(304, b"", {"ETag": etag})
+            return
+        headers = {"Content-Type": "application/json", "ETag": etag}
+        if config.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        stub.count(bytes=len(body))
+        self.send_body(status, body, headers)
+
+
+def make_server(config: ServerConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """A ready-to-serve stub server (port 0 picks a free port: see server.server_address)."""
+    stub = EspnStub(config)
+    handler = type("EspnHandler", (Handler,), {"stub": stub})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.stub = stub
+    return server
+
+
+def start_server(config: ServerConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve in a background thread; returns the server and its base URL."""
+    server = make_server(config, host, port)
+    threading.Thread(target=server.serve_forever, name="espn-server", daemon=True).start()
+    return server, f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+
+def add_config_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--latency", type=float, default=0.0, help="added latency per response, ms")
+    ap.add_argument("--jitter", type=float, default=0.0, help="uniform extra latency, ms")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 429/503")
+    ap.add_argument("--retry-after", type=float, default=1.0, help="Retry-After on injected errors, seconds")
+    ap.add_argument("--teams", type=int, default=12)
+    ap.add_argument("--weeks", type=int, default=14, help="regular season weeks")
+    ap.add_argument("--played", type=int, default=None, help="completed weeks (default: all)")
+    ap.add_argument("--roster-size", type=int, default=16)
+    ap.add_argument("--free-agents", type=int, default=500, help="extra players in the /players pool")
+    ap.add_argument("--activity", type=int, default=60, help="activity topics per league")
+    ap.add_argument("--pad-kb", type=int, default=0, help="filler added to each league/schedule body")
+    ap.add_argument("--no-gzip", action="store_true")
+    ap.add_argument("--replay", default="", help="espn_cache directory whose recorded responses are served first")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--injury-rate", type=float, default=0.08, help="fraction of players on the injury report")
+    ap.add_argument("--injury-period", type=float, default=0.0, help="seconds between injury re-rolls (0: fixed)")
+
+
+def config_from_args(args) -> ServerConfig:
+    return ServerConfig(
+        latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate, retry_after=args.retry_after,
+        teams=args.teams, weeks=args.weeks, played=args.played, roster_size=args.roster_size,
+        free_agents=args.free_agents, activity=args.activity, pad_kb=args.pad_kb, gzip=not args.no_gzip,
+        replay=args.replay, seed=args.seed, injury_rate=args.injury_rate, injury_period=args.injury_period,
+    )
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve synthetic or recorded ESPN fantasy API responses.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    add_config_args(ap)
+    args = ap.parse_args(argv)
+    server = make_server(config_from_args(args), args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Serving ESPN stub on http://{host}:{port} (ESPN_BASE_URL=http://{host}:{port})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stub.stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
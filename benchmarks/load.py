@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+# End-to-end load driver: runs the luck, roster and weekly summary pipelines (fetch, parse,
+# rank/simulate, render; no journal and no email) against the local ESPN stub in
+# benchmarks/espn_server.py, or any server given with --url, and reports reports/sec and
+# latency percentiles per job. Run from the repo root:
+#   python -m benchmarks.load [--jobs luck,roster,summary] [--leagues 20] [--concurrency 8]
+#                             [--duration 30 | --reports 200] [--latency 40 --error-rate 0.01 ...]
+# Every run gets fresh cache/store directories; ESPN_CACHE_TTL defaults to 0 so each report
+# revalidates against the server like a cold scheduled run would. Results are appended to
+# --output as JSON lines.
+
+from benchmarks.espn_server import add_config_args, config_from_args, start_server
+from benchmarks.run import git_rev
+
+JOBS = ("luck", "roster", "summary")
+
+
+def configure_env(base_url: str, state_dir: str, args) -> None:
+    # The job modules read these at import time, so this runs before any of them is imported
+    os.environ["ESPN_BASE_URL"] = base_url
+    os.environ["ESPN_CACHE_DIR"] = os.path.join(state_dir, "espn")
+    os.environ["ESPN_CACHE_TTL"] = str(args.cache_ttl)
+    os.environ["WEEKLY_STORE_DIR"] = os.path.join(state_dir, "weekly")
+    os.environ["ACTIVITY_DIR"] = os.path.join(state_dir, "activity")
+    os.environ["RUN_JOURNAL_DIR"] = os.path.join(state_dir, "journal")
+    os.environ["LINEUP_STORE_DIR"] = os.path.join(state_dir, "lineups")
+    os.environ["INJURY_DIR"] = os.path.join(state_dir, "injuries")
+    os.environ.setdefault("ESPN_RATE", str(args.rate))
+    os.environ.setdefault("ESPN_MAX_RATE", str(args.rate))
+    os.environ.setdefault("ESPN_BURST", str(args.rate))
+    os.environ.setdefault("HTTP_HOST_CONCURRENCY", str(args.concurrency))
+
+
+def luck_report(league_id: int, season: int) -> str:
+    import main
+    data = main.fetch_league_json(str(league_id), str(season), "{LOAD}", "load", fields=main.report_fields())
+    return main.build_markdown(main.rank_table(main.extract_table(data)))
+
+
+def roster_report(league_id: int, season: int) -> str:
+    from activity_log import log_for
+    from espn_cache import cached_league
+    from roster_updates import build_markdown, group_changes
+    from team_table import TeamTable
+    league = cached_league(league_id, season, espn_s2="load", swid="{LOAD}")
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=3)
+    activity_log = log_for(league)
+    activity_log.ingest(league)
+    records = activity_log.since(int(cutoff.timestamp() * 1000))
+    table = TeamTable.from_league(league)
+    return build_markdown(table, group_changes(table, records), cutoff, now)
+
+
+def summary_report(league_id: int, season: int) -> str:
+    from espn_cache import cached_league
+    from weekly_summary import build_report
+    league = cached_league(league_id, season, espn_s2="load", swid="{LOAD}")
+    return build_report(league)
+
+
+PIPELINES: Dict[str, Callable[[int, int], str]] = {
+    "luck": luck_report,
+    "roster": roster_report,
+    "summary": summary_report,
+}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def drive(jobs: List[str], leagues: int, season: int, concurrency: int,
+          duration: Optional[float], reports: Optional[int]) -> Dict:
+    """Run reports round-robin over jobs x leagues until duration or report count is reached."""
+    lock = threading.Lock()
+    latencies: Dict[str, List[float]] = {job: [] for job in jobs}
+    errors: Dict[str, List[str]] = {job: [] for job in jobs}
+    issued = [0]
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    def next_task():
+        with lock:
+            n = issued[0]
+            if (reports is not None and n >= reports) or (deadline and time.perf_counter() >= deadline):
+                return None
+            issued[0] += 1
+        return jobs[n % len(jobs)], 1 + (n // len(jobs)) % leagues
+
+    def worker():
+        while True:
+            task = next_task()
+            if task is None:
+                return
+            job, league_id = task
+            t0 = time.perf_counter()
+            try:
+                PIPELINES[job](league_id, season)
+            except Exception as e:
+                with lock:
+                    errors[job].append(f"{type(e).__name__}: {e}")
+                continue
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies[job].append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for f in [pool.submit(worker) for _ in range(concurrency)]:
+            f.result()
+    wall = time.perf_counter() - start
+
+    out = {"wall_seconds": wall, "jobs": {}}
+    for job in jobs:
+        lat = sorted(latencies[job])
+        out["jobs"][job] = {
+            "reports": len(lat),
+            "errors": len(errors[job]),
+            "first_error": errors[job][0] if errors[job] else "",
+            "reports_per_sec": len(lat) / wall if wall else 0.0,
+            "p50_ms": 1000 * percentile(lat, 0.50),
+            "p95_ms": 1000 * percentile(lat, 0.95),
+            "p99_ms": 1000 * percentile(lat, 0.99),
+            "max_ms": 1000 * (lat[-1] if lat else 0.0),
+        }
+    total = sum(j["reports"] for j in out["jobs"].values())
+    out["reports"] = total
+    out["errors"] = sum(j["errors"] for j in out["jobs"].values())
+    out["reports_per_sec"] = total / wall if wall else 0.0
+    return out
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Measure end-to-end reports/sec against a local ESPN stub.")
+    ap.add_argument("--url", default="", help="use a running server instead of starting one")
+    ap.add_argument("--jobs", default=",".join(JOBS), help="comma-separated subset of " + ",".join(JOBS))
+    ap.add_argument("--leagues", type=int, default=10, help="distinct league ids to cycle through")
+    ap.add_argument("--season", type=int, default=2025)
+    ap.add_argument("--concurrency", type=int, default=4, help="reports in flight")
+    ap.add_argument("--duration", type=float, default=None, help="seconds to run")
+    ap.add_argument("--reports", type=int, default=None, help="reports to run (default 60 without --duration)")
+    ap.add_argument("--warmup", type=int, default=0, help="untimed reports per job first (fills stores)")
+    ap.add_argument("--cache-ttl", type=float, default=0.0, help="ESPN_CACHE_TTL for the run")
+    ap.add_argument("--rate", type=float, default=1000.0, help="client rate limit, req/s (ESPN_RATE)")
+    ap.add_argument("--output", default=os.environ.get("LOAD_OUTPUT", "load_results.jsonl"))
+    ap.add_argument("--keep-state", action="store_true", help="leave the temp cache/store directories")
+    add_config_args(ap)
+    args = ap.parse_args(argv)
+    jobs = [j.strip() for j in args.jobs.split(",") if j.strip()]
+    unknown = [j for j in jobs if j not in PIPELINES]
+    if unknown or not jobs:
+        ap.error(f"unknown job(s): {', '.join(unknown) or '(none)'}")
+    reports = args.reports if args.reports is not None or args.duration else 60
+
+    server = None
+    base_url = args.url.rstrip("/")
+    if not base_url:
+        server, base_url = start_server(config_from_args(args))
+    state_dir = tempfile.mkdtemp(prefix="load-state-")
+    configure_env(base_url, state_dir, args)
+    try:
+        if args.warmup:
+            drive(jobs, args.leagues, args.season, args.concurrency, None, args.warmup * len(jobs))
+        result = drive(jobs, args.leagues, args.season, args.concurrency, args.duration, reports)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if not args.keep_state:
+            shutil.rmtree(state_dir, ignore_errors=True)
+
+    result.update({
+        "git_rev": git_rev(), "python": platform.python_version(), "timestamp": time.time(),
+        "base_url": base_url, "concurrency": args.concurrency, "leagues": args.leagues,
+        "latency_ms": args.latency, "error_rate": args.error_rate, "pad_kb": args.pad_kb,
+        "teams": args.teams, "cache_ttl": args.cache_ttl,
+    })
+    if server is not None:
+        result["server"] = dict(server.stub.stats)
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+
+    for job, r in result["jobs"].items():
+        print(f"{job:<8} {r['reports']:6d} reports {r['errors']:4d} errors {r['reports_per_sec']:8.2f}/s  "
+              f"p50 {r['p50_ms']:8.1f} ms  p95 {r['p95_ms']:8.1f} ms  p99 {r['p99_ms']:8.1f} ms")
+        if r["first_error"]:
+            print(f"         first error: {r['first_error']}")
+    print(f"{'total':<8} {result['reports']:6d} reports in {result['wall_seconds']:.2f}s  "
+          f"{result['reports_per_sec']:.2f} reports/s")
+    if "server" in result:
+        print(f"server   {json.dumps(result['server'])}")
+    if result["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
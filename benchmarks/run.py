@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+# Benchmarks for the report hot paths on synthetic leagues. Run from the repo root:
+#   python -m benchmarks.run [--quick] [--output bench_results.jsonl] [--baseline old.jsonl]
+# Each case appends one JSON line; with --baseline, cases that got slower than
+# --threshold (default 1.25x) are listed and the exit status is 1.
+
+from benchmarks.synthetic import league_json, fake_league, activity_records, full_league_json
+
+FULL_SIZES = {"teams": [8, 12, 20, 32], "leagues": [1, 100, 1000, 5000]}
+QUICK_SIZES = {"teams": [8, 12], "leagues": [1, 100]}
+
+
+def git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def timeit(fn: Callable[[], object], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def ranking_cases(n_teams: int, n_leagues: int) -> List[Dict]:
+    import main
+    from espn_stream import project_bytes
+    from ranking import rank_leagues, rank_teams
+    from team_table import TeamTable
+    payloads = [league_json(n_teams, 14, seed=i) for i in range(n_leagues)]
+    leagues = [main.extract_rows(p) for p in payloads]
+
+    def reference():
+        for rows in leagues:
+            standings_sorted = main.stable_sort(rows, main.standings_sort)
+            main.tie_rank_map(standings_sorted, lambda r: f"{r['wins']}|{int(round(r['pf']))}")
+            pfpa_sorted = main.stable_sort(rows, main.pfpa_sort)
+            main.tie_rank_map(pfpa_sorted, lambda r: f"{main.round2(r['pfpa']):.2f}")
+
+    bodies = [json.dumps(p).encode("utf-8") for p in payloads]
+    tables = [main.extract_table(p) for p in payloads]
+    ranked = [main.rank_table(main.extract_table(p)) for p in payloads]
+    return [
+        {"name": "extract_rows", "seconds": timeit(lambda: [main.extract_rows(p) for p in payloads])},
+        {"name": "parse_json_loads", "seconds": timeit(lambda: [json.loads(b) for b in bodies])},
+        {"name": "parse_stream_projected",
+         "seconds": timeit(lambda: [project_bytes(b, main.TEAM_ROW_FIELDS) for b in bodies])},
+        {"name": "stable_sort+tie_rank_map", "seconds": timeit(reference)},
+        {"name": "rank_rows", "seconds": timeit(lambda: [main.rank_rows(rows) for rows in leagues])},
+        {"name": "rank_leagues_stacked", "seconds": timeit(lambda: rank_leagues(leagues))},
+        {"name": "extract_table", "seconds": timeit(lambda: [main.extract_table(p) for p in payloads])},
+        {"name": "rank_teams_stacked", "seconds": timeit(lambda: rank_teams(TeamTable.stack(tables)))},
+        {"name": "build_markdown", "seconds": timeit(lambda: [main.build_markdown(t) for t in ranked])},
+    ]
+
+
+def luck_cases(n_teams: int, n_leagues: int) -> List[Dict]:
+    import weekly_store
+    from team_table import TeamTable
+    from weekly_store import store_for
+    from weekly_summary import compute_luck_and_sos
+    leagues = [fake_league(league_json(n_teams, 17, played_weeks=14, seed=i), league_id=i)
+               for i in range(min(n_leagues, 200))]
+    tables = [TeamTable.from_league(league) for league in leagues]
+    root = tempfile.mkdtemp(prefix="bench-weekly-")
+    old_root = weekly_store.STORE_DIR
+    weekly_store.STORE_DIR = root
+    try:
+        def cold():
+            shutil.rmtree(root, ignore_errors=True)
+            for league, table in zip(leagues, tables):
+                compute_luck_and_sos(league, table, store_for(league).sync(league))
+        cold_s = timeit(cold, repeat=1)
+        warm_s = timeit(lambda: [compute_luck_and_sos(league, table, store_for(league).sync(league))
+                                 for league, table in zip(leagues, tables)])
+    finally:
+        weekly_store.STORE_DIR = old_root
+        shutil.rmtree(root, ignore_errors=True)
+    scale = n_leagues / len(leagues)
+    return [
+        {"name": "compute_luck_and_sos_cold", "seconds": cold_s * scale},
+        {"name": "compute_luck_and_sos_warm", "seconds": warm_s * scale},
+    ]
+
+
+def roster_cases(n_teams: int, n_leagues: int) -> List[Dict]:
+    from activity_log import ActivityLog
+    from roster_updates import group_changes
+    from team_table import TeamTable
+    from transaction_index import TransactionIndex
+    data = league_json(n_teams, 14)
+    table = TeamTable.from_payload(data)
+    records = activity_records(data, 40 * n_teams, int(time.time() * 1000))
+    root = tempfile.mkdtemp(prefix="bench-activity-")
+    try:
+        log = ActivityLog(0, data["seasonId"], root)
+        with open(log.path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+
+        def index_cold():
+            for path in (os.path.join(root, f"{k}_0.index.json") for k in range(min(n_leagues, 200))):
+                if os.path.exists(path):
+                    os.remove(path)
+            for k in range(min(n_leagues, 200)):
+                TransactionIndex(k, 0, root).sync(log)
+
+        index = TransactionIndex(0, data["seasonId"], root)
+        index.sync(log)
+
+        def queries():
+            for _ in range(n_leagues):
+                [index.faab_spent(tid) for tid in table.team_id.tolist()]
+                index.top_bids(index.latest_bid_week())
+                index.player_churn()
+
+        scale = n_leagues / min(n_leagues, 200)
+        return [
+            {"name": "roster_group_changes",
+             "seconds": timeit(lambda: [group_changes(table, records) for _ in range(n_leagues)])},
+            {"name": "transaction_index_build", "seconds": timeit(index_cold, repeat=1) * scale},
+            {"name": "transaction_index_queries", "seconds": timeit(queries)},
+        ]
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def lineup_cases(n_teams: int, n_leagues: int) -> List[Dict]:
+    from lineup_efficiency import solve_lineups
+    slots = {0: 1, 2: 2, 4: 2, 6: 1, 23: 1, 16: 1, 17: 1}
+    data = full_league_json(n_teams, 17, played_weeks=14)
+    season = [[[e["lineupSlotId"], s["appliedTotal"], e["playerPoolEntry"]["player"]["eligibleSlots"]]
+               for e in t["roster"]["entries"]
+               for s in e["playerPoolEntry"]["player"]["stats"] if s["scoringPeriodId"] == week]
+              for week in range(1, 15) for t in data["teams"]]
+    lineups = season * min(n_leagues, 200)
+    scale = n_leagues / min(n_leagues, 200)
+    return [{"name": "solve_lineups_season", "seconds": timeit(lambda: solve_lineups(lineups, slots)) * scale}]
+
+
+def run(sizes: Dict[str, List[int]], output: str) -> List[Dict]:
+    meta = {"git_rev": git_rev(), "python": platform.python_version(), "timestamp": time.time()}
+    results = []
+    with open(output, "a", encoding="utf-8") as f:
+        for n_teams in sizes["teams"]:
+            for n_leagues in sizes["leagues"]:
+                for case_fn in (ranking_cases, luck_cases, roster_cases, lineup_cases):
+                    for case in case_fn(n_teams, n_leagues):
+                        case.update(meta, teams=n_teams, leagues=n_leagues,
+                                    per_league_us=1e6 * case["seconds"] / n_leagues)
+                        f.write(json.dumps(case) + "\n")
+                        results.append(case)
+                        print(f"{case['name']:<28} teams={n_teams:<3} leagues={n_leagues:<5} "
+                              f"{case['seconds'] * 1000:10.2f} ms  {case['per_league_us']:10.1f} us/league")
+    return results
+
+
+def load_results(path: str) -> Dict[tuple, float]:
+    # Latest run wins when a file holds several
+    out: Dict[tuple, float] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                r = json.loads(line)
+                out[(r["name"], r["teams"], r["leagues"])] = r["seconds"]
+    return out
+
+
+def regressions(results: List[Dict], baseline: Dict[tuple, float], threshold: float) -> List[str]:
+    out = []
+    for r in results:
+        old = baseline.get((r["name"], r["teams"], r["leagues"]))
+        if old and r["seconds"] > old * threshold:
+            out.append(f"{r['name']} teams={r['teams']} leagues={r['leagues']}: "
+                       f"{old * 1000:.2f} ms -> {r['seconds'] * 1000:.2f} ms ({r['seconds'] / old:.2f}x)")
+    return out
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Benchmark the luck report pipeline on synthetic leagues.")
+    ap.add_argument("--quick", action="store_true", help="small sizes only")
+    ap.add_argument("--output", default=os.environ.get("BENCH_OUTPUT", "bench_results.jsonl"))
+    ap.add_argument("--baseline", help="earlier results file to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25)
+    args = ap.parse_args(argv)
+    baseline = load_results(args.baseline) if args.baseline else None
+    results = run(QUICK_SIZES if args.quick else FULL_SIZES, args.output)
+    if baseline is not None:
+        slower = regressions(results, baseline, args.threshold)
+        for line in slower:
+            print(f"REGRESSION {line}")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
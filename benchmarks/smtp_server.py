@@ -0,0 +1,162 @@
+import sys
+import argparse
+import threading
+import socketserver
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Local stand-in SMTP server for exercising email_smtp.SmtpOutbox without a mail provider.
+#   python -m benchmarks.smtp_server [--port 8025] [--refuse bad@example.com] [--fail-first 2]
+# Speaks the subset of SMTP that smtplib uses for plain (no STARTTLS, no AUTH) delivery:
+# EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT. It records every connection and accepted
+# message, refuses listed recipients with 550 and can answer the first N MAIL commands with
+# a transient 451 so retries and reconnects are exercised too.
+
+
+class SmtpConfig:
+    def __init__(self, refuse: Sequence[str] = (), fail_first: int = 0):
+        self.refuse = {r.lower() for r in refuse}
+        self.fail_first = fail_first
+
+
+class SmtpStub:
+    """Shared by every connection: what was sent, over how many connections."""
+
+    def __init__(self, config: SmtpConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.failures_left = config.fail_first
+        # (connection number, sender, recipients, message text)
+        self.messages: List[Tuple[int, str, List[str], str]] = []
+
+    def connect(self) -> int:
+        with self._lock:
+            self.connections += 1
+            return self.connections
+
+    def take_failure(self) -> bool:
+        with self._lock:
+            if self.failures_left > 0:
+                self.failures_left -= 1
+                return True
+            return False
+
+    def accept(self, connection: int, sender: str, recipients: List[str], data: str) -> None:
+        with self._lock:
+            self.messages.append((connection, sender, list(recipients), data))
+
+
+def _address(arg: str) -> str:
+    # "FROM:<a@b> SIZE=1" -> "a@b"
+    value = arg.split(":", 1)[1].strip() if ":" in arg else arg
+    value = value.split()[0] if value else ""
+    return value.strip("<>")
+
+
+class Handler(socketserver.StreamRequestHandler):
+    stub: SmtpStub
+
+    def reply(self, line: str) -> None:
+        self.wfile.write((line + "\r\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        connection = self.stub.connect()
+        sender: Optional[str] = None
+        recipients: List[str] = []
+        self.reply("220 localhost stand-in SMTP")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            verb, _, arg = line.partition(" ")
+            verb = verb.upper()
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                if self.stub.take_failure():
+                    self.reply("451 Try again later")
+                    continue
+                sender, recipients = _address(arg), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                address = _address(arg)
+                if address.lower() in self.stub.config.refuse:
+                    self.reply("550 No such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                if sender is None or not recipients:
+                    self.reply("503 Bad sequence of commands")
+                    continue
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    if data_line.startswith(b".."):
+                        data_line = data_line[1:]
+                    lines.append(data_line.decode("utf-8", "replace"))
+                self.stub.accept(connection, sender, recipients, "".join(lines))
+                sender, recipients = None, []
+                self.reply("250 OK queued")
+            elif verb == "RSET":
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class ThreadingSmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def make_server(config: SmtpConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingSmtpServer:
+    stub = SmtpStub(config)
+    handler = type("BoundHandler", (Handler,), {"stub": stub})
+    server = ThreadingSmtpServer((host, port), handler)
+    server.stub = stub
+    return server
+
+
+def start_server(config: SmtpConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingSmtpServer, int]:
+    """Serve on a background thread; returns (server, port)."""
+    server = make_server(config, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Accept SMTP deliveries locally and log them.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8025)
+    ap.add_argument("--refuse", action="append", default=[], help="recipient to answer with 550 (repeatable)")
+    ap.add_argument("--fail-first", type=int, default=0, help="answer the first N MAIL commands with 451")
+    args = ap.parse_args(argv)
+    server = make_server(SmtpConfig(args.refuse, args.fail_first), args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Stand-in SMTP on {host}:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stub = server.stub
+        print(f"{stub.connections} connections, {len(stub.messages)} messages", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
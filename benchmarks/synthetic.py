@@ -0,0 +1,308 @@
+import random
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+# Synthetic, ESPN-shaped league data for benchmarks: league_json() mirrors the
+# mTeam/mStandings/mMatchupScore payload, fake_league() exposes the slice of the
+# espn_api League interface the report jobs use, and activity_records() produces
+# activity_log records for the roster digest. full_league_json(), pro_players(),
+# pro_schedule() and activity_topics() build the complete responses espn_api.League
+# reads, for benchmarks/espn_server.py.
+
+LOCATIONS = ["High", "Low", "Big", "Lucky", "Gridiron", "Sunday", "Fourth", "Red Zone"]
+NICKNAMES = ["Rollers", "Dogs", "Kings", "Bandits", "Ghosts", "Sharks", "Titans", "Waivers"]
+
+# Pro team ids espn_api knows (PRO_TEAM_MAP minus "None")
+PRO_TEAM_IDS = list(range(1, 31)) + [33, 34]
+# Default lineup: slot id, eligible slots of the players drafted for it
+LINEUP = [
+    (0, [0, 7, 20, 21]),
+    (2, [2, 3, 23, 7, 20, 21]),
+    (2, [2, 3, 23, 7, 20, 21]),
+    (4, [4, 3, 5, 23, 7, 20, 21]),
+    (4, [4, 3, 5, 23, 7, 20, 21]),
+    (6, [6, 5, 23, 7, 20, 21]),
+    (23, [4, 3, 5, 23, 7, 20, 21]),
+    (16, [16, 20, 21]),
+    (17, [17, 20, 21]),
+]
+BENCH = [[2, 3, 23, 7, 20, 21], [4, 3, 5, 23, 7, 20, 21], [0, 7, 20, 21], [6, 5, 23, 7, 20, 21]]
+FIRST_NAMES = ["Sam", "Alex", "Jordan", "Chris", "Taylor", "Drew", "Casey", "Jamie", "Riley", "Morgan"]
+LAST_NAMES = ["Smith", "Johnson", "Brown", "Davis", "Miller", "Wilson", "Moore", "Lee", "Allen", "Young"]
+
+
+def _tally(teams: List[Dict], schedule: List[Dict]) -> None:
+    # Team records from the decided matchups
+    by_id = {t["id"]: t["record"]["overall"] for t in teams}
+    for rec in by_id.values():
+        rec.update(wins=0, losses=0, ties=0, pointsFor=0.0, pointsAgainst=0.0)
+    for m in schedule:
+        if m["winner"] == "UNDECIDED":
+            continue
+        for side, other, won in (("home", "away", "HOME"), ("away", "home", "AWAY")):
+            rec = by_id[m[side]["teamId"]]
+            rec["pointsFor"] += m[side]["totalPoints"]
+            rec["pointsAgainst"] += m[other]["totalPoints"]
+            if m["winner"] == "TIE":
+                rec["ties"] += 1
+            elif m["winner"] == won:
+                rec["wins"] += 1
+            else:
+                rec["losses"] += 1
+
+
+def league_json(n_teams: int = 12, n_weeks: int = 14, played_weeks: Optional[int] = None,
+                seed: int = 0, season: int = 2025) -> Dict:
+    rng = random.Random(seed)
+    played = n_weeks if played_weeks is None else played_weeks
+    teams = []
+    for i in range(n_teams):
+        teams.append({
+            "id": i + 1,
+            "location": f"{rng.choice(LOCATIONS)} {i + 1}",
+            "nickname": rng.choice(NICKNAMES),
+            "record": {"overall": {"wins": 0, "losses": 0, "ties": 0, "pointsFor": 0.0, "pointsAgainst": 0.0}},
+        })
+    mean = {t["id"]: rng.uniform(95, 125) for t in teams}
+    schedule = []
+    for week in range(1, n_weeks + 1):
+        ids = [t["id"] for t in teams]
+        rng.shuffle(ids)
+        for home, away in zip(ids[0::2], ids[1::2]):
+            done = week <= played
+            hs = round(max(0.0, rng.gauss(mean[home], 25)), 2) if done else 0.0
+            as_ = round(max(0.0, rng.gauss(mean[away], 25)), 2) if done else 0.0
+            winner = "UNDECIDED"
+            if done:
+                winner = "HOME" if hs > as_ else ("AWAY" if as_ > hs else "TIE")
+            schedule.append({
+                "matchupPeriodId": week, "winner": winner, "playoffTierType": "NONE",
+                "home": {"teamId": home, "totalPoints": hs},
+                "away": {"teamId": away, "totalPoints": as_},
+            })
+    _tally(teams, schedule)
+    return {
+        "id": seed,
+        "seasonId": season,
+        "status": {"currentMatchupPeriod": played + 1, "previousSeasons": []},
+        "teams": teams,
+        "schedule": schedule,
+    }
+
+
+def player_name(player_id: int) -> str:
+    return (f"{FIRST_NAMES[player_id % len(FIRST_NAMES)]} "
+            f"{LAST_NAMES[(player_id // len(FIRST_NAMES)) % len(LAST_NAMES)]} {player_id}")
+
+
+def _player(player_id: int, slots: List[int], pro_team: int, season: int, weeks: int,
+            rng: random.Random) -> Dict:
+    mean = rng.uniform(2, 22)
+    stats = [{
+        "seasonId": season, "scoringPeriodId": week, "statSourceId": 0, "statSplitTypeId": 1,
+        "appliedTotal": round(max(0.0, rng.gauss(mean, 6)), 2), "stats": {}, "appliedStats": {},
+    } for week in range(1, weeks + 1)]
+    stats.append({"seasonId": season, "scoringPeriodId": 0, "statSourceId": 1, "statSplitTypeId": 0,
+                  "appliedTotal": round(mean * 17, 2), "appliedAverage": round(mean, 2),
+                  "stats": {}, "appliedStats": {}})
+    return {
+        "id": player_id,
+        "fullName": player_name(player_id),
+        "defaultPositionId": slots[0],
+        "eligibleSlots": slots,
+        "proTeamId": pro_team,
+        "injuryStatus": "ACTIVE",
+        "injured": False,
+        "jersey": str(rng.randint(1, 99)),
+        "ownership": {"percentOwned": round(rng.uniform(0, 100), 2), "percentStarted": round(rng.uniform(0, 100), 2)},
+        "stats": stats,
+    }
+
+
+def full_league_json(n_teams: int = 12, n_weeks: int = 14, played_weeks: Optional[int] = None,
+                     seed: int = 0, season: int = 2025, roster_size: int = 16) -> Dict:
+    """league_json() plus everything espn_api.League reads (settings, status, rosters, members, draft)."""
+    data = league_json(n_teams, n_weeks, played_weeks, seed, season)
+    rng = random.Random(seed + 1)
+    played = data["status"]["currentMatchupPeriod"] - 1
+    picks = []
+    for t in data["teams"]:
+        tid = t["id"]
+        slots = LINEUP + [(20, BENCH[k % len(BENCH)]) for k in range(max(0, roster_size - len(LINEUP)))]
+        entries = []
+        for k, (slot, eligible) in enumerate(slots[:roster_size]):
+            pid = 100000 + tid * 100 + k
+            player = _player(pid, eligible, rng.choice(PRO_TEAM_IDS), season, played, rng)
+            entries.append({
+                "playerId": pid, "lineupSlotId": slot, "acquisitionType": "DRAFT", "injuryStatus": "ACTIVE",
+                "playerPoolEntry": {"id": pid, "onTeamId": tid, "player": player},
+            })
+            picks.append({"teamId": tid, "playerId": pid, "roundId": k + 1, "roundPickNumber": tid,
+                          "bidAmount": 0, "keeper": False, "nominatingTeamId": 0})
+        rec = t["record"]["overall"]
+        rec.update(streakLength=1, streakType="WIN" if rng.random() < 0.5 else "LOSS")
+        t.update({
+            "abbrev": f"T{tid}",
+            "name": f"{t['location']} {t['nickname']}",
+            "divisionId": 0,
+            "owners": [f"{{MEMBER-{tid}}}"],
+            "playoffSeed": 0,
+            "rankCalculatedFinal": 0,
+            "waiverRank": tid,
+            "transactionCounter": {"acquisitions": 0, "acquisitionBudgetSpent": 0, "drops": 0, "trades": 0, "moveToIR": 0},
+            "roster": {"entries": entries},
+        })
+    # Matchup totals are what each team's starters scored, as on ESPN
+    starters: Dict[int, Dict[int, float]] = {}
+    for t in data["teams"]:
+        for e in t["roster"]["entries"]:
+            if e["lineupSlotId"] in (20, 21):
+                continue
+            for stat in e["playerPoolEntry"]["player"]["stats"]:
+                if stat["statSourceId"] == 0:
+                    week_pts = starters.setdefault(t["id"], {})
+                    week_pts[stat["scoringPeriodId"]] = week_pts.get(stat["scoringPeriodId"], 0.0) + stat["appliedTotal"]
+    for m in data["schedule"]:
+        if m["winner"] == "UNDECIDED":
+            continue
+        hs = round(starters[m["home"]["teamId"]].get(m["matchupPeriodId"], 0.0), 2)
+        as_ = round(starters[m["away"]["teamId"]].get(m["matchupPeriodId"], 0.0), 2)
+        m["home"]["totalPoints"], m["away"]["totalPoints"] = hs, as_
+        m["winner"] = "HOME" if hs > as_ else ("AWAY" if as_ > hs else "TIE")
+    _tally(data["teams"], data["schedule"])
+    by_record = sorted(data["teams"], key=lambda t: (-t["record"]["overall"]["wins"], -t["record"]["overall"]["pointsFor"]))
+    for seed_no, t in enumerate(by_record, 1):
+        t["playoffSeed"] = seed_no
+    counts = {0: 1, 2: 2, 4: 2, 6: 1, 16: 1, 17: 1, 20: max(0, roster_size - len(LINEUP)), 21: 1, 23: 1}
+    data.update({
+        "scoringPeriodId": played + 1,
+        "members": [{"id": f"{{MEMBER-{t['id']}}}", "displayName": f"manager{t['id']}",
+                     "firstName": "Manager", "lastName": str(t["id"])} for t in data["teams"]],
+        "draftDetail": {"drafted": True, "inProgress": False, "picks": picks},
+        "settings": {
+            "name": f"Synthetic League {seed}",
+            "size": n_teams,
+            "scheduleSettings": {
+                "matchupPeriodCount": n_weeks,
+                "matchupPeriods": {str(w): [w] for w in range(1, n_weeks + 4)},
+                "playoffTeamCount": min(6, n_teams),
+                "playoffSeedingRule": "TOTAL_POINTS_SCORED",
+                "playoffMatchupPeriodLength": 1,
+                "divisions": [{"id": 0, "name": "League"}],
+            },
+            "tradeSettings": {"vetoVotesRequired": 4},
+            "draftSettings": {"keeperCount": 0},
+            "scoringSettings": {"matchupTieRule": "NONE", "playoffMatchupTieRule": "NONE",
+                                "scoringType": "H2H_POINTS", "scoringItems": []},
+            "rosterSettings": {"lineupSlotCounts": {str(slot): counts.get(slot, 0) for slot in range(25)}},
+            "acquisitionSettings": {"isUsingAcquisitionBudget": True, "acquisitionBudget": 100},
+        },
+    })
+    data["status"].update(firstScoringPeriod=1, finalScoringPeriod=18, latestScoringPeriod=played + 1)
+    return data
+
+
+def pro_players(data: Dict, n_free_agents: int = 500, seed: int = 0) -> List[Dict]:
+    """players_wl view: every rostered player of full_league_json() data plus a free-agent pool."""
+    rng = random.Random(seed)
+    out = [{"id": e["playerId"], "fullName": e["playerPoolEntry"]["player"]["fullName"]}
+           for t in data["teams"] for e in t["roster"]["entries"]]
+    for k in range(n_free_agents):
+        pid = 900000 + k
+        out.append({"id": pid, "fullName": player_name(pid), "proTeamId": rng.choice(PRO_TEAM_IDS)})
+    return out
+
+
+def pro_schedule(season: int = 2025, n_weeks: int = 18, seed: int = 0) -> Dict:
+    """proTeamSchedules_wl view: a random pairing of pro teams for each scoring period."""
+    rng = random.Random(seed)
+    start_ms = int(datetime(season, 9, 7, tzinfo=timezone.utc).timestamp() * 1000)
+    games: Dict[int, Dict[str, List[Dict]]] = {tid: {} for tid in PRO_TEAM_IDS}
+    for week in range(1, n_weeks + 1):
+        ids = list(PRO_TEAM_IDS)
+        rng.shuffle(ids)
+        for home, away in zip(ids[0::2], ids[1::2]):
+            game = {"homeProTeamId": home, "awayProTeamId": away,
+                    "date": start_ms + (week - 1) * 7 * 86400000, "validForLocking": True}
+            games[home][str(week)] = [game]
+            games[away][str(week)] = [game]
+    pro_teams = [{"id": 0, "abbrev": "FA", "proGamesByScoringPeriod": {}}]
+    pro_teams += [{"id": tid, "abbrev": f"P{tid}", "proGamesByScoringPeriod": games[tid]} for tid in PRO_TEAM_IDS]
+    return {"settings": {"proTeams": pro_teams}}
+
+
+def activity_topics(data: Dict, n: int, now_ms: int, span_days: float = 7.0, seed: int = 0) -> List[Dict]:
+    """kona_league_communication topics (newest first) naming rostered players."""
+    rng = random.Random(seed)
+    rosters = {t["id"]: [e["playerId"] for e in t["roster"]["entries"]] for t in data["teams"]}
+    team_ids = list(rosters)
+    out = []
+    for i in range(n):
+        tid = rng.choice(team_ids)
+        target = rng.choice(rosters[tid])
+        kind = rng.choice([178, 180, 179, 244])
+        if kind == 244:
+            other = rng.choice([t for t in team_ids if t != tid] or team_ids)
+            msg = {"messageTypeId": 244, "targetId": target, "from": tid, "to": other}
+        elif kind == 180:
+            msg = {"messageTypeId": 180, "targetId": target, "to": tid, "from": rng.randint(1, 40)}
+        else:
+            msg = {"messageTypeId": kind, "targetId": target, "to": tid}
+        out.append({"id": f"topic-{seed}-{i}", "date": now_ms - int(rng.uniform(0, span_days) * 86400000),
+                    "messages": [msg]})
+    out.sort(key=lambda t: t["date"], reverse=True)
+    return out
+
+
+def fake_league(data: Dict, league_id: Optional[int] = None) -> SimpleNamespace:
+    """Minimal stand-in for espn_api.football.League built from league_json() output."""
+    teams = []
+    by_id = {}
+    for t in data["teams"]:
+        rec = t["record"]["overall"]
+        team = SimpleNamespace(
+            team_id=t["id"], team_name=f"{t['location']} {t['nickname']}", wins=rec["wins"],
+            losses=rec["losses"], points_for=rec["pointsFor"], points_against=rec["pointsAgainst"],
+            scores=[], roster=[])
+        teams.append(team)
+        by_id[team.team_id] = team
+    weeks: Dict[int, List] = {}
+    for m in data["schedule"]:
+        home, away = by_id[m["home"]["teamId"]], by_id[m["away"]["teamId"]]
+        home.scores.append(m["home"]["totalPoints"])
+        away.scores.append(m["away"]["totalPoints"])
+        weeks.setdefault(m["matchupPeriodId"], []).append(SimpleNamespace(
+            is_playoff=False, home_team=home, away_team=away,
+            home_score=m["home"]["totalPoints"], away_score=m["away"]["totalPoints"]))
+    n_weeks = max(weeks) if weeks else 0
+    return SimpleNamespace(
+        league_id=data["id"] if league_id is None else league_id,
+        year=data["seasonId"],
+        teams=teams,
+        currentMatchupPeriod=data["status"]["currentMatchupPeriod"],
+        settings=SimpleNamespace(reg_season_count=n_weeks, playoff_team_count=min(6, len(teams))),
+        scoreboard=lambda week=None: weeks.get(week, []),
+    )
+
+
+def activity_records(data: Dict, n: int, now_ms: int, span_days: float = 7.0, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    names = [f"{t['location']} {t['nickname']}" for t in data["teams"]]
+    actions = ["FA ADDED", "WAIVER ADDED", "DROPPED", "TRADED", "MOVED TO IR"]
+    out = []
+    for i in range(n):
+        team = rng.randrange(len(names))
+        action = rng.choice(actions)
+        out.append({
+            "date": now_ms - int(rng.uniform(0, span_days) * 86400000),
+            "team_id": team + 1,
+            "team": names[team],
+            "action": action,
+            "player_id": 1000 + i,
+            "player": f"Player {i}",
+            "position": rng.choice(["QB", "RB", "WR", "TE", "K", "D/ST"]),
+            "bid": rng.randint(1, 40) if action == "WAIVER ADDED" else 0,
+        })
+    out.sort(key=lambda r: r["date"])
+    return out
@@ -0,0 +1,86 @@
+import os
+import sys
+
+# One entry point for every job:
+#   python cli.py luck       weekly luck rankings (main.py)
+#   python cli.py roster     3-day roster update digest (roster_updates.py)
+#   python cli.py summary    weekly fantasy report (weekly_summary.py)
+#   python cli.py daemon     all three on their schedules in one process (daemon.py; --help)
+# Only the stdlib is imported up front. The luck job checks the season window before
+# anything else, so off-season runs exit without loading espn_api, requests or numpy.
+# Add --import-profile (or IMPORT_PROFILE=1) to print the slowest imports of the run.
+
+COMMANDS = ("luck", "roster", "summary", "daemon")
+IMPORT_PROFILE_TOP = 15
+
+
+def run_luck() -> None:
+    from main import in_active_season, today_eastern
+    if not in_active_season(today_eastern()):
+        print("Outside active season. Skipping email.")
+        return
+    import main
+    main.main()
+
+
+def run_roster() -> None:
+    import roster_updates
+    roster_updates.main()
+
+
+def run_summary() -> None:
+    import weekly_summary
+    weekly_summary.main()
+
+
+def run_daemon(args) -> None:
+    import daemon
+    daemon.main(args)
+
+
+def import_profile(command: str) -> int:
+    """Re-run the command under -X importtime and summarize the slowest imports."""
+    import subprocess
+    env = dict(os.environ, IMPORT_PROFILE="")
+    proc = subprocess.run([sys.executable, "-X", "importtime", os.path.abspath(__file__), command],
+                          env=env, stderr=subprocess.PIPE, text=True)
+    rows = []
+    other = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            other.append(line)
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if not parts[0].isdigit():
+            continue
+        rows.append((int(parts[1]), int(parts[0]), parts[2]))
+    if other:
+        sys.stderr.write("\n".join(other) + "\n")
+    total = sum(self_us for _, self_us, _ in rows)
+    print(f"\nImport profile for '{command}': {len(rows)} modules, {total / 1000:.1f} ms self time", file=sys.stderr)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module", file=sys.stderr)
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:IMPORT_PROFILE_TOP]:
+        print(f"{cumulative / 1000:14.1f} {self_us / 1000:9.1f}  {name}", file=sys.stderr)
+    return proc.returncode
+
+
+def main(argv=None) -> None:
+    args = list(sys.argv[1:] if argv is None else argv)
+    profile = os.environ.get("IMPORT_PROFILE", "").strip() not in ("", "0")
+    if "--import-profile" in args:
+        args.remove("--import-profile")
+        profile = True
+    if args and args[0] == "daemon":
+        run_daemon(args[1:])
+        return
+    if len(args) != 1 or args[0] not in COMMANDS:
+        print(f"Usage: python cli.py {{{'|'.join(COMMANDS)}}} [--import-profile]", file=sys.stderr)
+        sys.exit(2)
+    command = args[0]
+    if profile:
+        sys.exit(import_profile(command))
+    {"luck": run_luck, "roster": run_roster, "summary": run_summary}[command]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+import metrics
+from personalize import load_managers
+
+# Scheduler daemon: runs the luck, roster and summary jobs on the same UTC cron schedules as
+# the GitHub workflows, for one league (LEAGUE_ID/SEASON/...) or every league in LEAGUES_FILE
+# (batch.py format, plus an optional "jobs" list per spec), inside one long-lived process:
+#   python cli.py daemon [--once] [--force luck,roster,summary] [--leagues leagues.json]
+# The ESPN response cache, pooled HTTP transport, rate limiter and run journal stay warm
+# between runs, so a scheduled run costs a revalidation instead of a runner boot and pip
+# install. Every DAEMON_TICK seconds the due (job, league) runs execute concurrently. The
+# runs of one tick share each league's espn_api League (a catch-up or --force can make roster
+# and summary due together); the next tick builds fresh ones, since scheduled runs are days
+# apart and a League holds the standings as of when it was built. Slots missed while the daemon was down (within DAEMON_CATCHUP) collapse into
+# one run. Per-run state lives in .cache/daemon/state.json, and the run journal keeps a rerun
+# after a crash from mailing twice. Failed runs are retried with backoff up to DAEMON_RETRIES.
+DAEMON_STATE_DIR = os.environ.get("DAEMON_STATE_DIR", ".cache/daemon").strip()
+DAEMON_TICK = float(os.environ.get("DAEMON_TICK", "30"))
+DAEMON_CONCURRENCY = int(os.environ.get("DAEMON_CONCURRENCY", "8"))
+DAEMON_CATCHUP = float(os.environ.get("DAEMON_CATCHUP", str(6 * 3600)))
+DAEMON_RETRIES = int(os.environ.get("DAEMON_RETRIES", "3"))
+DAEMON_RETRY_DELAY = float(os.environ.get("DAEMON_RETRY_DELAY", "300"))
+
+JOBS = ("luck", "roster", "summary")
+# ";" separates several cron lines for one job; DAEMON_SCHEDULE_<JOB> overrides
+SCHEDULES = {
+    "luck": os.environ.get("DAEMON_SCHEDULE_LUCK", "0 14 * * TUE; 0 14 7 11 *"),
+    "roster": os.environ.get("DAEMON_SCHEDULE_ROSTER", "0 14 * * TUE,THU,SUN"),
+    "summary": os.environ.get("DAEMON_SCHEDULE_SUMMARY", "0 14 * * WED"),
+}
+
+_NAMES = {name: i for i, name in enumerate(("SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"))}
+_NAMES.update({name: i + 1 for i, name in enumerate(
+    ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"))})
+
+
+def _cron_field(field: str, lo: int, hi: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.upper().split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = int(_NAMES.get(a, a)), int(_NAMES.get(b, b))
+        else:
+            start = end = int(_NAMES.get(part, part))
+        if start < lo or end > hi or start > end or step < 1:
+            raise ValueError(f"cron field out of range: {field!r}")
+        values.update(range(start, end + 1, step))
+    if hi == 7 and 7 in values:
+        # 7 is Sunday too
+        values.add(0)
+    return values
+
+
+class Cron:
+    """One 5-field cron line (minute hour day-of-month month day-of-week), matched in UTC."""
+
+    def __init__(self, line: str):
+        fields = line.split()
+        if len(fields) != 5:
+            raise ValueError(f"expected 5 cron fields: {line!r}")
+        self.line = line.strip()
+        self.minutes = _cron_field(fields[0], 0, 59)
+        self.hours = _cron_field(fields[1], 0, 23)
+        self.days = _cron_field(fields[2], 1, 31)
+        self.months = _cron_field(fields[3], 1, 12)
+        self.weekdays = _cron_field(fields[4], 0, 7)
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def matches(self, t: datetime) -> bool:
+        if t.minute not in self.minutes or t.hour not in self.hours or t.month not in self.months:
+            return False
+        day_ok = t.day in self.days
+        weekday_ok = (t.weekday() + 1) % 7 in self.weekdays
+        # Like cron: when both day fields are restricted, either one matching is enough
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+
+def parse_schedule(text: str) -> List[Cron]:
+    return [Cron(line) for line in text.split(";") if line.strip()]
+
+
+def latest_slot(crons: List[Cron], start: datetime, end: datetime) -> Optional[datetime]:
+    """Latest minute in (start, end] matching any of crons."""
+    t = end.replace(second=0, microsecond=0)
+    while t > start:
+        if any(c.matches(t) for c in crons):
+            return t
+        t -= timedelta(minutes=1)
+    return None
+
+
+@functools.lru_cache(maxsize=8)
+def season_open(day: date) -> bool:
+    from main import in_active_season
+    return in_active_season(day)
+
+
+def load_leagues(path: str = "") -> List[Dict]:
+    """League specs from a batch file, or the single league configured in the environment."""
+    path = path or os.environ.get("LEAGUES_FILE", "").strip()
+    if path:
+        from batch import load_specs
+        return load_specs(path)
+    league_id = os.environ.get("LEAGUE_ID", "").strip()
+    season = os.environ.get("SEASON", "").strip()
+    if not (league_id and season):
+        raise RuntimeError("Set LEAGUES_FILE or LEAGUE_ID and SEASON")
+    return [{"league_id": league_id, "season": season, "recipient": os.environ.get("RECIPIENT_EMAIL", "").strip(),
+             "managers": load_managers()}]
+
+
+def spec_jobs(spec: Dict) -> List[str]:
+    return [job for job in spec.get("jobs") or JOBS if job in JOBS]
+
+
+def run_key(job: str, spec: Dict) -> str:
+    return f"{job}:{spec.get('league_id')}:{spec.get('season')}"
+
+
+class LeagueClients:
+    """espn_api League objects shared by the runs of one tick, built once per league on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._clients: Dict[Tuple[str, str], object] = {}
+
+    def get(self, spec: Dict):
+        from espn_cache import cached_league
+        key = (str(spec.get("league_id")), str(spec.get("season")))
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            league = self._clients.get(key)
+            if league is None:
+                with metrics.span("league"):
+                    league = cached_league(key[0], key[1],
+                                           espn_s2=spec.get("espn_s2") or os.environ.get("ESPN_S2", "").strip(),
+                                           swid=spec.get("swid") or os.environ.get("SWID", "").strip())
+                self._clients[key] = league
+            return league
+
+
+def run_job(job: str, spec: Dict, clients: LeagueClients, today: date) -> str:
+    """Run one job for one league; returns a short outcome for the log and state file."""
+    recipient = (spec.get("recipient") or "").strip()
+    if job == "luck":
+        if not season_open(today):
+            return "off-season"
+        from batch import run_league
+        result = run_league(spec)
+        if "error" in result:
+            # Some managers' copies failed; the retry sends only those
+            raise RuntimeError(result["error"])
+        return "unchanged" if result.get("skipped") else ("sent" if result["sent"] else "rendered")
+    managers = load_managers(spec)
+    if not (recipient or managers):
+        return "no recipient"
+    league = clients.get(spec)
+    if job == "roster":
+        from email_smtp import smtp_settings
+        from roster_updates import send_digest
+        sent = send_digest(league, recipient, smtp_settings(), managers)
+    else:
+        from weekly_summary import send_summary
+        sent = send_summary(league, recipient, managers)
+    return "sent" if sent else "unchanged"
+
+
+class Daemon:
+    def __init__(self, leagues: List[Dict], schedules: Optional[Dict[str, str]] = None,
+                 state_dir: str = DAEMON_STATE_DIR, concurrency: int = DAEMON_CONCURRENCY):
+        self.leagues = leagues
+        self.schedules = {job: parse_schedule(text) for job, text in (schedules or SCHEDULES).items()}
+        self.state_path = os.path.join(state_dir, "state.json")
+        self.lock_path = os.path.join(state_dir, "daemon.lock")
+        self.concurrency = max(1, concurrency)
+        self._state_lock = threading.Lock()
+        self.state = self._load_state()
+        self._lock_file = None
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def acquire(self) -> None:
+        """Take the single-instance lock; a second daemon on the same state directory exits."""
+        import fcntl
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        f = open(self.lock_path, "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            raise RuntimeError(f"Another daemon holds {self.lock_path}")
+        f.write(str(os.getpid()))
+        f.flush()
+        self._lock_file = f
+
+    def due(self, now: datetime, force: Tuple[str, ...] = ()) -> List[Tuple[str, Dict, float]]:
+        """(job, spec, slot) for every run due at now; slot is the schedule minute it covers."""
+        window_start = now - timedelta(seconds=DAEMON_CATCHUP)
+        slots: Dict[str, float] = {}
+        for job, crons in self.schedules.items():
+            if job in force:
+                slots[job] = now.replace(second=0, microsecond=0).timestamp()
+                continue
+            slot = latest_slot(crons, window_start, now)
+            if slot is not None:
+                slots[job] = slot.timestamp()
+        out = []
+        for spec in self.leagues:
+            for job in spec_jobs(spec):
+                slot = slots.get(job)
+                if slot is None:
+                    continue
+                entry = self.state.get(run_key(job, spec), {})
+                if entry.get("slot", 0) >= slot and job not in force:
+                    continue
+                if entry.get("retry_slot") == slot and now.timestamp() < entry.get("next_try", 0):
+                    continue
+                out.append((job, spec, slot))
+        return out
+
+    def _finish(self, job: str, spec: Dict, slot: float, outcome: str, error: str, seconds: float) -> None:
+        key = run_key(job, spec)
+        with self._state_lock:
+            entry = dict(self.state.get(key, {}))
+            entry.update(finished=time.time(), seconds=round(seconds, 3))
+            if not error:
+                entry.update(slot=slot, status=outcome, error="", attempts=0)
+                entry.pop("retry_slot", None)
+                entry.pop("next_try", None)
+            else:
+                attempts = (entry.get("attempts", 0) if entry.get("retry_slot") == slot else 0) + 1
+                entry.update(error=error, attempts=attempts)
+                if attempts >= DAEMON_RETRIES:
+                    # Give up on this slot; the next scheduled one tries again
+                    entry.update(slot=slot, status="failed")
+                    entry.pop("retry_slot", None)
+                    entry.pop("next_try", None)
+                else:
+                    entry.update(status="retrying", retry_slot=slot,
+                                 next_try=time.time() + DAEMON_RETRY_DELAY * 2 ** (attempts - 1))
+            self.state[key] = entry
+            self._save_state()
+
+    def _run(self, job: str, spec: Dict, slot: float, today: date,
+             clients: LeagueClients) -> Tuple[str, str, float]:
+        start = time.perf_counter()
+        outcome, error = "", ""
+        try:
+            outcome = run_job(job, spec, clients, today)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - start
+        metrics.record(f"run_{job}", seconds)
+        self._finish(job, spec, slot, outcome, error, seconds)
+        print(f"{job} {spec.get('league_id')}/{spec.get('season')}: {error or outcome} in {seconds:.2f}s", flush=True)
+        return outcome, error, seconds
+
+    def tick(self, now: Optional[datetime] = None, force: Tuple[str, ...] = ()) -> List[Tuple[str, str, float]]:
+        """Run everything due at now concurrently and wait for it; returns (outcome, error, seconds) per run."""
+        now = now or datetime.now(timezone.utc)
+        runs = self.due(now, force)
+        if not runs:
+            return []
+        from main import today_eastern
+        today = today_eastern()
+        clients = LeagueClients()
+        with metrics.run("daemon", runs=len(runs)):
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(runs))) as pool:
+                futures = [pool.submit(self._run, job, spec, slot, today, clients) for job, spec, slot in runs]
+                return [f.result() for f in futures]
+
+    def serve(self, stop: threading.Event, tick: float = DAEMON_TICK) -> None:
+        while not stop.is_set():
+            self.tick()
+            stop.wait(tick)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(prog="cli.py daemon", description="Run the report jobs on their schedules.")
+    ap.add_argument("--once", action="store_true", help="run whatever is due now, then exit")
+    ap.add_argument("--force", default="", help="comma-separated jobs to run now regardless of schedule")
+    ap.add_argument("--leagues", default="", help="league specs file (default LEAGUES_FILE, else the env league)")
+    args = ap.parse_args(argv)
+    force = tuple(j.strip() for j in args.force.split(",") if j.strip())
+    unknown = [j for j in force if j not in JOBS]
+    if unknown:
+        ap.error(f"unknown job(s): {', '.join(unknown)}")
+
+    daemon = Daemon(load_leagues(args.leagues))
+    daemon.acquire()
+    if args.once or force:
+        results = daemon.tick(force=force)
+        if any(error for _, error, _ in results):
+            sys.exit(1)
+        return
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # Finish the runs in flight, save state, then exit
+        signal.signal(sig, lambda *_: stop.set())
+    print(f"Scheduling {', '.join(JOBS)} for {len(daemon.leagues)} league(s); tick {DAEMON_TICK:g}s", flush=True)
+    daemon.serve(stop)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,23 @@
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 
+import metrics
+
 
 def send_via_sendgrid(api_key, sender, recipient, subject, markdown):
     if not all([api_key, sender, recipient]):
         raise RuntimeError("Missing SendGrid secrets (API key / sender / recipient).")
     html = f'<pre style="font-family:ui-monospace,Menlo,monospace;white-space:pre-wrap;">{markdown}</pre>'
+    # Comma-separated recipients each get their own copy
+    recipients = [r.strip() for r in recipient.split(",") if r.strip()]
     message = Mail(
         from_email=sender,
-        to_emails=recipient,
+        to_emails=recipients,
+        is_multiple=len(recipients) > 1,
         subject=subject,
         html_content=html
     )
     sg = SendGridAPIClient(api_key)
-    sg.send(message)
+    with metrics.span("sendgrid_send"):
+        sg.send(message)
+    metrics.count("sendgrid_bytes", nbytes=len(html), calls=len(recipients))
@@ -1,19 +1,189 @@
-import smtplib, ssl
+import os
+import ssl
+import time
+import queue
+import random
+import smtplib
+import threading
 from email.mime.text import MIMEText
+from typing import Dict, List, Optional, Sequence, Union
+
+import metrics
+
+# Outbox tuning: parallel connections, messages sent over one login before reconnecting,
+# recipients per message (one RCPT TO each) and retries for transient failures.
+SMTP_CONNECTIONS = int(os.environ.get("SMTP_CONNECTIONS", "1"))
+SMTP_MESSAGES_PER_CONNECTION = int(os.environ.get("SMTP_MESSAGES_PER_CONNECTION", "50"))
+SMTP_MAX_RECIPIENTS = int(os.environ.get("SMTP_MAX_RECIPIENTS", "50"))
+SMTP_RETRIES = int(os.environ.get("SMTP_RETRIES", "3"))
+SMTP_BACKOFF = float(os.environ.get("SMTP_BACKOFF", "2.0"))
+
+
+def render_html(markdown: str) -> str:
+    # Render Markdown as preformatted text in HTML so alignment stays perfect
+    return f'<pre style="font-family:ui-monospace,Menlo,monospace;white-space:pre-wrap;">{markdown}</pre>'
+
+
+def split_recipients(recipient: Union[str, Sequence[str]]) -> List[str]:
+    if isinstance(recipient, str):
+        recipient = recipient.split(",")
+    return [r.strip() for r in recipient if r and r.strip()]
+
+
+def _transient(e: Exception) -> bool:
+    if isinstance(e, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in e.recipients.values())
+    if isinstance(e, smtplib.SMTPResponseException):
+        return 400 <= e.smtp_code < 500
+    return isinstance(e, OSError)
+
+
+class SmtpOutbox:
+    """
+    Queue rendered reports and deliver them over a few long-lived, authenticated SMTP
+    connections. Messages with more than max_recipients recipients are split into
+    batches; transient failures (disconnects, 4xx replies) are retried with jittered
+    exponential backoff on a fresh connection. Set starttls=False and leave username
+    empty to talk to a plain local SMTP server.
+    """
+
+    def __init__(self, smtp_server, smtp_port, username, password, sender,
+                 connections: int = SMTP_CONNECTIONS, per_connection: int = SMTP_MESSAGES_PER_CONNECTION,
+                 max_recipients: int = SMTP_MAX_RECIPIENTS, retries: int = SMTP_RETRIES,
+                 backoff: float = SMTP_BACKOFF, starttls: bool = True, timeout: float = 30):
+        self.smtp_server = smtp_server
+        self.smtp_port = int(smtp_port)
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.connections = max(1, connections)
+        self.per_connection = max(1, per_connection)
+        self.max_recipients = max(1, max_recipients)
+        self.retries = retries
+        self.backoff = backoff
+        self.starttls = starttls
+        self.timeout = timeout
+        self._pending: List[Dict] = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def add(self, recipient: Union[str, Sequence[str]], subject: str, markdown: str) -> int:
+        """Queue one report; returns its id, which flush() results refer to."""
+        recipients = split_recipients(recipient)
+        html = render_html(markdown)
+        with self._lock:
+            msg_id = self._next_id
+            self._next_id += 1
+            for i in range(0, len(recipients), self.max_recipients):
+                self._pending.append({
+                    "id": msg_id, "recipients": recipients[i:i + self.max_recipients],
+                    "subject": subject, "html": html,
+                })
+        return msg_id
+
+    def _connect(self) -> smtplib.SMTP:
+        metrics.count("smtp_connect")
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        if self.starttls:
+            server.starttls(context=ssl.create_default_context())
+        if self.username:
+            server.login(self.username, self.password)
+        return server
+
+    def _close(self, server: Optional[smtplib.SMTP]) -> None:
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _send(self, server: smtplib.SMTP, job: Dict) -> Dict:
+        msg = MIMEText(job["html"], "html")
+        msg["Subject"] = job["subject"]
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(job["recipients"])
+        payload = msg.as_string()
+        with metrics.span("smtp_send"):
+            refused = server.sendmail(self.sender, job["recipients"], payload)
+        metrics.count("smtp_bytes", nbytes=len(payload), calls=len(job["recipients"]))
+        return {str(k): v[0] for k, v in (refused or {}).items()}
+
+    def _worker(self, jobs: "queue.Queue[Dict]", results: List[Dict], lock: threading.Lock) -> None:
+        server: Optional[smtplib.SMTP] = None
+        sent_on_connection = 0
+        try:
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                attempt = 0
+                while True:
+                    try:
+                        if server is None or sent_on_connection >= self.per_connection:
+                            self._close(server)
+                            server = None
+                            server = self._connect()
+                            sent_on_connection = 0
+                        refused = self._send(server, job)
+                        sent_on_connection += 1
+                        result = {"id": job["id"], "recipients": job["recipients"], "refused": refused}
+                        break
+                    except Exception as e:
+                        # Drop the connection; it may be half-open after an error
+                        self._close(server)
+                        server = None
+                        if attempt >= self.retries or not _transient(e):
+                            result = {"id": job["id"], "recipients": job["recipients"],
+                                      "error": f"{type(e).__name__}: {e}"}
+                            break
+                        time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+                        attempt += 1
+                with lock:
+                    results.append(result)
+        finally:
+            self._close(server)
+
+    def flush(self) -> List[Dict]:
+        """Deliver everything queued. One result per recipient batch, in queue order."""
+        jobs: "queue.Queue[Dict]" = queue.Queue()
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for job in pending:
+            jobs.put(job)
+        results: List[Dict] = []
+        lock = threading.Lock()
+        workers = [threading.Thread(target=self._worker, args=(jobs, results, lock))
+                   for _ in range(min(self.connections, jobs.qsize()))]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        results.sort(key=lambda r: r["id"])
+        return results
+
+
+def smtp_settings() -> Dict:
+    """SMTP connection settings from the environment, as send_via_smtp keyword arguments."""
+    smtp_server = os.environ.get("SMTP_SERVER", "").strip()
+    smtp_port = os.environ.get("SMTP_PORT", "").strip()
+    smtp_username = os.environ.get("SMTP_USERNAME", "").strip()
+    smtp_password = os.environ.get("SMTP_PASSWORD", "").strip()
+    sender_email = os.environ.get("SENDER_EMAIL", "").strip()
+    if not (smtp_server and smtp_username and smtp_password and sender_email):
+        raise RuntimeError("Missing SMTP credentials")
+    return {"smtp_server": smtp_server, "smtp_port": int(smtp_port or 587), "username": smtp_username,
+            "password": smtp_password, "sender": sender_email}
 
 
 def send_via_smtp(smtp_server, smtp_port, username, password, sender, recipient, subject, markdown):
     if not all([smtp_server, smtp_port, username, password, sender, recipient]):
         raise RuntimeError("Missing SMTP secrets (server/port/username/password/sender/recipient).")
-    # Render Markdown as preformatted text in HTML so alignment stays perfect
-    html = f'<pre style="font-family:ui-monospace,Menlo,monospace;white-space:pre-wrap;">{markdown}</pre>'
-    msg = MIMEText(html, "html")
-    msg["Subject"] = subject
-    msg["From"] = sender
-    msg["To"] = recipient
-
-    context = ssl.create_default_context()
-    with smtplib.SMTP(smtp_server, smtp_port) as server:
-        server.starttls(context=context)
-        server.login(username, password)
-        server.sendmail(sender, [recipient], msg.as_string())
+    outbox = SmtpOutbox(smtp_server, smtp_port, username, password, sender)
+    outbox.add(recipient, subject, markdown)
+    for result in outbox.flush():
+        if "error" in result:
+            raise RuntimeError(f"SMTP delivery to {', '.join(result['recipients'])} failed: {result['error']}")
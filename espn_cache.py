@@ -0,0 +1,346 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import functools
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# On-disk cache for ESPN responses, shared by main.py, roster_updates.py and weekly_summary.py.
+# Entries are keyed by league/season/view set. A fresh entry (younger than CACHE_TTL) is served
+# without touching the network; a stale one is revalidated with ETag/Last-Modified.
+# cached_stream() hands the body over in chunks, teeing a download into the cache as it is
+# read, for callers that parse incrementally (espn_stream) and never need it whole.
+CACHE_DIR = os.environ.get("ESPN_CACHE_DIR", ".cache/espn").strip()
+CACHE_TTL = float(os.environ.get("ESPN_CACHE_TTL", "600"))
+CACHE_MAX_AGE = float(os.environ.get("ESPN_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+CACHE_MAX_BYTES = int(os.environ.get("ESPN_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Send every ESPN request to another host instead (e.g. benchmarks/espn_server.py); paths
+# and query strings are kept. Empty means ESPN itself.
+ESPN_BASE_URL = os.environ.get("ESPN_BASE_URL", "").strip().rstrip("/")
+
+
+def espn_url(url: str) -> str:
+    if not ESPN_BASE_URL:
+        return url
+    parts = urlsplit(url)
+    return ESPN_BASE_URL + parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def cookie_identity(cookies: Optional[Dict]) -> str:
+    """Short hash of the espn_s2/SWID pair a response was fetched with ("" without them)."""
+    cookies = cookies or {}
+    if not (cookies.get("espn_s2") or cookies.get("SWID")):
+        return ""
+    raw = f"{cookies.get('SWID', '')}|{cookies.get('espn_s2', '')}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def cache_key(league_id, season, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+              cookies: Optional[Dict] = None) -> str:
+    # cookies: a private league's body depends on who asks, so each login gets its own entry
+    params = dict(params or {})
+    views = params.pop("view", [])
+    if isinstance(views, str):
+        views = [views]
+    parts = {
+        "view": sorted(views),
+        "params": sorted((str(k), str(v)) for k, v in params.items()),
+        "filter": (headers or {}).get("x-fantasy-filter", ""),
+        "auth": cookie_identity(cookies),
+    }
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return f"{league_id}_{season}_{digest}"
+
+
+class ResponseCache:
+    def __init__(self, root: str = CACHE_DIR, ttl: float = CACHE_TTL,
+                 max_age: float = CACHE_MAX_AGE, max_bytes: int = CACHE_MAX_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.root, key)
+        return base + ".body", base + ".meta"
+
+    def lookup(self, key: str, read_body: bool = True) -> Optional[Dict]:
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if read_body:
+                with open(body_path, "rb") as f:
+                    meta["body"] = f.read()
+            # Body mtime doubles as the last-access time for LRU eviction. Inside the try: a
+            # concurrent evict() may remove the entry at any point
+            os.utime(body_path)
+        except (OSError, ValueError):
+            return None
+        meta["fresh"] = (time.time() - meta.get("fetched_at", 0)) < self.ttl
+        return meta
+
+    def open_body(self, key: str):
+        """The entry's body opened for reading, or None once it has been evicted."""
+        try:
+            return open(self._paths(key)[0], "rb")
+        except OSError:
+            return None
+
+    def store(self, key: str, body: bytes, etag: str = "", last_modified: str = "",
+              request: Optional[Dict] = None) -> None:
+        # request: url/params/filter of the GET, kept so the entry can be replayed later
+        for _ in self.tee(key, [body], etag, last_modified, request):
+            pass
+
+    def tee(self, key: str, chunks: Iterable[bytes], etag: str = "", last_modified: str = "",
+            request: Optional[Dict] = None) -> Iterator[bytes]:
+        """Yield chunks while writing them to the entry; it is stored once the last one went through."""
+        os.makedirs(self.root, exist_ok=True)
+        body_path, meta_path = self._paths(key)
+        # Write to temp files then rename so concurrent jobs never read a torn entry
+        tmp = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        size = 0
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+        except BaseException:
+            # Cut short (dropped connection, a reader that gave up): keep the old entry
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        os.replace(tmp, body_path)
+        meta = {"etag": etag, "last_modified": last_modified, "fetched_at": time.time(), "size": size}
+        if request:
+            meta["request"] = request
+        tmp = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(json.dumps(meta))
+        os.replace(tmp, meta_path)
+        self.evict()
+
+    def revalidated(self, key: str) -> None:
+        _, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        meta["fetched_at"] = time.time()
+        tmp = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def evict(self) -> None:
+        if not os.path.isdir(self.root):
+            return
+        now = time.time()
+        entries: List[Tuple[float, int, str]] = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".body"):
+                continue
+            key = name[:-len(".body")]
+            try:
+                st = os.stat(os.path.join(self.root, name))
+            except OSError:
+                continue
+            if now - st.st_mtime > self.max_age:
+                self.remove(key)
+                continue
+            entries.append((st.st_mtime, st.st_size, key))
+        total = sum(size for _, size, _ in entries)
+        # Drop least recently used entries until we fit the size budget
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= size
+
+    def remove(self, key: str) -> None:
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def default_cache() -> ResponseCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
+
+
+def cached_get(url: str, key: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+               cookies: Optional[Dict] = None, cache: Optional[ResponseCache] = None) -> Tuple[int, bytes]:
+    """
+    GET url through the response cache. Returns (status, body); status is 200 for
+    anything served from cache, so callers handle errors exactly as before.
+    """
+    import metrics
+    from http_transport import default_transport
+    cache = cache or default_cache()
+    entry = cache.lookup(key)
+    if entry and entry["fresh"]:
+        metrics.count("espn_cache_hit", nbytes=len(entry["body"]))
+        return 200, entry["body"]
+
+    with metrics.span("espn_http"):
+        r = default_transport().get(url, params=params, headers=_conditional(headers, entry), cookies=cookies)
+    metrics.count(f"espn_http_{r.status_code}", nbytes=len(r.content))
+    if r.status_code == 304 and entry:
+        cache.revalidated(key)
+        return 200, entry["body"]
+    if r.status_code == 200:
+        request = {"url": url, "params": params or {}, "filter": (headers or {}).get("x-fantasy-filter", "")}
+        cache.store(key, r.content, r.headers.get("ETag", ""), r.headers.get("Last-Modified", ""), request)
+    return r.status_code, r.content
+
+
+def _conditional(headers: Optional[Dict], entry: Optional[Dict]) -> Dict:
+    # Revalidate a stale entry instead of downloading it again
+    out = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            out["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            out["If-Modified-Since"] = entry["last_modified"]
+    return out
+
+
+def _file_chunks(f, size: int) -> Iterator[bytes]:
+    with f:
+        for chunk in iter(lambda: f.read(size), b""):
+            yield chunk
+
+
+def _response_chunks(r, size: int) -> Iterator[bytes]:
+    import metrics
+    nbytes = 0
+    try:
+        for chunk in r.iter_content(size):
+            nbytes += len(chunk)
+            yield chunk
+    finally:
+        r.close()
+        metrics.count(f"espn_http_{r.status_code}", nbytes=nbytes)
+
+
+def cached_stream(url: str, key: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                  cookies: Optional[Dict] = None, cache: Optional[ResponseCache] = None,
+                  chunk_size: int = 64 * 1024) -> Tuple[int, Iterator[bytes]]:
+    """
+    cached_get() with the body as an iterator of chunks. A cached body is read from its
+    file; a download is written to the cache as the caller consumes it and only stored
+    once it is read to the end. Error bodies come back as a single chunk.
+    """
+    import metrics
+    from http_transport import default_transport
+    cache = cache or default_cache()
+    entry = cache.lookup(key, read_body=False)
+    if entry and entry["fresh"]:
+        f = cache.open_body(key)
+        if f is not None:
+            metrics.count("espn_cache_hit", nbytes=entry.get("size", 0))
+            return 200, _file_chunks(f, chunk_size)
+
+    with metrics.span("espn_http"):
+        r = default_transport().get(url, params=params, headers=_conditional(headers, entry), cookies=cookies,
+                                    stream=True)
+    if r.status_code == 304 and entry:
+        r.close()
+        metrics.count("espn_http_304")
+        f = cache.open_body(key)
+        if f is not None:
+            cache.revalidated(key)
+            return 200, _file_chunks(f, chunk_size)
+        # Evicted since the lookup: fetch it again in full
+        status, body = cached_get(url, key, params=params, headers=headers, cookies=cookies, cache=cache)
+        return status, iter([body])
+    if r.status_code == 200:
+        request = {"url": url, "params": params or {}, "filter": (headers or {}).get("x-fantasy-filter", "")}
+        return 200, cache.tee(key, _response_chunks(r, chunk_size), r.headers.get("ETag", ""),
+                              r.headers.get("Last-Modified", ""), request)
+    metrics.count(f"espn_http_{r.status_code}", nbytes=len(r.content))
+    return r.status_code, iter([r.content])
+
+
+def _alternate_league_get(espn_request, cache: ResponseCache, key: str, params: Optional[Dict],
+                          headers: Optional[Dict], extend: str) -> Tuple[int, bytes]:
+    # espn_api's 401 handling: retry the league on its other endpoint (leagueHistory vs the
+    # season's segment), keeping it on success. Done here so the retry goes through the cache
+    # and the shared transport, not a bare requests.get.
+    original = espn_request.LEAGUE_ENDPOINT
+    if "/leagueHistory/" in original:
+        base = original.split("/leagueHistory/")[0]
+        alternate = f"{base}/seasons/{espn_request.year}/segments/0/leagues/{espn_request.league_id}"
+    else:
+        base = original.split("/seasons/")[0]
+        alternate = f"{base}/leagueHistory/{espn_request.league_id}?seasonId={espn_request.year}"
+    status, body = cached_get(alternate + extend, key, params=params, headers=headers,
+                              cookies=espn_request.cookies, cache=cache)
+    if status == 200:
+        espn_request.LEAGUE_ENDPOINT = alternate
+    return status, body
+
+
+def _raise_for_status(espn_request, status: int) -> None:
+    # espn_api's exceptions for a failed GET, without its own network retry on 401
+    if status == 401:
+        from espn_api.requests.espn_requests import ESPNAccessDenied
+        cookies = espn_request.cookies or {}
+        if "espn_s2" not in cookies or "SWID" not in cookies:
+            raise ESPNAccessDenied("espn_s2 and swid are required")
+        raise ESPNAccessDenied(f"League {espn_request.league_id} cannot be accessed with the provided credentials")
+    espn_request.checkRequestStatus(status)
+
+
+def _cached_request(espn_request, cache: ResponseCache, endpoint_attr: str,
+                    params: dict = None, headers: dict = None, extend: str = ""):
+    url = getattr(espn_request, endpoint_attr) + extend
+    # Season-wide endpoints (pro schedule, player pool) are public and shared by every league
+    league = endpoint_attr == "LEAGUE_ENDPOINT"
+    key = cache_key(espn_request.league_id if league else "season", espn_request.year,
+                    dict(params or {}, endpoint=endpoint_attr, extend=extend), headers,
+                    espn_request.cookies if league else None)
+    status, body = cached_get(url, key, params=params, headers=headers, cookies=espn_request.cookies, cache=cache)
+    if status == 401 and endpoint_attr == "LEAGUE_ENDPOINT":
+        status, body = _alternate_league_get(espn_request, cache, key, params, headers, extend)
+    if status != 200:
+        _raise_for_status(espn_request, status)
+    data = json.loads(body)
+    if endpoint_attr == "LEAGUE_ENDPOINT" and isinstance(data, list):
+        return data[0]
+    return data
+
+
+def install_cache(espn_request, cache: Optional[ResponseCache] = None) -> None:
+    """Route an espn_api EspnFantasyRequests instance's league/season GETs through the cache."""
+    cache = cache or default_cache()
+    espn_request.league_get = functools.partial(_cached_request, espn_request, cache, "LEAGUE_ENDPOINT")
+    espn_request.get = functools.partial(_cached_request, espn_request, cache, "ENDPOINT")
+
+
+def cached_league(league_id, season, espn_s2=None, swid=None, cache: Optional[ResponseCache] = None):
+    from espn_api.football import League
+    from http_transport import install_transport
+    league = League(int(league_id), int(season), espn_s2=espn_s2, swid=swid, fetch_league=False)
+    if ESPN_BASE_URL:
+        req = league.espn_request
+        req.ENDPOINT, req.LEAGUE_ENDPOINT, req.NEWS_ENDPOINT = (
+            espn_url(req.ENDPOINT), espn_url(req.LEAGUE_ENDPOINT), espn_url(req.NEWS_ENDPOINT))
+    install_cache(league.espn_request, cache)
+    install_transport(league.espn_request)
+    league.fetch_league()
+    return league
@@ -0,0 +1,226 @@
+import re
+import json
+import codecs
+import json.scanner
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+# Streaming, field-selective JSON parser for ESPN payloads. project() reads the body chunk
+# by chunk and materializes only the paths named in a field spec; everything else is
+# skipped, so adding heavy views (rosters, schedules) to a request doesn't grow the object
+# tree the luck report has to build.
+#
+# A spec mirrors the shape of the data:
+#   True          keep this value as-is
+#   {"k": spec}   object: keep only the listed keys
+#   [spec]        array: project every element
+# e.g. {"teams": [{"location": True, "record": {"overall": {"wins": True}}}]}
+CHUNK_SIZE = 64 * 1024
+
+_WS = re.compile(r"[ \t\n\r]*")
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_SCALAR = re.compile(rf'{_STRING}|[-+0-9.eEa-z]+', re.S)
+_KEY = re.compile(rf'[ \t\n\r]*"({_STRING[1:-1]})"[ \t\n\r]*:', re.S)
+_OBJECT_SEP = re.compile(r"[ \t\n\r]*([,}])")
+_ARRAY_SEP = re.compile(r"[ \t\n\r]*([,\]])")
+_NUMBER_START = frozenset("-0123456789")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+
+def _skip_pattern(depth: int) -> "re.Pattern":
+    # Scalars, strings and bracketed groups nested up to `depth` deep, consumed in one match.
+    # re has no recursion, so each level wraps the previous; possessive quantifiers keep a
+    # group cut off by the buffer end from backtracking.
+    atom = r'[^"{}\[\]]++|"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+    body = f"(?:{atom})*+"
+    for _ in range(depth):
+        body = f"(?:{atom}|[{{\\[]{body}[}}\\]])*+"
+    return re.compile(body, re.S)
+
+
+_SKIP = _skip_pattern(6)
+_scan_once = json.scanner.make_scanner(json.JSONDecoder())
+
+
+def iter_chunks(body: bytes, size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    view = memoryview(body)
+    for i in range(0, len(view), size):
+        yield view[i:i + size]
+
+
+class _Reader:
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        # Drop what's been consumed and append the next chunk; False once the body is exhausted
+        if self.eof:
+            return False
+        text = ""
+        while not text:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self.decoder.decode(b"", final=True)
+                break
+            text = self.decoder.decode(bytes(chunk))
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return bool(text)
+
+    def _error(self, what: str) -> ValueError:
+        return ValueError(f"Malformed JSON: {what} near {self.buf[self.pos:self.pos + 40]!r}")
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise self._error("unexpected end of input")
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise self._error(f"expected {ch!r}")
+        self.pos += 1
+
+    def _match(self, pattern: "re.Pattern") -> Optional["re.Match"]:
+        # A match running into the end of the buffer may continue in the next chunk
+        while True:
+            m = pattern.match(self.buf, self.pos)
+            if m is not None and (m.end() < len(self.buf) or self.eof):
+                return m
+            if not self._fill() and m is None:
+                return None
+
+    def _scan(self) -> Optional[Tuple[Any, int]]:
+        # Decode the value at the cursor with the C scanner if it ends inside the buffer.
+        # None means it runs past the buffer, or might: a number cut at "12." scans as 12.
+        try:
+            value, end = _scan_once(self.buf, self.pos)
+        except (StopIteration, ValueError):
+            return None
+        if not self.eof and (end == len(self.buf) or (
+                self.buf[self.pos] in _NUMBER_START and _NUMBER_TAIL.match(self.buf, end).end() == len(self.buf))):
+            return None
+        return value, end
+
+    def _read_scalar(self) -> Any:
+        # Strings and numbers are small: pull chunks until the whole token is buffered
+        while True:
+            scanned = self._scan()
+            if scanned is not None:
+                value, self.pos = scanned
+                return value
+            if not self._fill() and self._scan() is None:
+                raise self._error("unexpected token")
+
+    def _members(self) -> Iterator[str]:
+        # Yields each key of the object at the cursor, leaving the cursor on its value
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            m = self._match(_KEY)
+            if m is None:
+                raise self._error("expected object key")
+            key = m.group(1)
+            if "\\" in key:
+                key = json.decoder.scanstring(m.group(0), m.start(1) - m.start())[0]
+            self.pos = m.end()
+            yield key
+            m = self._match(_OBJECT_SEP)
+            if m is None:
+                raise self._error("expected ',' or '}'")
+            self.pos = m.end()
+            if m.group(1) == "}":
+                return
+
+    def _elements(self) -> Iterator[None]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield None
+            m = self._match(_ARRAY_SEP)
+            if m is None:
+                raise self._error("expected ',' or ']'")
+            self.pos = m.end()
+            if m.group(1) == "]":
+                return
+
+    def skip_value(self) -> None:
+        # Scans past the value without building anything. One regex match consumes whole
+        # runs of scalars, strings and shallow groups; only deeper brackets cost a loop turn.
+        ch = self.peek()
+        if ch not in "{[":
+            m = self._match(_SCALAR)
+            if m is None:
+                raise self._error("unexpected token")
+            self.pos = m.end()
+            return
+        self.pos += 1
+        depth = 1
+        while True:
+            self.pos = _SKIP.match(self.buf, self.pos).end()
+            if self.pos == len(self.buf) or self.buf[self.pos] == '"':
+                # End of buffer, or a string cut off by the chunk boundary
+                if not self._fill():
+                    raise self._error("unexpected end of input")
+                continue
+            depth += 1 if self.buf[self.pos] in "{[" else -1
+            self.pos += 1
+            if depth == 0:
+                return
+
+    def read_value(self, spec: Any = True) -> Any:
+        ch = self.peek()
+        if ch not in "{[":
+            return self._read_scalar()
+        if spec is True:
+            scanned = self._scan()
+            if scanned is not None:
+                value, self.pos = scanned
+                return value
+        elif not isinstance(spec, dict if ch == "{" else list):
+            self.skip_value()
+            return None
+        if ch == "{":
+            out = {}
+            for key in self._members():
+                if spec is True:
+                    out[key] = self.read_value()
+                elif key in spec:
+                    out[key] = self.read_value(spec[key])
+                else:
+                    self.skip_value()
+            return out
+        item = True if spec is True else spec[0]
+        return [self.read_value(item) for _ in self._elements()]
+
+
+def project(chunks: Iterable[bytes], spec: Any) -> Any:
+    """
+    Parse a JSON body (an iterable of byte chunks) keeping only the fields in spec.
+    A top-level array with an object spec is projected element-wise, which covers the
+    list-shaped leagueHistory responses.
+    """
+    reader = _Reader(chunks)
+    if isinstance(spec, dict) and reader.peek() == "[":
+        spec = [spec]
+    value = reader.read_value(spec)
+    while True:
+        reader.pos = _WS.match(reader.buf, reader.pos).end()
+        if reader.pos < len(reader.buf):
+            raise reader._error("trailing data")
+        if not reader._fill():
+            return value
+
+
+def project_bytes(body: bytes, spec: Any, chunk_size: int = CHUNK_SIZE) -> Any:
+    return project(iter_chunks(body, chunk_size), spec)
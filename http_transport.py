@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from rate_limit import (AdaptiveLimiter, HTTP_RETRIES, RETRY_STATUSES, THROTTLE_STATUSES,
+                        backoff_delay, retry_after_seconds)
+
+# Shared HTTP transport for every ESPN call. One pooled requests.Session per host keeps
+# TCP/TLS connections alive across requests (multi-view, multi-league and espn_api
+# fetches alike), always asks for compressed bodies, and a per-host semaphore bounds how
+# many requests are in flight to one host at a time. Requests also pass through the host's
+# rate_limit.AdaptiveLimiter; 429/5xx responses and connection errors are retried with
+# jittered backoff (or the server's Retry-After), and the last response is returned.
+HTTP_HOST_CONCURRENCY = int(os.environ.get("HTTP_HOST_CONCURRENCY", "4"))
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "30"))
+ACCEPT_ENCODING = "gzip, deflate"
+
+
+class Transport:
+    def __init__(self, host_concurrency: int = HTTP_HOST_CONCURRENCY, timeout: float = HTTP_TIMEOUT):
+        self.host_concurrency = max(1, host_concurrency)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, object] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._limiters: Dict[str, "AdaptiveLimiter"] = {}
+        self.retries = HTTP_RETRIES
+
+    def _session(self, host: str):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                # Pool as many connections as requests we allow in flight; block rather
+                # than open throwaway connections past that
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.host_concurrency, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Accept-Encoding": ACCEPT_ENCODING, "Connection": "keep-alive"})
+                self._sessions[host] = session
+                self._slots[host] = threading.BoundedSemaphore(self.host_concurrency)
+                self._limiters[host] = AdaptiveLimiter()
+            return session, self._slots[host], self._limiters[host]
+
+    def limiter(self, url: str) -> "AdaptiveLimiter":
+        return self._session(urlsplit(url).netloc)[2]
+
+    def get(self, url: str, params=None, headers: Optional[Dict] = None, cookies: Optional[Dict] = None,
+            timeout: Optional[float] = None, stream: bool = False):
+        """
+        requests.get() over the pooled session for url's host, rate limited and retried.
+        With stream, a successful response comes back with its body unread (iter_content).
+        """
+        import requests
+        import metrics
+        session, slot, limiter = self._session(urlsplit(url).netloc)
+        attempt = 0
+        while True:
+            waited = limiter.acquire()
+            if waited:
+                metrics.record("http_rate_wait", seconds=waited)
+            try:
+                with slot:
+                    r = session.get(url, params=params, headers=headers, cookies=cookies,
+                                    timeout=self.timeout if timeout is None else timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+                limiter.throttled()
+                metrics.count("http_retry")
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+            if r.status_code not in RETRY_STATUSES:
+                metrics.count("http_request", nbytes=int(r.headers.get("Content-Length") or 0) if stream
+                              else len(r.content))
+                limiter.succeeded()
+                return r
+            metrics.count("http_request", nbytes=len(r.content))
+            retry_after = retry_after_seconds(r.headers.get("Retry-After"))
+            if r.status_code in THROTTLE_STATUSES or retry_after:
+                limiter.throttled(retry_after)
+            if attempt >= self.retries:
+                return r
+            metrics.count(f"http_retry_{r.status_code}")
+            time.sleep(max(backoff_delay(attempt), retry_after or 0.0))
+            attempt += 1
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+            self._slots = {}
+            self._limiters = {}
+        for session in sessions.values():
+            session.close()
+
+
+_default_transport: Optional[Transport] = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> Transport:
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = Transport()
+        return _default_transport
+
+
+def install_transport(espn_request, transport: Optional[Transport] = None) -> None:
+    """Send an espn_api EspnFantasyRequests instance's uncached GETs (news) over the shared transport."""
+    transport = transport or default_transport()
+
+    def news_get(params: dict = None, headers: dict = None, extend: str = ""):
+        r = transport.get(espn_request.NEWS_ENDPOINT + extend, params=params, headers=headers,
+                          cookies=espn_request.cookies)
+        espn_request.checkRequestStatus(r.status_code)
+        return r.json()
+
+    espn_request.news_get = news_get
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import metrics
+
+# Injury status of every rostered player, for the weekly summary's injury section. Rostered
+# player ids come from league.teams. Statuses are fetched in batches of INJURY_BATCH ids
+# per kona_playercard request, a few batches at a time. A process-wide cache keyed by
+# (season, player id) holds each status for INJURY_TTL seconds. Leagues that share players
+# (the daemon, batch runs) look each one up once, and a player another thread is already
+# fetching is waited for, not fetched again. The cache is bounded at INJURY_CACHE_SIZE
+# entries, least recently used first out. The last delivered statuses are kept per league,
+# so the report can list only what changed since then.
+INJURY_DIR = os.environ.get("INJURY_DIR", ".cache/injuries").strip()
+INJURY_TTL = float(os.environ.get("INJURY_TTL", "900"))
+INJURY_CACHE_SIZE = int(os.environ.get("INJURY_CACHE_SIZE", "20000"))
+INJURY_BATCH = int(os.environ.get("INJURY_BATCH", "100"))
+INJURY_WORKERS = int(os.environ.get("INJURY_WORKERS", "4"))
+
+HEALTHY = frozenset({"ACTIVE", "NORMAL", ""})
+
+
+def is_injured(status: Optional[str]) -> bool:
+    return (status or "") not in HEALTHY
+
+
+def status_label(status: Optional[str]) -> str:
+    return (status or "ACTIVE").replace("_", " ").title()
+
+
+def rostered_players(league) -> Dict[int, Tuple[str, str, str, str, int]]:
+    """player id -> (team name, player name, position, roster injury status, team id) for every rostered player."""
+    out = {}
+    for team in league.teams:
+        for player in team.roster:
+            out[int(player.playerId)] = (team.team_name, player.name, getattr(player, "position", ""),
+                                         getattr(player, "injuryStatus", None) or "ACTIVE", team.team_id)
+    return out
+
+
+def fetch_statuses(league, player_ids: List[int]) -> Dict[int, str]:
+    """Injury status per player id, from one kona_playercard request."""
+    params = {"view": "kona_playercard"}
+    filters = {"players": {"filterIds": {"value": player_ids}, "limit": len(player_ids)}}
+    data = league.espn_request.league_get(params=params, headers={"x-fantasy-filter": json.dumps(filters)})
+    metrics.count("injury_fetch", calls=len(player_ids))
+    out = {}
+    for entry in data.get("players", []):
+        player = entry.get("player") or {}
+        pid = entry.get("id", player.get("id"))
+        if pid is None:
+            continue
+        status = player.get("injuryStatus") or entry.get("injuryStatus")
+        out[int(pid)] = status or ("OUT" if player.get("injured") else "ACTIVE")
+    return out
+
+
+class StatusCache:
+    """Injury status per (season, player id) shared across leagues: TTL, LRU-bounded, one fetch per player."""
+
+    def __init__(self, ttl: float = INJURY_TTL, max_entries: int = INJURY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[Tuple[int, int], threading.Event] = {}
+
+    def _fetch(self, league, player_ids: List[int], batch: int, workers: int) -> Dict[int, str]:
+        chunks = [player_ids[i:i + batch] for i in range(0, len(player_ids), batch)]
+        if not chunks:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as pool:
+            results = list(pool.map(lambda ids: fetch_statuses(league, ids), chunks))
+        out: Dict[int, str] = {}
+        for result in results:
+            out.update(result)
+        return out
+
+    def lookup(self, league, player_ids: Iterable[int], fallback: Optional[Dict[int, str]] = None,
+               batch: int = INJURY_BATCH, workers: int = INJURY_WORKERS) -> Dict[int, str]:
+        """
+        Status for each player id. Expired or missing ids are fetched; ids ESPN doesn't
+        return take their fallback status (the roster's), else ACTIVE.
+        """
+        fallback = fallback or {}
+        season = int(league.year)
+        out: Dict[int, str] = {}
+        mine: List[int] = []
+        waits: List[Tuple[int, threading.Event]] = []
+        now = time.monotonic()
+        with self._lock:
+            for pid in player_ids:
+                key = (season, pid)
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    out[pid] = entry[1]
+                elif key in self._inflight:
+                    waits.append((pid, self._inflight[key]))
+                else:
+                    self._inflight[key] = threading.Event()
+                    mine.append(pid)
+        metrics.count("injury_cache_hit", calls=len(out))
+
+        fetched: Optional[Dict[int, str]] = None
+        try:
+            fetched = self._fetch(league, mine, batch, workers)
+        finally:
+            with self._lock:
+                stamp = time.monotonic()
+                for pid in mine:
+                    key = (season, pid)
+                    if fetched is not None:
+                        status = fetched.get(pid, fallback.get(pid, "ACTIVE"))
+                        self._entries[key] = (stamp, status)
+                        self._entries.move_to_end(key)
+                        out[pid] = status
+                    self._inflight.pop(key).set()
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        for pid, event in waits:
+            event.wait()
+            with self._lock:
+                entry = self._entries.get((season, pid))
+            # The other fetch failed: fall back rather than fail this report too
+            out[pid] = entry[1] if entry is not None else fallback.get(pid, "ACTIVE")
+        return out
+
+
+_default_cache: Optional[StatusCache] = None
+_default_lock = threading.Lock()
+
+
+def default_status_cache() -> StatusCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = StatusCache()
+        return _default_cache
+
+
+def current_statuses(league, cache: Optional[StatusCache] = None) -> Tuple[Dict[int, Tuple], Dict[int, str]]:
+    """(rostered players, status per rostered player id)."""
+    players = rostered_players(league)
+    fallback = {pid: info[3] for pid, info in players.items()}
+    statuses = (cache or default_status_cache()).lookup(league, sorted(players), fallback)
+    return players, statuses
+
+
+class InjuryHistory:
+    """Statuses as of the last delivered injury report for one league, saved next to the other per-league stores."""
+
+    def __init__(self, league_id, season, root: str = INJURY_DIR):
+        self.path = os.path.join(root, f"{league_id}_{season}.json")
+        self.statuses: Optional[Dict[int, str]] = None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.statuses = {int(pid): status for pid, status in json.load(f).items()}
+        except (OSError, ValueError):
+            pass
+
+    def changes(self, statuses: Dict[int, str]) -> List[Tuple[int, Optional[str], str]]:
+        """(player id, previous status, status) for every rostered player whose status changed."""
+        previous = self.statuses or {}
+        out = []
+        for pid, status in statuses.items():
+            old = previous.get(pid)
+            if old is None:
+                # Newly rostered (or first report): only worth a line when hurt
+                if is_injured(status):
+                    out.append((pid, None, status))
+            elif old != status:
+                out.append((pid, old, status))
+        return out
+
+    def save(self, statuses: Dict[int, str]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({str(pid): status for pid, status in statuses.items()}, f)
+        os.replace(tmp, self.path)
+        self.statuses = dict(statuses)
+
+
+def history_for(league, root: Optional[str] = None) -> InjuryHistory:
+    return InjuryHistory(league.league_id, league.year, root or INJURY_DIR)
+
+
+def build_injury_lines(players: Dict[int, Tuple], statuses: Dict[int, str],
+                       changes: List[Tuple[int, Optional[str], str]], first_report: bool,
+                       row_of: Optional[Callable[[int], Optional[int]]] = None) -> List[Tuple[Optional[int], str]]:
+    """
+    Status changes by team, then how many rostered players are currently hurt, as (row, line)
+    pairs; row_of maps a team id to its TeamTable row (TeamTable.row_of; None tags nothing).
+    """
+
+    def describe(pid: int) -> str:
+        team, name, position = players[pid][:3]
+        return f"{team}: {name} ({position})" if position else f"{team}: {name}"
+
+    lines = []
+    if changes:
+        lines.append((None, "Currently injured:" if first_report else "Status changes since the last report:"))
+        for pid, old, new in sorted(changes, key=lambda c: (players[c[0]][0], players[c[0]][1])):
+            moved = status_label(new) if old is None else f"{status_label(old)} -> {status_label(new)}"
+            row = row_of(players[pid][4]) if row_of else None
+            lines.append((row, f"- {describe(pid)} {moved}"))
+    elif not first_report:
+        lines.append((None, "No injury status changes since the last report."))
+    hurt = sum(1 for status in statuses.values() if is_injured(status))
+    lines.append((None, f"{hurt} of {len(statuses)} rostered players are on the injury report."))
+    return lines
@@ -0,0 +1,278 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from allplay import completed_weeks
+
+# Bench efficiency: for every team and completed week, the best legal lineup the roster
+# allowed (optimal) against the points the starters actually scored. Box-score lineups for
+# completed weeks are fetched concurrently and kept in a per-league store, like
+# weekly_store: a stored week is refetched only when the team scores loaded with the
+# League disagree with it (an ESPN stat correction). The solver handles every team-week
+# of the season in one batch of array operations.
+LINEUP_STORE_DIR = os.environ.get("LINEUP_STORE_DIR", ".cache/lineups").strip()
+BOX_SCORE_WORKERS = int(os.environ.get("BOX_SCORE_WORKERS", "4"))
+
+# Lineup slot ids (espn_api POSITION_MAP): bench and IR never score
+BENCH_SLOTS = frozenset({20, 21})
+# Slots that take exactly one position; a player's position is the first of these in their eligible slots
+POSITION_SLOTS = (0, 2, 4, 6, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19)
+
+# [lineup slot id, points, eligible slot ids] for each rostered player
+Lineup = List[list]
+
+
+def scoring_periods(league, week: int) -> List[int]:
+    """Scoring periods (NFL weeks) that make up one matchup period."""
+    periods = getattr(league.settings, "matchup_periods", None) or {}
+    return [int(p) for p in periods.get(str(week), periods.get(week, [week]))]
+
+
+def _entry_points(entry: Dict, scoring_period: int) -> float:
+    pool = entry.get("playerPoolEntry") or {}
+    player = pool.get("player") or entry.get("player") or {}
+    for stat in player.get("stats", []):
+        if stat.get("scoringPeriodId") == scoring_period and stat.get("statSourceId") == 0:
+            return float(stat.get("appliedTotal") or 0.0)
+    return float(pool.get("appliedStatTotal") or 0.0)
+
+
+def fetch_lineups(league, week: int, scoring_period: int) -> Dict[int, Lineup]:
+    """team_id -> lineup for one scoring period, from the box-score views espn_api's box_scores() reads."""
+    params = {"view": ["mMatchupScore", "mScoreboard"], "scoringPeriodId": scoring_period}
+    filters = {"schedule": {"filterMatchupPeriodIds": {"value": [week]}}}
+    data = league.espn_request.league_get(params=params, headers={"x-fantasy-filter": json.dumps(filters)})
+    out: Dict[int, Lineup] = {}
+    for matchup in data.get("schedule", []):
+        if matchup.get("matchupPeriodId", week) != week:
+            continue
+        for side in ("home", "away"):
+            team = matchup.get(side)
+            if not team:
+                continue
+            entries = (team.get("rosterForCurrentScoringPeriod") or {}).get("entries", [])
+            out[int(team["teamId"])] = [
+                [int(e.get("lineupSlotId", 20)), round(_entry_points(e, scoring_period), 2),
+                 list(((e.get("playerPoolEntry") or {}).get("player") or e.get("player") or {}).get("eligibleSlots", []))]
+                for e in entries
+            ]
+    return out
+
+
+def started_points(lineup: Lineup) -> float:
+    return sum(points for slot, points, _ in lineup if slot not in BENCH_SLOTS)
+
+
+class LineupStore:
+    def __init__(self, league_id, season, root: str = LINEUP_STORE_DIR):
+        self.path = os.path.join(root, f"{league_id}_{season}.json")
+        # scoring period -> team_id -> lineup
+        self.periods: Dict[int, Dict[int, Lineup]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.periods = {int(sp): {int(tid): lineup for tid, lineup in teams.items()}
+                        for sp, teams in data.get("periods", {}).items()}
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {"periods": {str(sp): {str(tid): lineup for tid, lineup in teams.items()}
+                            for sp, teams in self.periods.items()}}
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def corrected_weeks(self, league, periods: Dict[int, List[int]]) -> List[int]:
+        # Weeks whose stored starters no longer add up to the schedule scores loaded with the League
+        out = []
+        for week, sps in periods.items():
+            if not all(sp in self.periods for sp in sps):
+                continue
+            for team in league.teams:
+                team_scores = getattr(team, "scores", None) or []
+                if week > len(team_scores) or team_scores[week - 1] is None:
+                    continue
+                if not all(team.team_id in self.periods[sp] for sp in sps):
+                    continue
+                stored = sum(started_points(self.periods[sp][team.team_id]) for sp in sps)
+                if round(float(team_scores[week - 1]), 2) != round(stored, 2):
+                    out.append(week)
+                    break
+        return out
+
+    def sync(self, league, fetch: Callable[[object, int, int], Dict[int, Lineup]] = fetch_lineups,
+             workers: int = BOX_SCORE_WORKERS) -> Dict[int, List[int]]:
+        """Fetch missing and corrected weeks in parallel; returns completed week -> scoring periods."""
+        periods = {week: scoring_periods(league, week) for week in completed_weeks(league)}
+        stale = set(self.corrected_weeks(league, periods))
+        todo = [(week, sp) for week, sps in periods.items() for sp in sps
+                if sp not in self.periods or week in stale]
+        if todo:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+                fetched = list(pool.map(lambda task: fetch(league, *task), todo))
+            for (_, sp), lineups in zip(todo, fetched):
+                self.periods[sp] = lineups
+            self.save()
+        return periods
+
+
+def store_for(league, root: Optional[str] = None) -> LineupStore:
+    return LineupStore(league.league_id, league.year, root or LINEUP_STORE_DIR)
+
+
+def position_of(eligible: Sequence[int]) -> Optional[int]:
+    for slot in eligible:
+        if slot in POSITION_SLOTS:
+            return slot
+    return None
+
+
+def starting_slots(league, lineups: Sequence[Lineup]) -> Dict[int, int]:
+    """Starting slot id -> count, from the league settings or else the lineups actually set."""
+    from espn_api.football.constant import POSITION_MAP
+    slot_ids = {label: slot for slot, label in POSITION_MAP.items() if isinstance(slot, int)}
+    counts = {}
+    for label, n in (getattr(league.settings, "position_slot_counts", None) or {}).items():
+        slot = slot_ids.get(label)
+        if slot is not None and slot not in BENCH_SLOTS and n:
+            counts[slot] = int(n)
+    if counts:
+        return counts
+    for lineup in lineups:
+        used: Dict[int, int] = {}
+        for slot, _, _ in lineup:
+            if slot not in BENCH_SLOTS:
+                used[slot] = used.get(slot, 0) + 1
+        for slot, n in used.items():
+            counts[slot] = max(counts.get(slot, 0), n)
+    return counts
+
+
+def count_vectors(slots: Dict[int, int], accepts: Dict[int, set], positions: List[int]) -> np.ndarray:
+    """
+    Every distinct number of starters per position the slots allow: dedicated slots fix a
+    base count and each multi-position (flex) slot adds one to any position it accepts.
+    """
+    col = {p: j for j, p in enumerate(positions)}
+    base = [0] * len(positions)
+    flex: List[List[int]] = []
+    for slot, n in sorted(slots.items()):
+        ok = sorted(col[p] for p in accepts.get(slot, ()) if p in col)
+        if len(ok) == 1:
+            base[ok[0]] += n
+        elif ok:
+            flex.extend([ok] * n)
+    vectors = {tuple(base)}
+    for ok in flex:
+        vectors = {v[:j] + (v[j] + 1,) + v[j + 1:] for v in vectors for j in ok}
+    return np.array(sorted(vectors), dtype=np.int64).reshape(len(vectors), len(positions))
+
+
+def solve_lineups(lineups: Sequence[Lineup], slots: Dict[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (actual, optimal) points per lineup. The best lineup for a given number of starters per
+    position takes the top scorers of each position, so the optimum is the best of those
+    over every count vector the slots allow; all lineups are solved in one batch. A slot may
+    be left empty when every candidate scored below zero.
+    """
+    n = len(lineups)
+    rows, pos, pts, started = [], [], [], []
+    accepts: Dict[int, set] = {}
+    for r, lineup in enumerate(lineups):
+        for slot, points, eligible in lineup:
+            p = position_of(eligible)
+            if p is None:
+                continue
+            accepts.setdefault(p, set()).add(p)
+            for s in eligible:
+                accepts.setdefault(s, set()).add(p)
+            rows.append(r)
+            pos.append(p)
+            pts.append(points)
+            started.append(slot not in BENCH_SLOTS)
+    rows_a = np.asarray(rows, dtype=np.int64)
+    pts_a = np.asarray(pts, dtype=np.float64)
+    actual = np.bincount(rows_a[np.asarray(started, dtype=bool)], weights=pts_a[np.asarray(started, dtype=bool)],
+                         minlength=n) if rows else np.zeros(n)
+    positions = sorted(set(pos))
+    if not positions or not slots:
+        return actual, actual.copy()
+    vectors = count_vectors(slots, accepts, positions)
+    col = {p: j for j, p in enumerate(positions)}
+    pos_a = np.asarray([col[p] for p in pos], dtype=np.int64)
+
+    # Rank every player within (lineup, position) by points, best first
+    order = np.lexsort((-pts_a, pos_a, rows_a))
+    r_s, p_s, v_s = rows_a[order], pos_a[order], pts_a[order]
+    idx = np.arange(len(order))
+    new_group = np.ones(len(order), dtype=bool)
+    new_group[1:] = (r_s[1:] != r_s[:-1]) | (p_s[1:] != p_s[:-1])
+    rank = idx - np.maximum.accumulate(np.where(new_group, idx, 0))
+
+    # best[r, p, k]: most points from at most k starters at position p (k = 0 scores 0)
+    depth = int(max(rank.max() + 1, vectors.max()))
+    dense = np.zeros((n, len(positions), depth + 1))
+    dense[r_s, p_s, rank + 1] = v_s
+    best = np.maximum.accumulate(np.cumsum(dense, axis=2), axis=2)
+    totals = best[:, np.arange(len(positions)), vectors].sum(axis=2)
+    return actual, totals.max(axis=1)
+
+
+def season_efficiency(league, store: Optional[LineupStore] = None) -> Tuple[List[int], List[int], np.ndarray, np.ndarray]:
+    """(team ids, weeks, actual, optimal), the arrays week x team over completed weeks (NaN: no lineup)."""
+    store = store or store_for(league)
+    periods = store.sync(league)
+    team_ids = [team.team_id for team in league.teams]
+    col = {tid: j for j, tid in enumerate(team_ids)}
+    weeks = list(periods)
+    keys, lineups = [], []
+    for w, week in enumerate(weeks):
+        for sp in periods[week]:
+            for tid, lineup in store.periods.get(sp, {}).items():
+                if tid in col:
+                    keys.append((w, col[tid]))
+                    lineups.append(lineup)
+    actual = np.full((len(weeks), len(team_ids)), np.nan)
+    optimal = np.full_like(actual, np.nan)
+    if lineups:
+        a, o = solve_lineups(lineups, starting_slots(league, lineups))
+        w_idx = np.asarray([k[0] for k in keys])
+        t_idx = np.asarray([k[1] for k in keys])
+        # Multi-week matchup periods add up their scoring periods
+        for out, vals in ((actual, a), (optimal, o)):
+            sums = np.zeros_like(out)
+            np.add.at(sums, (w_idx, t_idx), vals)
+            seen = np.zeros(out.shape, dtype=bool)
+            seen[w_idx, t_idx] = True
+            out[seen] = sums[seen]
+    return team_ids, weeks, actual, optimal
+
+
+def build_efficiency_lines(names: Sequence[str], weeks: Sequence[int], actual: np.ndarray,
+                           optimal: np.ndarray) -> List[Tuple[Optional[int], str]]:
+    # (row, line) per team (columns of actual/optimal index names), then the biggest miss
+    if not np.isfinite(optimal).any():
+        return [(None, "No completed weeks yet.")]
+    season_actual = np.nansum(actual, axis=0)
+    season_optimal = np.nansum(optimal, axis=0)
+    left = season_optimal - season_actual
+    efficiency = np.divide(season_actual, season_optimal, out=np.ones_like(season_actual), where=season_optimal > 0)
+    lines = []
+    for j in sorted(range(len(names)), key=lambda j: (-efficiency[j], names[j])):
+        lines.append((j, f"{names[j]}: {100 * efficiency[j]:.1f}% of optimal, {left[j]:.2f} pts left on the bench "
+                         f"({season_actual[j]:.2f} of {season_optimal[j]:.2f})"))
+    missed = np.where(np.isfinite(optimal), optimal - np.nan_to_num(actual), -np.inf)
+    w, j = np.unravel_index(np.argmax(missed), missed.shape)
+    if missed[w, j] > 0:
+        lines.append((int(j), f"Biggest miss: {names[j]}, week {weeks[w]}, {missed[w, j]:.2f} pts left on the bench"))
+    return lines
@@ -1,8 +1,15 @@
 import os
-import requests
-from typing import List, Dict, Callable
+import json
+import calendar
+import itertools
+from datetime import date
+from typing import TYPE_CHECKING, List, Dict, Callable, Optional, Sequence, Tuple
 from decimal import Decimal, ROUND_HALF_UP
 
+if TYPE_CHECKING:
+    from team_table import TeamTable
+    from personalize import ReportBuilder
+
 # fetch environment variables
 LEAGUE_ID = os.environ.get("LEAGUE_ID", "").strip()
 SEASON = os.environ.get("SEASON", "").strip()
@@ -20,20 +27,71 @@ RECIPIENT_EMAIL = os.environ.get("RECIPIENT_EMAIL", "").strip()
 
 SUBJECT = "High Roller Luck Rankings (Auto)"
 
+# How fetch_league_json parses a payload it was given an espn_stream projection for (fields).
+# json.loads is about 3x faster than espn_stream.project on the usual mTeam/mStandings body
+# (~16 KB; ~260 vs ~850 us per league in benchmarks/run.py), so small bodies are loaded
+# whole. The body is streamed through project(), materializing only the projected fields,
+# when views beyond mTeam/mStandings are requested (rosters, schedules, ...) or once it
+# passes STREAM_MIN_BYTES (ESPN_STREAM_MIN_BYTES, default 1 MiB): up to there the full tree
+# costs a few MB at most, past it peak memory stays flat. ESPN_STREAM_PARSE=0 never streams,
+# 1 always does.
+STREAM_PARSE = os.environ.get("ESPN_STREAM_PARSE", "auto").strip().lower()
+STREAM_MIN_BYTES = int(os.environ.get("ESPN_STREAM_MIN_BYTES", str(1024 * 1024)))
+LIGHT_VIEWS = ("mTeam", "mStandings")
+TEAM_ROW_FIELDS = {"teams": [{
+    "id": True,
+    "location": True,
+    "nickname": True,
+    "record": {"overall": {"wins": True, "losses": True, "pointsFor": True, "pointsAgainst": True}},
+}]}
+
 def round2(x: float) -> float:
     return float(Decimal(x).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
 
-def fetch_league_json(league_id: str, season: str, swid: str, espn_s2: str) -> dict:
+def fetch_league_json(league_id: str, season: str, swid: str, espn_s2: str,
+                      views: Sequence[str] = ("mTeam", "mStandings"), fields: Optional[Dict] = None) -> dict:
+    # fields: an espn_stream spec; only those fields are materialized from the response
     assert league_id and season and swid and espn_s2, "Missing league or auth cookies."
-    url = (
-        f"https://fantasy.espn.com/apis/v3/games/ffl/seasons/{season}"
-        f"/segments/0/leagues/{league_id}?view=mTeam&view=mStandings"
-    )
+    from espn_cache import cached_get, cached_stream, cache_key, espn_url
+    params: Dict = {"view": list(views)}
+    if int(season) < 2018:
+        # ESPN serves seasons before 2018 from the league history endpoint
+        url = f"https://fantasy.espn.com/apis/v3/games/ffl/leagueHistory/{league_id}"
+        params["seasonId"] = str(season)
+    else:
+        url = (
+            f"https://fantasy.espn.com/apis/v3/games/ffl/seasons/{season}"
+            f"/segments/0/leagues/{league_id}"
+        )
     headers = {"Cookie": f"SWID={swid}; espn_s2={espn_s2}"}
-    r = requests.get(url, headers=headers, timeout=30)
-    if r.status_code != 200:
-        raise RuntimeError(f"ESPN API error {r.status_code}: {r.text[:400]}")
-    return r.json()
+    key = cache_key(league_id, season, params, cookies={"SWID": swid, "espn_s2": espn_s2})
+    if fields is not None:
+        from espn_stream import project
+        status, chunks = cached_stream(espn_url(url), key, params=params, headers=headers)
+        if status == 200:
+            if STREAM_PARSE == "1" or any(v not in LIGHT_VIEWS for v in views):
+                head = []
+            else:
+                # Read up to the threshold; a body that ends before it is loaded whole
+                head, size = [], 0
+                for chunk in chunks:
+                    head.append(chunk)
+                    size += len(chunk)
+                    if size > STREAM_MIN_BYTES:
+                        break
+                else:
+                    data = json.loads(b"".join(head))
+                    return data[0] if isinstance(data, list) else data
+            # Parse the rest as it arrives (it is teed into the cache), never holding it whole
+            data = project(itertools.chain(head, chunks), fields)
+            return data[0] if isinstance(data, list) else data
+        body = b"".join(chunks)
+    else:
+        status, body = cached_get(espn_url(url), key, params=params, headers=headers)
+        if status == 200:
+            data = json.loads(body)
+            return data[0] if isinstance(data, list) else data
+    raise RuntimeError(f"ESPN API error {status}: {body[:400].decode('utf-8', 'replace')}")
 
 def extract_rows(data: dict) -> List[Dict]:
     rows = []
@@ -84,72 +142,86 @@ def tie_rank_map(sorted_rows: List[Dict], key_fn: Callable[[Dict], str]) -> Dict
         i = j
     return out
 
-def build_markdown(enriched: List[Dict]) -> str:
-    header = "| Team Name | Standings | PF/PA | Luck |\n|---|---|---|---|"
+LUCK_HEADER = "| Team Name | Standings | PF/PA | Luck |\n|---|---|---|---|"
+
+def luck_lines(table: "TeamTable", rows=None) -> List[Tuple[int, str, str]]:
+    # (row, table line, "Standings .., PF/PA .., Luck .." for a manager's header) per rendered row;
+    # rows: row indices to render (one league of a stacked table), defaults to table.order
+    from ranking import tie_display
+    rows = table.order if rows is None else rows
+    standings_disp = tie_display(table["standingsRank"][rows], table["standingsTied"][rows])
+    pfpa_disp = tie_display(table["pfpaRank"][rows], table["pfpaTied"][rows])
+    pfpa = table["pfpa"][rows].tolist()
+    luck = table["luck"][rows].tolist()
     lines = []
-    for r in enriched:
-        pfpa_str = f"{r['pfpa']:.2f}"
-        pfpa_col = f"{pfpa_str} ({r['pfpaDisp']})"
-        luck_str = f"+{r['luck']}" if r['luck'] >= 0 else str(r['luck'])
-        lines.append(f"| {r['name']} | {r['standingsDisp']} | {pfpa_col} | {luck_str} |")
-    return header + "\n" + "\n".join(lines)
+    for k, i in enumerate(rows.tolist()):
+        pfpa_col = f"{pfpa[k]:.2f} ({pfpa_disp[k]})"
+        luck_str = f"+{luck[k]}" if luck[k] >= 0 else str(luck[k])
+        lines.append((i, f"| {table.name[i]} | {standings_disp[k]} | {pfpa_col} | {luck_str} |",
+                      f"Standings {standings_disp[k]}, PF/PA {pfpa_col}, Luck {luck_str}"))
+    return lines
 
-def main():
-    import calendar
-    # Send emails only during fantasy season: from the 2nd Tuesday in September to the 4th Tuesday in December
+def build_markdown(table: "TeamTable", rows=None) -> str:
+    return LUCK_HEADER + "\n" + "\n".join(line for _, line, _ in luck_lines(table, rows))
+
+def build_luck_report(table: "TeamTable") -> "ReportBuilder":
+    # The same table as build_markdown, with each line tagged by its team for personalized copies
+    from personalize import ReportBuilder
+    builder = ReportBuilder(table.name, title="Luck Rankings")
+    builder.text(LUCK_HEADER)
+    for row, line, fact in luck_lines(table):
+        builder.text("\n")
+        builder.line(row, line, fact)
+    return builder
+
+def rank_rows(rows: List[Dict]) -> List[Dict]:
+    # Vectorized equivalent of stable_sort(standings_sort/pfpa_sort) + tie_rank_map
+    from ranking import rank_rows as rank_rows_vectorized
+    return rank_rows_vectorized(rows)
+
+def report_fields() -> Optional[Dict]:
+    return None if STREAM_PARSE == "0" else TEAM_ROW_FIELDS
+
+def extract_table(data: dict) -> "TeamTable":
+    from team_table import TeamTable
+    return TeamTable.from_payload(data)
+
+def rank_table(table: "TeamTable") -> "TeamTable":
+    from ranking import rank_teams
+    return rank_teams(table)
+
+def table_digest(table: "TeamTable") -> str:
+    # Journal key: everything the ranking reads, independent of team order in the payload
+    from run_journal import input_digest
+    rows = sorted(zip(table.name, table.wins.tolist(), table.pf.tolist(), table.pa.tolist()))
+    return input_digest("luck", rows)
 
-      import pytz
-    from datetime import datetime, date
-    tz = pytz.timezone('America/New_York')
-    today = datetime.now(tz).date()
-    year = today.year
-    def nth_weekday_of_month(y: int, month: int, weekday: i datent, n: int) -> date:
-        cal = calendar.monthcalendar(y, month)
-        count = 0
-        for week in cal:
-            if week[weekday] != 0:
-                count += 1
-                if count == n:
-                    return date(y, month, week[weekday])
-        return None
-    second_tuesday_september = nth_weekday_of_month(year, 9, calendar.TUESDAY, 2)
-    fourth_tuesday_december = nth_weekday_of_month(year, 12, calendar.TUESDAY, 4)
+def build_report(data: dict) -> str:
+    return build_markdown(rank_table(extract_table(data)))
+
+def nth_weekday_of_month(y: int, month: int, weekday: int, n: int) -> Optional[date]:
+    cal = calendar.monthcalendar(y, month)
+    count = 0
+    for week in cal:
+        if week[weekday] != 0:
+            count += 1
+            if count == n:
+                return date(y, month, week[weekday])
+    return None
+
+def in_active_season(today: date) -> bool:
+    # Send emails only during fantasy season: from the 2nd Tuesday in September to the 4th Tuesday in December
+    second_tuesday_september = nth_weekday_of_month(today.year, 9, calendar.TUESDAY, 2)
+    fourth_tuesday_december = nth_weekday_of_month(today.year, 12, calendar.TUESDAY, 4)
     if second_tuesday_september and fourth_tuesday_december:
         if today < second_tuesday_september or today > fourth_tuesday_december:
-            print("Outside active season. Skipping email.")
-            return
-data = fetch_league_json(LEAGUE_ID, SEASON, SWID, ESPN_S2)
-    rows = extract_rows(data)
-
-    standings_sorted = stable_sort(rows, standings_sort)
-    standings_rank = tie_rank_map(standings_sorted, lambda r: f"{r['wins']}|{int(round(r['pf']))}")
-
-    pfpa_sorted = stable_sort(rows, pfpa_sort)
-    pfpa_rank = tie_rank_map(pfpa_sorted, lambda r: f"{round2(r['pfpa']):.2f}")
-
-    enriched: List[Dict] = []
-    for r in rows:
-        s = standings_rank[r["name"]]
-        p = pfpa_rank[r["name"]]
-        enriched.append({
-            "name": r["name"],
-            "pf": r["pf"],
-            "pa": r["pa"],
-            "pfpa": round2(r["pfpa"]),
-            "pfpaRank": p["rank"],
-            "pfpaDisp": p["display"],
-            "standingsRank": s["rank"],
-            "standingsDisp": s["display"],
-            "luck": p["rank"] - s["rank"]
-        })
-
-    enriched.sort(key=lambda x: (-x["luck"], x["pfpa"], x["name"]))
-
-    md = build_markdown(enriched)
+            return False
+    return True
 
+def send_report(md: str, recipient: str = RECIPIENT_EMAIL, subject: str = SUBJECT) -> None:
     if SENDGRID_API_KEY:
         from email_sendgrid import send_via_sendgrid
-        send_via_sendgrid(SENDGRID_API_KEY, SENDER_EMAIL, RECIPIENT_EMAIL, SUBJECT, md)
+        send_via_sendgrid(SENDGRID_API_KEY, SENDER_EMAIL, recipient, subject, md)
     else:
         from email_smtp import send_via_smtp
         send_via_smtp(
@@ -158,10 +230,74 @@ data = fetch_league_json(LEAGUE_ID, SEASON, SWID, ESPN_S2)
             username=SMTP_USERNAME,
             password=SMTP_PASSWORD,
             sender=SENDER_EMAIL,
-            recipient=RECIPIENT_EMAIL,
-            subject=SUBJECT,
+            recipient=recipient,
+            subject=subject,
             markdown=md
         )
 
+def smtp_outbox():
+    from email_smtp import SmtpOutbox
+    if not all([SMTP_SERVER, SMTP_USERNAME, SMTP_PASSWORD, SENDER_EMAIL]):
+        raise RuntimeError("Missing SMTP secrets (server/port/username/password/sender/recipient).")
+    return SmtpOutbox(SMTP_SERVER, int(SMTP_PORT or 587), SMTP_USERNAME, SMTP_PASSWORD, SENDER_EMAIL)
+
+def today_eastern() -> date:
+    # Stdlib zoneinfo keeps the season check free of third-party imports
+    from datetime import datetime
+    try:
+        from zoneinfo import ZoneInfo
+        tz = ZoneInfo('America/New_York')
+    except Exception:
+        import pytz
+        tz = pytz.timezone('America/New_York')
+    return datetime.now(tz).date()
+
+def main():
+    today = today_eastern()
+    if not in_active_season(today):
+        print("Outside active season. Skipping email.")
+        return
+
+    import metrics
+    with metrics.run("luck", league_id=LEAGUE_ID, season=SEASON):
+        with metrics.span("fetch"):
+            data = fetch_league_json(LEAGUE_ID, SEASON, SWID, ESPN_S2, fields=report_fields())
+        table = extract_table(data)
+
+        # Same standings as an already-delivered report: nothing to rank, render or send
+        from personalize import load_managers
+        from run_journal import default_journal
+        journal = default_journal()
+        digest = table_digest(table)
+        managers = load_managers()
+        if all(journal.delivered("luck", digest, r) for r in (managers or [RECIPIENT_EMAIL])):
+            print("Standings unchanged since the last delivered report. Skipping email.")
+            return
+        if managers:
+            # One shared rendering, one marked-up copy per manager; rivals need the standings order
+            from personalize import deliver, render_template
+            standings = table.order_by("wins", "pf", descending=True).tolist()
+            with metrics.span("rank"):
+                rank_table(table)
+            with metrics.span("render"):
+                template = render_template("luck", digest, lambda: build_luck_report(table), table.name, standings)
+            _, failed = deliver("luck", digest, template, managers, table.row_of, SUBJECT)
+            if failed:
+                raise RuntimeError("Delivery failed for " + "; ".join(failed))
+            return
+
+        def render() -> str:
+            with metrics.span("rank"):
+                rank_table(table)
+            with metrics.span("render"):
+                return build_markdown(table)
+
+        md = journal.render("luck", digest, render)
+        if "standingsRank" not in table:
+            metrics.count("journal_hit")
+        with metrics.span("deliver"):
+            send_report(md)
+        journal.mark_delivered("luck", digest, RECIPIENT_EMAIL)
+
 if __name__ == "__main__":
     main()
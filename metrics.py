@@ -0,0 +1,136 @@
+import os
+import io
+import sys
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Per-stage timing for the report jobs. Set METRICS=1 to record timed spans, call counts
+# and byte counts per stage and emit them as JSON lines when the run ends (to
+# METRICS_OUTPUT, or stderr). METRICS=profile also runs cProfile and tracemalloc and
+# appends a hot-path report. With METRICS unset every hook returns immediately.
+METRICS = os.environ.get("METRICS", "").strip().lower()
+METRICS_OUTPUT = os.environ.get("METRICS_OUTPUT", "").strip()
+PROFILE_TOP = int(os.environ.get("METRICS_PROFILE_TOP", "25"))
+
+enabled = METRICS not in ("", "0", "off", "false")
+profiling = METRICS == "profile"
+
+_lock = threading.Lock()
+_stages: Dict[str, Dict[str, float]] = {}
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.stage, seconds=time.perf_counter() - self.start)
+        return False
+
+
+def span(stage: str):
+    """Time a block: `with metrics.span("fetch"): ...`."""
+    if not enabled:
+        return _NOOP
+    return _Span(stage)
+
+
+def record(stage: str, seconds: float = 0.0, calls: int = 1, nbytes: int = 0) -> None:
+    if not enabled:
+        return
+    with _lock:
+        s = _stages.setdefault(stage, {"seconds": 0.0, "calls": 0, "bytes": 0})
+        s["seconds"] += seconds
+        s["calls"] += calls
+        s["bytes"] += nbytes
+
+
+def count(stage: str, nbytes: int = 0, calls: int = 1) -> None:
+    """Count an event (and optionally its payload size) without timing it."""
+    if enabled:
+        record(stage, calls=calls, nbytes=nbytes)
+
+
+def _emit(lines) -> None:
+    text = "".join(json.dumps(line) + "\n" for line in lines)
+    if METRICS_OUTPUT:
+        with open(METRICS_OUTPUT, "a", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stderr.write(text)
+
+
+def _hot_path_report(profiler, snapshot) -> str:
+    import pstats
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    out.write("\nTop allocations (tracemalloc):\n")
+    for stat in snapshot.statistics("lineno")[:10]:
+        out.write(f"  {stat}\n")
+    return out.getvalue()
+
+
+@contextmanager
+def run(job: str, **labels):
+    """
+    Wrap a whole job run. On exit emits one JSON line per stage plus a "total" line,
+    all sharing a run_id; in profile mode the hot-path report goes to stderr.
+    """
+    if not enabled:
+        yield
+        return
+    with _lock:
+        _stages.clear()
+    profiler = None
+    if profiling:
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        total = time.perf_counter() - start
+        report = None
+        if profiler is not None:
+            import tracemalloc
+            profiler.disable()
+            report = _hot_path_report(profiler, tracemalloc.take_snapshot())
+            tracemalloc.stop()
+        run_id = uuid.uuid4().hex[:12]
+        base = dict(labels, job=job, run_id=run_id, ts=time.time())
+        with _lock:
+            stages = {k: dict(v) for k, v in _stages.items()}
+            _stages.clear()
+        lines = [dict(base, stage=name, **values) for name, values in stages.items()]
+        lines.append(dict(base, stage="total", seconds=total, calls=1, bytes=0, error=error))
+        _emit(lines)
+        if report:
+            sys.stderr.write(f"\n=== Hot paths for {job} ({run_id}) ===\n{report}")
@@ -0,0 +1,245 @@
+import os
+import json
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import metrics
+
+# Per-manager variants of a report. A job renders its league-wide report once, as before,
+# but into a ReportBuilder: shared text plus the lines that belong to each team, tagged with
+# the team's TeamTable row as they are written (table rows, "Team: ..." lines and "**Team**"
+# blocks with the moves under them). A manager's copy is then the shared parts with their
+# own lines marked, plus a short "your team" header that lists those lines and the rivals
+# one spot above and below in the standings. Filling a variant swaps a few list entries and
+# joins the result, so twelve managers cost one render plus twelve joins. The compiled parts
+# are journaled next to the shared body, so a rerun for the managers still missing their
+# copy renders nothing. Managers map e-mail to ESPN team id, from a league spec's "managers"
+# object or from MANAGERS ("email=team_id,...") or MANAGERS_FILE (a JSON object).
+MANAGERS = os.environ.get("MANAGERS", "").strip()
+MANAGERS_FILE = os.environ.get("MANAGERS_FILE", "").strip()
+MARK = "▶ "
+
+
+def load_managers(spec: Optional[Dict] = None) -> Dict[str, int]:
+    """Recipient e-mail -> team id from spec, or from the environment when no spec is given."""
+    if spec is not None:
+        return {email.strip(): int(tid) for email, tid in (spec.get("managers") or {}).items()}
+    if MANAGERS:
+        out = {}
+        for item in MANAGERS.split(","):
+            email, _, tid = item.partition("=")
+            if email.strip() and tid.strip():
+                out[email.strip()] = int(tid)
+        return out
+    if MANAGERS_FILE:
+        with open(MANAGERS_FILE, "r", encoding="utf-8") as f:
+            return {email.strip(): int(tid) for email, tid in json.load(f).items()}
+    return {}
+
+
+def _plain(line: str) -> str:
+    return line.strip().lstrip("-").strip().replace("**", "")
+
+
+class ReportTemplate:
+    """A shared report body compiled into fixed parts and per-team line slots."""
+
+    def __init__(self, parts: List[str], slots: Dict[int, List[int]], marked: Dict[int, str],
+                 facts: Dict[int, List[str]], blocks: Dict[int, List[str]], names: Sequence[str],
+                 order: Sequence[int]):
+        self.parts = parts
+        # row -> indices into parts holding that team's lines, and their marked versions
+        self.slots = slots
+        self.marked = marked
+        # row -> "Section: line" summaries for the header, and moves listed under the team
+        self.facts = facts
+        self.blocks = blocks
+        self.names = list(names)
+        self.position = {row: k for k, row in enumerate(order)}
+        self.order = list(order)
+        self._headers: Dict[int, str] = {}
+
+    def rivals(self, row: int) -> List[Tuple[int, str]]:
+        k = self.position.get(row)
+        if k is None:
+            return []
+        out = []
+        if k > 0:
+            out.append((self.order[k - 1], "one spot ahead"))
+        if k + 1 < len(self.order):
+            out.append((self.order[k + 1], "one spot behind"))
+        return out
+
+    def header(self, row: int) -> str:
+        cached = self._headers.get(row)
+        if cached is not None:
+            return cached
+        lines = [f"### Your team: {self.names[row]}"]
+        lines.extend(f"- {fact}" for fact in self.facts.get(row, []))
+        rivals = self.rivals(row)
+        if rivals:
+            lines.append("Rivals: " + ", ".join(f"{self.names[r]} ({where})" for r, where in rivals))
+            for r, _ in rivals:
+                lines.extend(f"- {self.names[r]}: {move}" for move in self.blocks.get(r, []))
+        text = "\n".join(lines) + "\n\n"
+        self._headers[row] = text
+        return text
+
+    def fill(self, row: Optional[int]) -> str:
+        """The report for the manager of row (None: the shared, unmarked report)."""
+        if row is None or row not in self.position:
+            return "".join(self.parts)
+        parts = list(self.parts)
+        for i in self.slots.get(row, []):
+            parts[i] = self.marked[i]
+        return self.header(row) + "".join(parts)
+
+    @classmethod
+    def from_compiled(cls, data: Dict, names: Sequence[str], order: Sequence[int]) -> "ReportTemplate":
+        """Rebuild a template from ReportBuilder.compiled() data (JSON turns the row keys into strings)."""
+        def rows(d: Dict) -> Dict:
+            return {int(k): v for k, v in d.items()}
+        return cls(data["parts"], rows(data["slots"]), rows(data["marked"]), rows(data["facts"]),
+                   rows(data["blocks"]), names, order)
+
+
+class ReportBuilder:
+    """
+    Collects a report as it is rendered: shared text, and lines tagged with the TeamTable
+    row of the team they are about. names are the table's team names by row.
+    """
+
+    def __init__(self, names: Sequence[str], title: str = "Report"):
+        self.names = list(names)
+        self.section = title
+        self.parts: List[str] = []
+        self.slots: Dict[int, List[int]] = {}
+        self.marked: Dict[int, str] = {}
+        self.facts: Dict[int, List[str]] = {}
+        self.blocks: Dict[int, List[str]] = {}
+        self._fixed: List[str] = []
+
+    def _flush(self) -> None:
+        if self._fixed:
+            self.parts.append("".join(self._fixed))
+            self._fixed = []
+
+    def text(self, text: str) -> None:
+        """Shared text, the same in every copy."""
+        self._fixed.append(text)
+
+    def heading(self, text: str) -> None:
+        """A shared heading line; "## Playoff Odds (...)" files the facts below it under "Playoff Odds"."""
+        self.section = text.lstrip("#").strip().split(" (")[0]
+        self.text(text)
+
+    def line(self, row: Optional[int], text: str, fact: Optional[str] = None) -> None:
+        """
+        text (written as is) about the team at row; None makes it shared. fact is what the
+        team's header lists for it, by default the line without its leading team name; ""
+        lists nothing.
+        """
+        if row is None:
+            self.text(text)
+            return
+        self._flush()
+        stripped = text.lstrip("|-* ")
+        offset = len(text) - len(stripped)
+        self.slots.setdefault(row, []).append(len(self.parts))
+        self.marked[len(self.parts)] = text[:offset] + MARK + text[offset:]
+        self.parts.append(text)
+        if fact is None:
+            fact = _plain(text)
+            if fact.startswith(self.names[row]):
+                fact = fact[len(self.names[row]):].lstrip(":, ").strip()
+        if fact:
+            self.facts.setdefault(row, []).append(f"{self.section}: {fact}")
+
+    def block(self, row: int, moves: List[str]) -> None:
+        """A "**Team**" line with the team's moves listed under it (rivals see them too)."""
+        self.line(row, f"**{self.names[row]}**\n", fact="")
+        for move in moves:
+            self.text(f"- {move}\n")
+        self.blocks.setdefault(row, []).extend(moves)
+        if moves:
+            self.facts.setdefault(row, []).append(f"{self.section}: " + "; ".join(moves))
+
+    def body(self) -> str:
+        """The shared, unmarked report."""
+        self._flush()
+        return "".join(self.parts)
+
+    def compiled(self) -> Dict:
+        """Parts, slots and facts as JSON-ready data (see ReportTemplate.from_compiled)."""
+        self._flush()
+        return {"parts": self.parts, "slots": self.slots, "marked": self.marked, "facts": self.facts,
+                "blocks": self.blocks}
+
+    def template(self, order: Sequence[int]) -> "ReportTemplate":
+        self._flush()
+        return ReportTemplate(self.parts, self.slots, self.marked, self.facts, self.blocks, self.names, order)
+
+
+def render_template(job: str, digest: str, build, names: Sequence[str], order: Sequence[int]) -> ReportTemplate:
+    """
+    journal.render for a personalized report: build() returns a filled ReportBuilder. Its
+    compiled parts are journaled under "<job>-template" and the shared body under job, where
+    deliveries are recorded. order is the standings order (row indices) rivals are taken from.
+    """
+    from run_journal import default_journal
+    journal = default_journal()
+    compiled = journal.render(f"{job}-template", digest, lambda: json.dumps(build().compiled()))
+    template = ReportTemplate.from_compiled(json.loads(compiled), names, order)
+    journal.render(job, digest, lambda: template.fill(None))
+    return template
+
+
+def variants(template: ReportTemplate, managers: Dict[str, int], row_of) -> Iterator[Tuple[str, str]]:
+    """(recipient, body) per manager, filled as they are consumed; row_of maps team id to row."""
+    for recipient, team_id in managers.items():
+        with metrics.span("fill"):
+            body = template.fill(row_of(team_id))
+        yield recipient, body
+
+
+def deliver(job: str, digest: str, template: ReportTemplate, managers: Dict[str, int], row_of,
+            subject: str, smtp: Optional[Dict] = None) -> Tuple[int, List[str]]:
+    """
+    Send each manager their variant unless the journal shows this digest already reached
+    them. Returns how many were sent and a "recipients: error" entry per failed send; the
+    others are journaled as delivered either way, so a rerun only retries the failures.
+    SendGrid sends one request per manager; SMTP queues every variant on one outbox and
+    delivers them over its pooled connections.
+    """
+    from run_journal import default_journal
+    journal = default_journal()
+    pending = {r: tid for r, tid in managers.items() if not journal.delivered(job, digest, r)}
+    if not pending:
+        return 0, []
+    api_key = os.environ.get("SENDGRID_API_KEY", "").strip()
+    sender = os.environ.get("SENDER_EMAIL", "").strip()
+    sent, failed = 0, []
+    if api_key:
+        from email_sendgrid import send_via_sendgrid
+        for recipient, body in variants(template, pending, row_of):
+            try:
+                with metrics.span("deliver"):
+                    send_via_sendgrid(api_key, sender, recipient, subject, body)
+            except Exception as e:
+                failed.append(f"{recipient}: {type(e).__name__}: {e}")
+                continue
+            journal.mark_delivered(job, digest, recipient)
+            sent += 1
+        return sent, failed
+
+    from email_smtp import SmtpOutbox, smtp_settings
+    outbox = SmtpOutbox(**(smtp or smtp_settings()))
+    ids = {outbox.add(recipient, subject, body): recipient for recipient, body in variants(template, pending, row_of)}
+    with metrics.span("deliver"):
+        results = outbox.flush()
+    for result in results:
+        if "error" in result:
+            failed.append(f"{', '.join(result['recipients'])}: {result['error']}")
+            continue
+        journal.mark_delivered(job, digest, ids[result["id"]])
+        sent += 1
+    return sent, failed
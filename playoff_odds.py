@@ -0,0 +1,109 @@
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Playoff odds: simulate the rest of the regular season from per-team score
+# distributions fitted to completed weeks, then seed every simulated season with the
+# standings tiebreaks from main.standings_sort (wins, then PF). Seasons are simulated
+# in batches of array operations; only per-team counters are kept between batches.
+PLAYOFF_SIMS = int(os.environ.get("PLAYOFF_SIMS", "50000"))
+PLAYOFF_BATCH = 5000
+# Weeks of league-average scoring blended into each team's mean early in the season
+PRIOR_WEEKS = 3.0
+
+
+def remaining_schedule(league, team_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """(week index, home column, away column) per remaining regular-season matchup."""
+    col = {tid: j for j, tid in enumerate(team_ids)}
+    first = league.currentMatchupPeriod
+    last = getattr(league.settings, "reg_season_count", 0) or first - 1
+    weeks, home, away = [], [], []
+    for w, week in enumerate(range(first, last + 1)):
+        for matchup in league.scoreboard(week):
+            if matchup.is_playoff:
+                continue
+            h = getattr(matchup, "home_team", None)
+            a = getattr(matchup, "away_team", None)
+            if h is None or a is None or h.team_id not in col or a.team_id not in col:
+                continue
+            weeks.append(w)
+            home.append(col[h.team_id])
+            away.append(col[a.team_id])
+    n_weeks = max(0, last - first + 1)
+    return np.asarray(weeks, dtype=np.int64), np.asarray(home, dtype=np.int64), np.asarray(away, dtype=np.int64), n_weeks
+
+
+def score_model(scores) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-team normal (mean, std) from a week x team matrix, shrunk toward the league."""
+    scores = np.asarray(scores, dtype=np.float64)
+    n_teams = scores.shape[1]
+    if not np.isfinite(scores).any():
+        return np.full(n_teams, 100.0), np.full(n_teams, 25.0)
+    games = np.sum(~np.isnan(scores), axis=0)
+    league_mean = np.nanmean(scores)
+    league_var = np.nanvar(scores) if np.sum(~np.isnan(scores)) > 1 else 625.0
+    sums = np.nansum(scores, axis=0)
+    sq = np.nansum((scores - league_mean) ** 2, axis=0)
+    mean = (sums + PRIOR_WEEKS * league_mean) / (games + PRIOR_WEEKS)
+    var = (sq + PRIOR_WEEKS * league_var) / (games + PRIOR_WEEKS)
+    return mean, np.sqrt(var)
+
+
+def playoff_bye_counts(playoff_teams: int) -> int:
+    # Top seeds skip round one when the bracket isn't a power of two (6 teams -> 2 byes)
+    size = 1
+    while size < playoff_teams:
+        size *= 2
+    return size - playoff_teams
+
+
+def simulate_playoff_odds(wins, pf, mean, std, week: np.ndarray, home: np.ndarray, away: np.ndarray,
+                          n_weeks: int, playoff_teams: int, byes: Optional[int] = None,
+                          n_sims: int = PLAYOFF_SIMS, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    wins = np.asarray(wins, dtype=np.float64)
+    pf = np.asarray(pf, dtype=np.float64)
+    mean = np.asarray(mean, dtype=np.float64)
+    std = np.asarray(std, dtype=np.float64)
+    n_teams = len(wins)
+    byes = playoff_bye_counts(playoff_teams) if byes is None else byes
+    rng = np.random.default_rng(seed)
+    # One-hot matchup -> team maps turn per-matchup results into per-team totals with a matmul
+    home_map = np.zeros((len(home), n_teams))
+    home_map[np.arange(len(home)), home] = 1.0
+    away_map = np.zeros((len(away), n_teams))
+    away_map[np.arange(len(away)), away] = 1.0
+
+    playoff = np.zeros(n_teams)
+    bye = np.zeros(n_teams)
+    total_wins = np.zeros(n_teams)
+    done = 0
+    while done < n_sims:
+        batch = min(PLAYOFF_BATCH, n_sims - done)
+        draws = np.maximum(rng.normal(mean, std, (batch, max(n_weeks, 1), n_teams)), 0.0)
+        hs = draws[:, week, home]
+        as_ = draws[:, week, away]
+        home_win = (hs > as_) + 0.5 * (hs == as_)
+        sim_wins = wins + home_win @ home_map + (1.0 - home_win) @ away_map
+        sim_pf = pf + hs @ home_map + as_ @ away_map
+        # Seed by wins, then PF: PF stays far below the 1e7 step between half-wins
+        key = sim_wins * 1e7 + sim_pf
+        seed_rank = np.argsort(np.argsort(-key, axis=1, kind="stable"), axis=1)
+        playoff += (seed_rank < playoff_teams).sum(axis=0)
+        bye += (seed_rank < byes).sum(axis=0)
+        total_wins += sim_wins.sum(axis=0)
+        done += batch
+    n = max(n_sims, 1)
+    return {"playoff": playoff / n, "bye": bye / n, "wins": total_wins / n}
+
+
+def build_playoff_odds_lines(names: List[str], odds: Dict[str, np.ndarray], wins: Sequence[float],
+                             pf: Sequence[float]) -> List[Tuple[int, str]]:
+    # (row, line) per team, best odds first and ties by current wins, then PF, like the
+    # standings; rows index names
+    order = np.lexsort((-np.asarray(pf, dtype=float), -np.asarray(wins, dtype=float), -odds["bye"], -odds["playoff"]))
+    lines = []
+    for i in order.tolist():
+        lines.append((i, f"{names[i]}: Playoffs {100 * odds['playoff'][i]:.1f}%, "
+                         f"Bye {100 * odds['bye'][i]:.1f}%, Projected wins {odds['wins'][i]:.1f}"))
+    return lines
@@ -0,0 +1,145 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Dict, Optional, Sequence
+
+import numpy as np
+
+from team_table import TeamTable
+
+# Column-at-a-time version of the luck ranking in main.py (stable_sort + tie_rank_map).
+# Every function takes parallel arrays and an optional `league` array of group ids so
+# many leagues can be ranked in one call; ranks restart at 1 inside each league.
+
+
+def round2_array(x) -> np.ndarray:
+    """Vectorized main.round2: half-up to 2 decimals on the exact binary value of each float."""
+    x = np.asarray(x, dtype=np.float64)
+    scaled = np.abs(x) * 100.0
+    out = np.sign(x) * np.floor(scaled + 0.5) / 100.0
+    # x*100 is inexact, so values sitting on a .xx5 boundary go through Decimal like round2 does
+    frac = scaled - np.floor(scaled)
+    for i in np.flatnonzero(np.abs(frac - 0.5) < 1e-6):
+        out[i] = float(Decimal(float(x[i])).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+    return out
+
+
+def pfpa_array(pf, pa) -> np.ndarray:
+    pf = np.asarray(pf, dtype=np.float64)
+    pa = np.asarray(pa, dtype=np.float64)
+    return np.divide(pf, pa, out=np.zeros_like(pf), where=pa > 0)
+
+
+def name_codes(names: Sequence[str]) -> np.ndarray:
+    # Integer codes that sort like the names themselves (code point order, same as Python str)
+    _, codes = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+    return codes.reshape(-1)
+
+
+def _tie_ranks(league_s: np.ndarray, same_as_prev: np.ndarray):
+    # Competition ranks ("1, T2, T2, 4") over rows already in sorted order
+    n = len(league_s)
+    pos = np.arange(n)
+    league_start = np.ones(n, dtype=bool)
+    league_start[1:] = league_s[1:] != league_s[:-1]
+    new_group = league_start | ~same_as_prev
+    first_in_league = np.maximum.accumulate(np.where(league_start, pos, 0))
+    first_in_group = np.maximum.accumulate(np.where(new_group, pos, 0))
+    group_id = np.cumsum(new_group) - 1
+    tied = np.bincount(group_id)[group_id] > 1
+    return first_in_group - first_in_league + 1, tied
+
+
+def _scatter(order: np.ndarray, values: np.ndarray) -> np.ndarray:
+    out = np.empty_like(values)
+    out[order] = values
+    return out
+
+
+def rank_table(names: Sequence[str], wins, pf, pa, league: Optional[Sequence[int]] = None) -> Dict[str, np.ndarray]:
+    """
+    Rank every team in one pass. Returned arrays are aligned with the inputs:
+    pfpa (rounded), standingsRank/standingsTied, pfpaRank/pfpaTied, luck, plus
+    `order`, the row indices in report order (grouped by league).
+    """
+    n = len(names)
+    wins = np.asarray(wins, dtype=np.int64)
+    pf = np.asarray(pf, dtype=np.float64)
+    league = np.zeros(n, dtype=np.int64) if league is None else np.asarray(league, dtype=np.int64)
+    codes = name_codes(names) if n else np.zeros(0, dtype=np.int64)
+    pfpa = round2_array(pfpa_array(pf, pa))
+
+    # Standings: wins desc, PF desc, name asc; ties on wins and PF rounded to the point
+    order = np.lexsort((codes, -pf, -wins, league))
+    w_s, rpf_s = wins[order], np.rint(pf[order])
+    same = np.zeros(n, dtype=bool)
+    same[1:] = (w_s[1:] == w_s[:-1]) & (rpf_s[1:] == rpf_s[:-1])
+    rank_s, tied_s = _tie_ranks(league[order], same)
+    standings_rank, standings_tied = _scatter(order, rank_s), _scatter(order, tied_s)
+
+    # PF/PA: rounded ratio desc, name asc; ties on the rounded ratio
+    order = np.lexsort((codes, -pfpa, league))
+    p_s = pfpa[order]
+    same = np.zeros(n, dtype=bool)
+    same[1:] = p_s[1:] == p_s[:-1]
+    rank_p, tied_p = _tie_ranks(league[order], same)
+    pfpa_rank, pfpa_tied = _scatter(order, rank_p), _scatter(order, tied_p)
+
+    luck = pfpa_rank - standings_rank
+    return {
+        "pfpa": pfpa,
+        "standingsRank": standings_rank,
+        "standingsTied": standings_tied,
+        "pfpaRank": pfpa_rank,
+        "pfpaTied": pfpa_tied,
+        "luck": luck,
+        "order": np.lexsort((codes, pfpa, -luck, league)),
+    }
+
+
+def tie_display(rank: np.ndarray, tied: np.ndarray) -> List[str]:
+    return [f"T{r}" if t else f"{r}" for r, t in zip(rank.tolist(), tied.tolist())]
+
+
+def rank_teams(table: TeamTable) -> TeamTable:
+    """
+    Rank a TeamTable in place: adds the rank_table columns and sets table.order to
+    report order. Stacked tables are ranked per league.
+    """
+    t = rank_table(table.name, table.wins, table.pf, table.pa, league=table.league)
+    table.order = t.pop("order")
+    for column, values in t.items():
+        table[column] = values
+    return table
+
+
+def rank_rows(rows: List[Dict]) -> List[Dict]:
+    """Drop-in for main.rank_rows: enriched rows in report order."""
+    return rank_leagues([rows])[0]
+
+
+def rank_leagues(leagues: List[List[Dict]]) -> List[List[Dict]]:
+    """Rank many leagues' extract_rows output stacked into one set of arrays."""
+    flat = [r for rows in leagues for r in rows]
+    if not flat:
+        return [[] for _ in leagues]
+    league = np.repeat(np.arange(len(leagues)), [len(rows) for rows in leagues])
+    table = rank_teams(TeamTable.from_rows(flat, league=league))
+    standings_disp = tie_display(table["standingsRank"], table["standingsTied"])
+    pfpa_disp = tie_display(table["pfpaRank"], table["pfpaTied"])
+    pfpa = table["pfpa"].tolist()
+    pfpa_rank = table["pfpaRank"].tolist()
+    standings_rank = table["standingsRank"].tolist()
+    luck = table["luck"].tolist()
+    out: List[List[Dict]] = []
+    for rows in table.league_rows(len(leagues)):
+        out.append([{
+            "name": flat[i]["name"],
+            "pf": flat[i]["pf"],
+            "pa": flat[i]["pa"],
+            "pfpa": pfpa[i],
+            "pfpaRank": pfpa_rank[i],
+            "pfpaDisp": pfpa_disp[i],
+            "standingsRank": standings_rank[i],
+            "standingsDisp": standings_disp[i],
+            "luck": luck[i],
+        } for i in rows.tolist()])
+    return out
@@ -0,0 +1,121 @@
+import os
+import time
+import heapq
+import random
+import threading
+import itertools
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+# Request scheduling for ESPN. An AdaptiveLimiter is a token bucket whose rate follows
+# AIMD: each success adds ESPN_RATE_STEP req/s, a 429/503 halves it, and a Retry-After
+# pauses the bucket for everyone. Waiters are served in priority order, so current-week
+# jobs go ahead of backfill work queued on the same host.
+ESPN_RATE = float(os.environ.get("ESPN_RATE", "5"))
+ESPN_MIN_RATE = float(os.environ.get("ESPN_MIN_RATE", "0.2"))
+ESPN_MAX_RATE = float(os.environ.get("ESPN_MAX_RATE", "20"))
+ESPN_BURST = float(os.environ.get("ESPN_BURST", "10"))
+ESPN_RATE_STEP = float(os.environ.get("ESPN_RATE_STEP", "0.25"))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "5"))
+HTTP_BACKOFF = float(os.environ.get("HTTP_BACKOFF", "0.5"))
+HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", "30"))
+
+PRIORITY_CURRENT = 0
+PRIORITY_BACKFILL = 10
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+_local = threading.local()
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Run the block's requests (on this thread) at the given priority; lower goes first."""
+    previous = current_priority()
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def current_priority() -> int:
+    return getattr(_local, "priority", PRIORITY_CURRENT)
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header: delay in seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = HTTP_BACKOFF, cap: float = HTTP_BACKOFF_MAX) -> float:
+    # Full jitter: uniform over [0, min(cap, base * 2^attempt)]
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveLimiter:
+    def __init__(self, rate: float = ESPN_RATE, burst: float = ESPN_BURST,
+                 min_rate: float = ESPN_MIN_RATE, max_rate: float = ESPN_MAX_RATE, step: float = ESPN_RATE_STEP):
+        self.rate = rate
+        self.step = step
+        self.burst = max(1.0, burst)
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority: Optional[int] = None) -> float:
+        """Block until this request may go; returns the seconds spent waiting."""
+        me = (current_priority() if priority is None else priority, next(self._seq))
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiters, me)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == me and now >= self.paused_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        return now - start
+                    if self._waiters[0] != me:
+                        wait = None
+                    elif now < self.paused_until:
+                        wait = self.paused_until - now
+                    else:
+                        wait = (1 - self.tokens) / self.rate
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(me)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def succeeded(self) -> None:
+        with self._cond:
+            self.rate = min(self.max_rate, self.rate + self.step)
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        # Multiplicative decrease, drain the bucket, and honor the server's pause for everyone
+        with self._cond:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
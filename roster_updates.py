@@ -1,8 +1,119 @@
 import os
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-import pytz
-from dateutil import parser
-from espn_api.football import League
+from espn_cache import cached_league
+from activity_log import log_for
+from email_smtp import smtp_settings
+import metrics
+
+
+def describe_action(action: str, player_name: str, bid_amount) -> str:
+    if "ADDED" in action:
+        description = f"Added {player_name}"
+        if bid_amount:
+            description += f" (waiver bid {bid_amount})"
+    elif "DROPPED" in action:
+        description = f"Dropped {player_name}"
+    elif "TRADED" in action:
+        description = f"Traded {player_name}"
+    else:
+        # Fallback for other actions like moved to IR, etc.
+        description = f"{action.title()} {player_name}"
+    return description
+
+
+def group_changes(table, records) -> List[List[str]]:
+    """Group logged activity records into change descriptions per TeamTable row."""
+    changes: List[List[str]] = [[] for _ in range(len(table))]
+    by_id, by_name = table.id_index(), table.name_index()
+    for record in records:
+        row = by_id.get(record.get("team_id"))
+        if row is None:
+            row = by_name.get(record["team"])
+        if row is None:
+            continue
+        changes[row].append(describe_action(record["action"], record["player"], record["bid"]))
+    return changes
+
+
+def period_label(cutoff: datetime, now: datetime) -> str:
+    return f"{cutoff.strftime('%b %d')} - {now.strftime('%b %d')}"
+
+
+def build_digest(table, changes: List[List[str]], cutoff: datetime, now: datetime):
+    """Roster digest as a personalize.ReportBuilder: one section per team, by team name."""
+    from personalize import ReportBuilder
+    builder = ReportBuilder(table.name, title="Roster Updates")
+    builder.heading(f"### Roster Updates ({period_label(cutoff, now)})\n\n")
+    for i in sorted(range(len(table)), key=table.name.__getitem__):
+        if changes[i]:
+            builder.block(i, changes[i])
+            builder.text("\n")
+        else:
+            builder.line(i, f"**{table.name[i]}**: No changes\n\n", fact="")
+    return builder
+
+
+def build_markdown(table, changes: List[List[str]], cutoff: datetime, now: datetime) -> str:
+    """Roster digest markdown: one section per team, by team name."""
+    return build_digest(table, changes, cutoff, now).body()
+
+
+def send_digest(league, recipient_email: str, smtp: Dict, managers: Optional[Dict[str, int]] = None) -> bool:
+    """
+    Build the 3-day roster digest for a loaded League and mail it to recipient_email, or
+    a personalized copy to each of managers (email -> team id) when given. Returns False
+    when the same digest was already delivered to everyone; raises RuntimeError naming the
+    managers whose copy failed once the others are sent.
+    """
+    import pytz
+    from run_journal import default_journal, input_digest
+    from team_table import TeamTable
+
+    # Compute time window (last 3 days)
+    tz = pytz.timezone("America/New_York")
+    now = datetime.now(tz)
+    cutoff = now - timedelta(days=3)
+
+    # Pull only activity newer than the last run into the local log, then read the
+    # 3-day window back from the log
+    with metrics.span("activity"):
+        activity_log = log_for(league)
+        new_records = activity_log.ingest(league)
+        metrics.count("activity_new", calls=len(new_records))
+        records = activity_log.since(int(cutoff.timestamp() * 1000))
+        table = TeamTable.from_league(league)
+
+    # Same teams, activity and window dates as a digest already sent: nothing to do. The
+    # dates are part of the key because the header prints them.
+    journal = default_journal()
+    digest = input_digest("roster", {"teams": table.name, "records": records, "period": period_label(cutoff, now)})
+    if all(journal.delivered("roster", digest, r) for r in (managers or [recipient_email])):
+        print("No roster activity since the last delivered digest. Skipping email.")
+        return False
+
+    subject = f"Roster Updates ({now.strftime('%b %d')})"
+    if managers:
+        # Each manager's own moves and their neighbours' in the standings up top
+        from personalize import deliver, render_template
+        with metrics.span("render"):
+            template = render_template("roster", digest,
+                                       lambda: build_digest(table, group_changes(table, records), cutoff, now),
+                                       table.name, table.order_by("wins", "pf", descending=True).tolist())
+        sent, failed = deliver("roster", digest, template, managers, table.row_of, subject, smtp)
+        if failed:
+            raise RuntimeError("Delivery failed for " + "; ".join(failed))
+        return sent > 0
+
+    # Build markdown summary, or reuse the one stored for this digest
+    with metrics.span("render"):
+        markdown = journal.render("roster", digest,
+                                  lambda: build_markdown(table, group_changes(table, records), cutoff, now))
+    from email_smtp import send_via_smtp
+    with metrics.span("deliver"):
+        send_via_smtp(recipient=recipient_email, subject=subject, markdown=markdown, **smtp)
+    journal.mark_delivered("roster", digest, recipient_email)
+    return True
 
 
 def main():
@@ -17,86 +128,22 @@ def main():
     season = os.environ.get("SEASON", "").strip()
     espn_s2 = os.environ.get("ESPN_S2", "").strip()
     swid = os.environ.get("SWID", "").strip()
-    smtp_server = os.environ.get("SMTP_SERVER", "").strip()
-    smtp_port = os.environ.get("SMTP_PORT", "").strip()
-    smtp_username = os.environ.get("SMTP_USERNAME", "").strip()
-    smtp_password = os.environ.get("SMTP_PASSWORD", "").strip()
-    sender_email = os.environ.get("SENDER_EMAIL", "").strip()
     recipient_email = os.environ.get("RECIPIENT_EMAIL", "").strip()
+    from personalize import load_managers
+    managers = load_managers()
 
     # Validate mandatory fields
     if not (league_id and season and espn_s2 and swid):
         raise RuntimeError("Missing league credentials")
-    if not (smtp_server and smtp_username and smtp_password 
-            and sender_email and recipient_email):
+    smtp = smtp_settings()
+    if not (recipient_email or managers):
         raise RuntimeError("Missing SMTP credentials")
 
-    # Initialize league
-    league = League(int(league_id), int(season), espn_s2=espn_s2, swid=swid)
-
-    # Compute time window (last 3 days)
-    tz = pytz.timezone("America/New_York")
-    now = datetime.now(tz)
-    cutoff = now - timedelta(days=3)
-
-    # Initialize dictionary for changes
-    changes_by_team = {team.team_name: [] for team in league.teams}
-
-    # Fetch and process recent activities
-    activities = league.recent_activity(size=200)
-    for activity in activities:
-        # Parse the activity date; skip if date is invalid
-        try:
-            activity_dt = parser.isoparse(activity.date).astimezone(tz)
-        except Exception:
-            continue
-        # Skip if older than cutoff
-        if activity_dt < cutoff:
-            continue
-        # Process each action in the activity
-        for team, action, player, bid_amount in activity.actions:
-            description = ""
-            if "ADDED" in action:
-                description = f"Added {player.name}"
-                if bid_amount:
-                    description += f" (waiver bid {bid_amount})"
-            elif "DROPPED" in action:
-                description = f"Dropped {player.name}"
-            elif "TRADED" in action:
-                description = f"Traded {player.name}"
-            else:
-                # Fallback for other actions like moved to IR, etc.
-                description = f"{action.title()} {player.name}"
-            changes_by_team[team.team_name].append(description)
-
-    # Build markdown summary
-    period_str = f"{cutoff.strftime('%b %d')} - {now.strftime('%b %d')}"
-    md_lines = []
-    md_lines.append(f"### Roster Updates ({period_str})\n\n")
-    for team_name in sorted(changes_by_team.keys()):
-        entries = changes_by_team[team_name]
-        if entries:
-            md_lines.append(f"**{team_name}**\n")
-            for entry in entries:
-                md_lines.append(f"- {entry}\n")
-            md_lines.append("\n")
-        else:
-            md_lines.append(f"**{team_name}**: No changes\n\n")
-    markdown = "".join(md_lines)
-
-    # Prepare subject and send email
-    subject = f"Roster Updates ({now.strftime('%b %d')})"
-    from email_smtp import send_via_smtp
-    send_via_smtp(
-        smtp_server=smtp_server,
-        smtp_port=int(smtp_port or 587),
-        username=smtp_username,
-        password=smtp_password,
-        sender=sender_email,
-        recipient=recipient_email,
-        subject=subject,
-        markdown=markdown,
-    )
+    with metrics.run("roster", league_id=league_id, season=season):
+        # Initialize league (shares the on-disk ESPN cache with the other jobs)
+        with metrics.span("league"):
+            league = cached_league(league_id, season, espn_s2=espn_s2, swid=swid)
+        send_digest(league, recipient_email, smtp, managers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+
+# Content-addressed journal of rendered reports. Each job hashes its normalized inputs
+# (team rows, scoreboard totals, activity set); the rendered report is stored under that
+# hash along with who it was delivered to. A rerun whose inputs hash to a report already
+# delivered to the same recipient skips ranking, rendering and sending, and a rerun for a
+# new recipient reuses the stored rendering. FORCE_SEND=1 sends anyway.
+JOURNAL_DIR = os.environ.get("RUN_JOURNAL_DIR", ".cache/journal").strip()
+JOURNAL_MAX_AGE = float(os.environ.get("RUN_JOURNAL_MAX_AGE", str(90 * 24 * 3600)))
+FORCE_SEND = os.environ.get("FORCE_SEND", "").strip() not in ("", "0")
+
+# Bump when a report's rendering changes so old entries stop matching
+FORMAT_VERSION = 1
+
+
+def input_digest(job: str, inputs) -> str:
+    """Stable hash of JSON-serializable inputs (dict key order doesn't matter)."""
+    canonical = json.dumps({"job": job, "format": FORMAT_VERSION, "inputs": inputs},
+                           sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RunJournal:
+    def __init__(self, root: str = JOURNAL_DIR, max_age: float = JOURNAL_MAX_AGE):
+        self.root = root
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def _path(self, job: str, digest: str) -> str:
+        return os.path.join(self.root, job, digest + ".json")
+
+    def lookup(self, job: str, digest: str) -> Optional[Dict]:
+        try:
+            with open(self._path(job, digest), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, job: str, digest: str, entry: Dict) -> None:
+        path = self._path(job, digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+    def rendered(self, job: str, digest: str) -> Optional[str]:
+        entry = self.lookup(job, digest)
+        return entry["body"] if entry else None
+
+    def delivered(self, job: str, digest: str, recipient: str) -> bool:
+        if FORCE_SEND:
+            return False
+        entry = self.lookup(job, digest)
+        return bool(entry) and recipient in entry.get("delivered", {})
+
+    def store(self, job: str, digest: str, body: str) -> None:
+        with self._lock:
+            entry = self.lookup(job, digest) or {"job": job, "created_at": time.time(), "delivered": {}}
+            entry["body"] = body
+            self._write(job, digest, entry)
+        self.prune(job)
+
+    def mark_delivered(self, job: str, digest: str, recipient: str) -> None:
+        with self._lock:
+            entry = self.lookup(job, digest)
+            if entry is None:
+                return
+            entry.setdefault("delivered", {})[recipient] = time.time()
+            self._write(job, digest, entry)
+
+    def prune(self, job: str) -> None:
+        directory = os.path.join(self.root, job)
+        cutoff = time.time() - self.max_age
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def render(self, job: str, digest: str, build) -> str:
+        """The stored rendering for digest, or build() it and store it."""
+        body = self.rendered(job, digest)
+        if body is None:
+            body = build()
+            self.store(job, digest, body)
+        return body
+
+
+_default_journal: Optional[RunJournal] = None
+
+
+def default_journal() -> RunJournal:
+    global _default_journal
+    if _default_journal is None:
+        _default_journal = RunJournal()
+    return _default_journal
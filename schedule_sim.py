@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Monte Carlo schedule luck: replay the season under random schedules, keeping every
+# team's actual weekly scores, and see how many wins each team "should" have had.
+# Works on the week x team score matrix from allplay.score_matrix; results are
+# histograms of half-win counts so any number of simulations fits in constant memory.
+# A team with no score in a week (a bye; the league has an odd team count) sits that week
+# out in every simulated schedule too, and a week with an odd number of scores gives one
+# random team a bye. A bye is no game: it adds no win, and nobody's record counts it.
+SCHEDULE_SIMS = int(os.environ.get("SCHEDULE_SIMS", "100000"))
+SIM_PROCESSES = int(os.environ.get("SIM_PROCESSES", "1"))
+SIM_BATCH = 5000
+
+
+def actual_wins(scores: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    played = ~np.isnan(scores) & ~np.isnan(opp)
+    won = np.where(played, (scores > opp) + 0.5 * (scores == opp), 0.0)
+    return won.sum(axis=0)
+
+
+def _simulate(scores: np.ndarray, n_sims: int, seed) -> np.ndarray:
+    n_weeks, n_teams = scores.shape
+    rng = np.random.default_rng(seed)
+    # Odd team counts: pad with a team that never scores, i.e. a bye
+    padded = n_teams + (n_teams % 2)
+    full = np.full((n_weeks, padded), np.nan)
+    full[:, :n_teams] = scores
+    # Teams without a score are shuffled behind the ones with one, so they meet each other
+    # (or the last odd team out) rather than eating real teams' games
+    idle = 2.0 * np.isnan(full)
+    hist = np.zeros((n_teams, 2 * n_weeks + 1), dtype=np.int64)
+    rows = np.arange(n_teams)
+    done = 0
+    while done < n_sims:
+        batch = min(SIM_BATCH, n_sims - done)
+        # Each (sim, week) row is a random permutation; slots (0,1), (2,3), ... play each other
+        perm = np.argsort(rng.random((batch, n_weeks, padded)) + idle, axis=-1)
+        s = np.take_along_axis(np.broadcast_to(full, perm.shape), perm, axis=-1)
+        a, b = s[..., 0::2], s[..., 1::2]
+        result = np.empty_like(s)
+        result[..., 0::2] = (a > b) + 0.5 * (a == b)
+        result[..., 1::2] = (b > a) + 0.5 * (a == b)
+        by_team = np.empty_like(result)
+        np.put_along_axis(by_team, perm, result, axis=-1)
+        half_wins = np.rint(2 * by_team.sum(axis=1)[:, :n_teams]).astype(np.int64)
+        hist += np.bincount((rows * hist.shape[1] + half_wins).ravel(), minlength=hist.size).reshape(hist.shape)
+        done += batch
+    return hist
+
+
+def simulate_schedules(scores, n_sims: int = SCHEDULE_SIMS, seed: Optional[int] = None,
+                       processes: int = SIM_PROCESSES) -> np.ndarray:
+    """
+    Histogram of simulated wins: hist[t, k] is the number of schedules in which team t
+    finished with k/2 wins. Split across a process pool when processes > 1.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    scores = scores[~np.isnan(scores).all(axis=1)]
+    seeds = np.random.SeedSequence(seed).spawn(max(1, processes))
+    if processes <= 1:
+        return _simulate(scores, n_sims, seeds[0])
+    shares = [n_sims // processes + (1 if i < n_sims % processes else 0) for i in range(processes)]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        parts = list(pool.map(_simulate, [scores] * processes, shares, seeds))
+    return np.sum(parts, axis=0)
+
+
+def schedule_luck(scores, opp, n_sims: int = SCHEDULE_SIMS, seed: Optional[int] = None,
+                  processes: int = SIM_PROCESSES) -> Dict[str, np.ndarray]:
+    """
+    Per team: actual wins, mean/5th/95th percentile simulated wins, and the luck
+    percentile (share of random schedules that would have produced fewer wins, ties
+    counted half). 50 is a neutral schedule; 95 means the actual schedule beat 95% of them.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    opp = np.asarray(opp, dtype=np.float64)
+    # Weeks nobody has played yet; a bye only masks the team that had it
+    played = ~np.isnan(scores).all(axis=1)
+    hist = simulate_schedules(scores[played], n_sims, seed, processes)
+    actual = actual_wins(scores[played], opp[played])
+    total = hist.sum(axis=1, keepdims=True)
+    wins_axis = np.arange(hist.shape[1]) / 2.0
+    cdf = np.cumsum(hist, axis=1) / np.maximum(total, 1)
+    k = np.rint(actual * 2).astype(np.int64)
+    below = np.where(k > 0, np.take_along_axis(cdf, np.maximum(k - 1, 0)[:, None], axis=1)[:, 0], 0.0)
+    at = np.take_along_axis(hist, k[:, None], axis=1)[:, 0] / np.maximum(total[:, 0], 1)
+    return {
+        "actual": actual,
+        "mean": (hist * wins_axis).sum(axis=1) / np.maximum(total[:, 0], 1),
+        "p05": wins_axis[np.argmax(cdf >= 0.05, axis=1)],
+        "p95": wins_axis[np.argmax(cdf >= 0.95, axis=1)],
+        "percentile": 100.0 * (below + 0.5 * at),
+    }
+
+
+def build_schedule_luck_lines(names: List[str], luck: Dict[str, np.ndarray]) -> List[Tuple[int, str]]:
+    # (row, line) per team, luckiest first; rows index names
+    order = np.argsort(-luck["percentile"], kind="stable")
+    lines = []
+    for i in order.tolist():
+        lines.append((i, f"{names[i]}: {luck['actual'][i]:g} wins vs {luck['mean'][i]:.1f} expected "
+                         f"(90% range {luck['p05'][i]:g}-{luck['p95'][i]:g}), "
+                         f"luck percentile {luck['percentile'][i]:.0f}"))
+    return lines
@@ -0,0 +1,131 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Column store for team standings, shared by the luck, roster and weekly summary jobs.
+# One TeamTable holds every team of one league, or of many leagues stacked together
+# (the `league` column numbers them), as typed arrays instead of a dict per team.
+# Derived metrics (pfpa, ranks, luck, sos, ...) are added as extra columns, and rows
+# are addressed by position: the id/name lookups are built once, on first use.
+
+
+class TeamTable:
+    __slots__ = ("team_id", "name", "wins", "losses", "pf", "pa", "league", "order", "columns", "_rows")
+
+    def __init__(self, name: Sequence[str], wins, pf, pa, losses=None, team_id=None, league=None):
+        n = len(name)
+        self.name: List[str] = list(name)
+        self.wins = np.asarray(wins, dtype=np.int64).reshape(n)
+        self.losses = np.zeros(n, dtype=np.int64) if losses is None else np.asarray(losses, dtype=np.int64).reshape(n)
+        self.pf = np.asarray(pf, dtype=np.float64).reshape(n)
+        self.pa = np.asarray(pa, dtype=np.float64).reshape(n)
+        self.team_id = np.arange(1, n + 1, dtype=np.int64) if team_id is None else np.asarray(team_id, dtype=np.int64).reshape(n)
+        self.league = np.zeros(n, dtype=np.int64) if league is None else np.asarray(league, dtype=np.int64).reshape(n)
+        # Report order (row indices); rankers and order_by() replace it
+        self.order = np.arange(n)
+        self.columns: Dict[str, np.ndarray] = {}
+        self._rows: Optional[Dict] = None
+
+    @classmethod
+    def from_payload(cls, data: Dict) -> "TeamTable":
+        """Teams from an mTeam/mStandings payload; same fields and defaults as main.extract_rows."""
+        teams = data.get("teams", [])
+        name, team_id, wins, losses, pf, pa = [], [], [], [], [], []
+        for i, t in enumerate(teams):
+            rec = (t.get("record") or {}).get("overall", {})
+            name.append(f"{t.get('location','')} {t.get('nickname','')}".strip())
+            team_id.append(int(t.get("id") or i + 1))
+            wins.append(int(rec.get("wins") or 0))
+            losses.append(int(rec.get("losses") or 0))
+            pf.append(float(rec.get("pointsFor") or 0.0))
+            pa.append(float(rec.get("pointsAgainst") or 0.0))
+        return cls(name, wins, pf, pa, losses=losses, team_id=team_id)
+
+    @classmethod
+    def from_league(cls, league) -> "TeamTable":
+        """Teams from an espn_api League, in league.teams order."""
+        teams = league.teams
+        return cls(
+            [team.team_name for team in teams],
+            [team.wins for team in teams],
+            [team.points_for for team in teams],
+            [getattr(team, "points_against", 0.0) for team in teams],
+            losses=[team.losses for team in teams],
+            team_id=[team.team_id for team in teams],
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict], league=None) -> "TeamTable":
+        """Teams from main.extract_rows-style dicts."""
+        return cls([r["name"] for r in rows], [r["wins"] for r in rows], [r["pf"] for r in rows],
+                   [r["pa"] for r in rows], league=league)
+
+    @classmethod
+    def stack(cls, tables: Iterable["TeamTable"]) -> "TeamTable":
+        """One table over many leagues; table k's rows get league id k."""
+        tables = list(tables)
+        if not tables:
+            return cls([], [], [], [])
+        return cls(
+            [n for t in tables for n in t.name],
+            np.concatenate([t.wins for t in tables]),
+            np.concatenate([t.pf for t in tables]),
+            np.concatenate([t.pa for t in tables]),
+            losses=np.concatenate([t.losses for t in tables]),
+            team_id=np.concatenate([t.team_id for t in tables]),
+            league=np.repeat(np.arange(len(tables)), [len(t) for t in tables]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.name)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __setitem__(self, column: str, values) -> None:
+        values = np.asarray(values)
+        if values.shape[:1] != (len(self),):
+            raise ValueError(f"column {column!r} has {values.shape[:1]} rows, table has {len(self)}")
+        self.columns[column] = values
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def _lookup(self, league: int):
+        if self._rows is None:
+            self._rows = {}
+            for i, (lg, tid, name) in enumerate(zip(self.league.tolist(), self.team_id.tolist(), self.name)):
+                by_id, by_name = self._rows.setdefault(lg, ({}, {}))
+                by_id[tid] = i
+                by_name.setdefault(name, i)
+        return self._rows.get(league, ({}, {}))
+
+    def id_index(self, league: int = 0) -> Dict[int, int]:
+        """team_id -> row for one league (built once, shared; don't mutate)."""
+        return self._lookup(league)[0]
+
+    def name_index(self, league: int = 0) -> Dict[str, int]:
+        return self._lookup(league)[1]
+
+    def row_of(self, team_id: int, league: int = 0) -> Optional[int]:
+        return self.id_index(league).get(int(team_id))
+
+    def row_named(self, name: str, league: int = 0) -> Optional[int]:
+        return self.name_index(league).get(name)
+
+    def order_by(self, *columns: str, descending: bool = False) -> np.ndarray:
+        """Set report order by one or more columns (first is the primary key); ties keep row order."""
+        keys = [self.columns[c] if c in self.columns else getattr(self, c) for c in reversed(columns)]
+        if descending:
+            keys = [-np.asarray(k) for k in keys]
+        self.order = np.lexsort(keys + [self.league]) if keys else np.argsort(self.league, kind="stable")
+        return self.order
+
+    def league_rows(self, n_leagues: Optional[int] = None) -> List[np.ndarray]:
+        """Row indices of each league, in report order (the order must be grouped by league)."""
+        if n_leagues is None:
+            n_leagues = int(self.league.max()) + 1 if len(self) else 0
+        if not n_leagues:
+            return []
+        counts = np.bincount(self.league, minlength=n_leagues)
+        return np.split(self.order, np.cumsum(counts)[:-1])
@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+
+# The job modules read their configuration from the environment at import time, so every
+# store and cache is pointed at a scratch directory (and mail/ESPN secrets are cleared)
+# before any of them is imported.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STATE_DIR = tempfile.mkdtemp(prefix="hrl-tests-")
+for _var, _sub in (("ESPN_CACHE_DIR", "espn"), ("WEEKLY_STORE_DIR", "weekly"), ("ARCHIVE_DIR", "archive"),
+                   ("ACTIVITY_DIR", "activity"), ("RUN_JOURNAL_DIR", "journal"), ("LINEUP_STORE_DIR", "lineups"),
+                   ("INJURY_DIR", "injuries"), ("DAEMON_STATE_DIR", "daemon")):
+    os.environ[_var] = os.path.join(STATE_DIR, _sub)
+for _var in ("ESPN_BASE_URL", "SENDGRID_API_KEY", "SMTP_SERVER", "SMTP_PORT", "SMTP_USERNAME", "SMTP_PASSWORD",
+             "SENDER_EMAIL", "RECIPIENT_EMAIL", "MANAGERS", "MANAGERS_FILE", "METRICS", "FORCE_SEND",
+             "LEAGUES_FILE", "LEAGUE_ID", "SEASON", "SWID", "ESPN_S2"):
+    os.environ.pop(_var, None)
@@ -0,0 +1,55 @@
+import time
+import threading
+from types import SimpleNamespace
+
+from activity_log import ActivityLog
+
+
+class SlowLeague:
+    """recent_activity() that takes a while, so two ingests overlap."""
+
+    def __init__(self, activities, delay: float = 0.2):
+        self.activities = activities
+        self.delay = delay
+        self.calls = 0
+
+    def recent_activity(self, size=25, offset=0):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.activities[offset:offset + size]
+
+
+def activity(date_ms: int, team_id: int, player_id: int, action: str = "FA ADDED", bid: int = 0):
+    team = SimpleNamespace(team_id=team_id, team_name=f"Team {team_id}")
+    player = SimpleNamespace(playerId=player_id, name=f"Player {player_id}", position="WR")
+    return SimpleNamespace(date=date_ms, actions=[(team, action, player, bid)])
+
+
+def test_concurrent_ingests_of_one_league_log_each_record_once(tmp_path):
+    league = SlowLeague([activity(1_700_000_000_000, 1, 10)])
+    logs = [ActivityLog(1, 2025, str(tmp_path)), ActivityLog(1, 2025, str(tmp_path))]
+    results = [None, None]
+
+    def ingest(k):
+        results[k] = logs[k].ingest(league)
+
+    threads = [threading.Thread(target=ingest, args=(k,)) for k in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(len(r) for r in results) == [0, 1]
+    assert len(ActivityLog(1, 2025, str(tmp_path)).all()) == 1
+
+
+def test_stale_instance_resumes_from_the_saved_cursor(tmp_path):
+    first = activity(1_700_000_000_000, 1, 10)
+    league = SlowLeague([first], delay=0)
+    stale = ActivityLog(1, 2025, str(tmp_path))
+    assert len(ActivityLog(1, 2025, str(tmp_path)).ingest(league)) == 1
+
+    # Newest first, as ESPN pages them
+    league.activities = [activity(1_700_000_100_000, 2, 11), first]
+    new = stale.ingest(league)
+    assert [r["player_id"] for r in new] == [11]
+    assert [r["player_id"] for r in stale.all()] == [10, 11]
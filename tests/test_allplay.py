@@ -0,0 +1,98 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from allplay import all_play, luck_and_sos
+
+
+def pairwise_all_play(scores):
+    # One week at a time, one pair at a time: the definition all_play vectorizes
+    out = []
+    for week in scores:
+        played = [j for j, s in enumerate(week) if not math.isnan(s)]
+        row = []
+        for i, s in enumerate(week):
+            if math.isnan(s):
+                row.append(math.nan)
+                continue
+            won = sum(1.0 if s > week[j] else 0.5 if s == week[j] else 0.0 for j in played if j != i)
+            row.append(won / (len(played) - 1) if len(played) > 1 else 0.0)
+        out.append(row)
+    return out
+
+
+def pairwise_luck_and_sos(scores, opp, opp_idx, wins):
+    rates = pairwise_all_play(scores)
+    n = len(wins)
+    expected = [sum(r[j] for r in rates if not math.isnan(r[j])) for j in range(n)]
+    games = [sum(1 for r in rates if not math.isnan(r[j])) for j in range(n)]
+    strength = [e / g if g else 0.0 for e, g in zip(expected, games)]
+    sos = []
+    for j in range(n):
+        faced = [strength[week[j]] for week in opp_idx if week[j] >= 0]
+        sos.append(sum(faced) / len(faced) if faced else 0.0)
+    return {
+        "pf": [sum(w[j] for w in scores if not math.isnan(w[j])) for j in range(n)],
+        "pa": [sum(w[j] for w in opp if not math.isnan(w[j])) for j in range(n)],
+        "expected_wins": expected,
+        "luck": [w - e for w, e in zip(wins, expected)],
+        "sos": sos,
+    }
+
+
+def random_season(rng: random.Random, weeks: int, teams: int):
+    # Coarse scores so ties are common; some teams sit out a week (NaN, no opponent)
+    scores = np.full((weeks, teams), np.nan)
+    opp = np.full_like(scores, np.nan)
+    opp_idx = np.full(scores.shape, -1, dtype=np.int64)
+    wins = np.zeros(teams)
+    for w in range(weeks):
+        playing = [j for j in range(teams) if rng.random() > 0.15]
+        rng.shuffle(playing)
+        for a, b in zip(playing[::2], playing[1::2]):
+            sa, sb = rng.choice([80.0, 90.0, 100.0, 110.0]), rng.choice([80.0, 90.0, 100.0, 110.0])
+            scores[w, [a, b]] = sa, sb
+            opp[w, [a, b]] = sb, sa
+            opp_idx[w, [a, b]] = b, a
+            wins[a] += 1.0 if sa > sb else 0.5 if sa == sb else 0.0
+            wins[b] += 1.0 if sb > sa else 0.5 if sa == sb else 0.0
+    return scores, opp, opp_idx, wins
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_all_play_and_luck_match_a_pairwise_loop(seed):
+    rng = random.Random(seed)
+    scores, opp, opp_idx, wins = random_season(rng, rng.randint(1, 14), rng.randint(2, 12))
+    np.testing.assert_allclose(all_play(scores), pairwise_all_play(scores.tolist()), equal_nan=True)
+    got = luck_and_sos(scores, opp, opp_idx, wins)
+    want = pairwise_luck_and_sos(scores.tolist(), opp.tolist(), opp_idx.tolist(), wins.tolist())
+    for key, values in want.items():
+        np.testing.assert_allclose(got[key], values, err_msg=key)
+
+
+def test_ties_byes_and_lone_teams():
+    nan = math.nan
+    scores = np.array([[100.0, 100.0, 90.0, nan],   # two tied at the top, one bye
+                       [nan, nan, 70.0, nan],       # one team played: no one to compare against
+                       [nan, nan, nan, nan]])       # nobody played
+    np.testing.assert_allclose(all_play(scores), [[0.75, 0.75, 0.0, nan], [nan, nan, 0.0, nan], [nan] * 4],
+                               equal_nan=True)
+
+
+def test_leading_axes_are_independent_seasons():
+    rng = random.Random(7)
+    seasons = [random_season(rng, 6, 8) for _ in range(3)]
+    stacked = [np.stack(parts) for parts in zip(*seasons)]
+    assert stacked[0].shape == (3, 6, 8)
+    np.testing.assert_allclose(all_play(stacked[0]), [pairwise_all_play(s[0].tolist()) for s in seasons],
+                               equal_nan=True)
+    got = luck_and_sos(*stacked)
+    for k, season in enumerate(seasons):
+        want = luck_and_sos(*season)
+        for key, values in want.items():
+            np.testing.assert_allclose(got[key][k], values, err_msg=key)
+    # A (league x season) grid is just more leading axes
+    grid = luck_and_sos(*(a.reshape(3, 1, *a.shape[1:]) for a in stacked))
+    np.testing.assert_allclose(grid["sos"][:, 0], got["sos"])
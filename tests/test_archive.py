@@ -0,0 +1,27 @@
+import os
+
+from archive import load_archive, write_archive
+
+
+def season(year: int, names):
+    teams = {"season": [year] * len(names), "team_id": list(range(1, len(names) + 1)), "name": list(names),
+             "wins": [1] * len(names), "losses": [0] * len(names), "ties": [0] * len(names),
+             "pf": [100.0] * len(names), "pa": [90.0] * len(names)}
+    weekly = {"season": [year], "week": [1], "team_id": [1], "score": [100.0], "opp_id": [2], "opp_score": [90.0],
+              "playoff": [False]}
+    return {"teams": teams, "weekly": weekly}
+
+
+def test_rewrite_over_a_stale_old_copy(tmp_path):
+    root = str(tmp_path)
+    write_archive(7, [season(2024, ["A", "B"])], root)
+    # Left behind by a writer that died between the two swaps
+    stale = os.path.join(root, "7.old")
+    os.makedirs(stale)
+    open(os.path.join(stale, "names.json"), "w").close()
+
+    write_archive(7, [season(2025, ["A", "C"])], root)
+    arch = load_archive(7, root)
+    assert sorted(set(arch["teams"]["season"].tolist())) == [2024, 2025]
+    assert arch["names"] == ["A", "B", "C"]
+    assert not os.path.exists(stale)
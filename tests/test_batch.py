@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+import batch
+import main
+import run_journal
+
+
+def payload(league_id: str) -> dict:
+    records = [("Hawks", 6, 1300.0, 1000.0), ("Owls", 4, 1100.0, 1150.0), (f"League {league_id}", 2, 900.0, 1250.0)]
+    return {"teams": [{"id": k + 1, "location": name, "nickname": "", "record": {"overall": {
+        "wins": w, "losses": 8 - w, "pointsFor": pf, "pointsAgainst": pa}}}
+        for k, (name, w, pf, pa) in enumerate(records)]}
+
+
+@pytest.fixture
+def leagues(monkeypatch, tmp_path):
+    monkeypatch.setattr(run_journal, "_default_journal", run_journal.RunJournal(str(tmp_path)))
+    fetched = []
+
+    def fetch(league_id, season, swid, espn_s2, **kw):
+        fetched.append(league_id)
+        if league_id == "2":
+            raise RuntimeError("ESPN API error 500: down")
+        return payload(league_id)
+
+    monkeypatch.setattr(batch, "fetch_league_json", fetch)
+    return fetched, [{"league_id": str(i), "season": "2025", "swid": "s", "espn_s2": "e"} for i in (1, 2, 3)]
+
+
+def test_one_failing_league_does_not_stop_the_others(leagues):
+    fetched, specs = leagues
+    results = batch.run_batch(specs, concurrency=2, send=False)
+    assert sorted(fetched) == ["1", "2", "3"]
+    assert [r["league_id"] for r in results] == ["1", "2", "3"]
+    assert results[1] == {"league_id": "2", "season": "2025", "error": "RuntimeError: ESPN API error 500: down"}
+    for r in (results[0], results[2]):
+        assert "error" not in r
+        assert f"| League {r['league_id']} |" in r["markdown"]
+
+
+def test_main_logs_the_failure_and_exits_nonzero(leagues, monkeypatch, tmp_path, capsys):
+    _, specs = leagues
+    path = tmp_path / "leagues.json"
+    path.write_text(json.dumps(specs))
+    monkeypatch.setattr(main, "in_active_season", lambda today: True)
+    monkeypatch.setattr(batch.sys, "argv", ["batch.py", str(path)])
+    with pytest.raises(SystemExit) as exc:
+        batch.main()
+    assert exc.value.code == 1
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "League 2 (2025) failed: RuntimeError: ESPN API error 500: down"
+    assert out[1].startswith("Processed 3 leagues in ") and out[1].endswith("(1 failed).")
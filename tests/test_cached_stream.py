@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+import espn_cache
+import http_transport
+import main
+from benchmarks.espn_server import ServerConfig, start_server
+
+
+@pytest.fixture
+def espn(monkeypatch, tmp_path):
+    server, base_url = start_server(ServerConfig(teams=10, weeks=14, pad_kb=256))
+    cache = espn_cache.ResponseCache(str(tmp_path))
+    transport = http_transport.Transport()
+    monkeypatch.setattr(espn_cache, "ESPN_BASE_URL", base_url)
+    monkeypatch.setattr(espn_cache, "_default_cache", cache)
+    monkeypatch.setattr(http_transport, "_default_transport", transport)
+    yield server, base_url, cache
+    transport.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_streamed_fetch_matches_a_full_parse_and_fills_the_cache(espn):
+    server, _, _ = espn
+    fields = main.TEAM_ROW_FIELDS
+    streamed = main.fetch_league_json("5", "2025", "{swid}", "s2", fields=fields)
+    assert server.stub.stats["requests"] == 1
+    # Served from the entry the stream wrote, no second request
+    assert main.fetch_league_json("5", "2025", "{swid}", "s2", fields=fields) == streamed
+    full = main.fetch_league_json("5", "2025", "{swid}", "s2")
+    assert server.stub.stats["requests"] == 1
+    assert [t["record"]["overall"]["wins"] for t in streamed["teams"]] == \
+        [t["record"]["overall"]["wins"] for t in full["teams"]]
+
+
+def test_a_stream_read_partway_stores_nothing(espn):
+    server, base_url, cache = espn
+    url = f"{base_url}/apis/v3/games/ffl/seasons/2025/segments/0/leagues/6"
+    status, chunks = espn_cache.cached_stream(url, "partial", params={"view": ["mTeam"]}, chunk_size=1024)
+    assert status == 200
+    next(chunks)
+    chunks.close()
+    assert cache.lookup("partial") is None
+
+    status, chunks = espn_cache.cached_stream(url, "whole", params={"view": ["mTeam"]}, chunk_size=1024)
+    body = b"".join(chunks)
+    assert json.loads(body)["id"] == 6
+    assert cache.lookup("whole")["body"] == body
+    assert server.stub.stats["requests"] == 2
+
+
+@pytest.mark.parametrize("min_bytes, views, streams", [
+    (1 << 20, ("mTeam", "mStandings"), False),  # ~260 KB body: json.loads
+    (64 << 10, ("mTeam", "mStandings"), True),  # past the threshold
+    (1 << 20, ("mTeam", "mRoster"), True),      # a heavy view streams whatever the size
+])
+def test_stream_parse_only_for_heavy_views_or_large_bodies(espn, monkeypatch, min_bytes, views, streams):
+    import espn_stream
+    projected = []
+    project = espn_stream.project
+    monkeypatch.setattr(espn_stream, "project", lambda chunks, spec: projected.append(spec) or project(chunks, spec))
+    monkeypatch.setattr(main, "STREAM_MIN_BYTES", min_bytes)
+    fields = main.TEAM_ROW_FIELDS
+    data = main.fetch_league_json("5", "2025", "{swid}", "s2", views=views, fields=fields)
+    assert projected == ([fields] if streams else [])
+    assert [t["record"]["overall"]["wins"] for t in data["teams"]] == \
+        [t["record"]["overall"]["wins"] for t in main.fetch_league_json("5", "2025", "{swid}", "s2", views=views)["teams"]]
+    assert espn[0].stub.stats["requests"] == 1
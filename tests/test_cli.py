@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+import cli
+import daemon
+import main
+import roster_updates
+import weekly_summary
+from conftest import ROOT
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "in_active_season", lambda today: True)
+    monkeypatch.setattr(main, "main", lambda: calls.append("luck"))
+    monkeypatch.setattr(roster_updates, "main", lambda: calls.append("roster"))
+    monkeypatch.setattr(weekly_summary, "main", lambda: calls.append("summary"))
+    monkeypatch.setattr(daemon, "main", lambda args: calls.append(("daemon", args)))
+    return calls
+
+
+@pytest.mark.parametrize("command", ["luck", "roster", "summary"])
+def test_each_command_runs_its_job(calls, command):
+    cli.main([command])
+    assert calls == [command]
+
+
+def test_daemon_gets_the_remaining_arguments(calls):
+    cli.main(["daemon", "--once", "--force", "roster"])
+    assert calls == [("daemon", ["--once", "--force", "roster"])]
+
+
+def test_luck_skips_outside_the_season(calls, monkeypatch, capsys):
+    monkeypatch.setattr(main, "in_active_season", lambda today: False)
+    cli.main(["luck"])
+    assert calls == []
+    assert "Outside active season" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("argv", [[], ["bogus"], ["luck", "roster"]])
+def test_bad_arguments_print_usage_and_exit_2(calls, capsys, argv):
+    with pytest.raises(SystemExit) as exc:
+        cli.main(argv)
+    assert exc.value.code == 2
+    assert capsys.readouterr().err.startswith("Usage: python cli.py {luck|roster|summary|daemon}")
+    assert calls == []
+
+
+def test_import_stays_stdlib_only():
+    # A fresh interpreter: this one already has everything loaded
+    check = ("import sys, cli\n"
+             "heavy = sorted(m for m in ('numpy', 'espn_api', 'requests', 'main') if m in sys.modules)\n"
+             "assert not heavy, heavy\n")
+    proc = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
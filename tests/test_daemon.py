@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import daemon
+import espn_cache
+from daemon import Cron, Daemon, run_key
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+SPEC = {"league_id": "7", "season": "2025", "recipient": "a@example.com", "jobs": ["roster"]}
+# Thu 2025-10-16 and Sun 2025-10-19 are roster days
+THURSDAY, SUNDAY = utc(2025, 10, 16, 14, 0), utc(2025, 10, 19, 14, 0)
+
+
+def test_cron_lists_ranges_steps_and_names():
+    roster = Cron("0 14 * * TUE,THU,SUN")
+    assert roster.matches(THURSDAY) and roster.matches(SUNDAY)
+    assert not roster.matches(utc(2025, 10, 17, 14, 0))
+    assert not roster.matches(utc(2025, 10, 19, 14, 1))
+
+    weekdays = Cron("*/15 9-10 * * MON-FRI")
+    assert weekdays.matches(utc(2025, 10, 17, 10, 45))
+    assert not weekdays.matches(utc(2025, 10, 17, 10, 50))
+    assert not weekdays.matches(utc(2025, 10, 18, 10, 45))
+    # 7 is Sunday too; month names work like numbers
+    assert Cron("0 0 * OCT 7").matches(utc(2025, 10, 19, 0, 0))
+    assert not Cron("0 0 * NOV 7").matches(utc(2025, 10, 19, 0, 0))
+
+
+def test_cron_day_fields():
+    # Only the day of month restricted: that day, whatever the weekday
+    nov7 = Cron("0 14 7 11 *")
+    assert nov7.matches(utc(2025, 11, 7, 14, 0))
+    assert not nov7.matches(utc(2025, 11, 8, 14, 0))
+    # Both restricted: either one is enough, like cron
+    either = Cron("0 0 1 * MON")
+    assert either.matches(utc(2025, 10, 1, 0, 0))
+    assert either.matches(utc(2025, 10, 6, 0, 0))
+    assert not either.matches(utc(2025, 10, 7, 0, 0))
+
+
+@pytest.mark.parametrize("line", ["0 14 * *", "60 * * * *", "0 14 * * FUNDAY", "0 14 5-2 * *"])
+def test_cron_rejects_bad_lines(line):
+    with pytest.raises(ValueError):
+        Cron(line)
+
+
+@pytest.fixture
+def roster_daemon(tmp_path):
+    return Daemon([SPEC], schedules={"roster": "0 14 * * TUE,THU,SUN"}, state_dir=str(tmp_path))
+
+
+def test_due_catches_up_once_and_not_again(roster_daemon, monkeypatch, tmp_path):
+    monkeypatch.setattr(daemon, "DAEMON_CATCHUP", 6 * 3600)
+    assert roster_daemon.due(SUNDAY - timedelta(minutes=1)) == []
+    # Down over the slot, back up within the catch-up window
+    later = SUNDAY + timedelta(hours=2)
+    assert roster_daemon.due(later) == [("roster", SPEC, SUNDAY.timestamp())]
+    roster_daemon._finish("roster", SPEC, SUNDAY.timestamp(), "sent", "", 0.1)
+    assert roster_daemon.due(later) == []
+    assert roster_daemon.due(later + timedelta(hours=3)) == []
+    # A forced run goes anyway, and state survives a restart
+    assert len(roster_daemon.due(later, force=("roster",))) == 1
+    restarted = Daemon([SPEC], schedules={"roster": "0 14 * * TUE,THU,SUN"}, state_dir=str(tmp_path))
+    assert restarted.due(later) == []
+
+
+def test_missed_slots_collapse_into_one_run(roster_daemon, monkeypatch):
+    monkeypatch.setattr(daemon, "DAEMON_CATCHUP", 5 * 24 * 3600)
+    # Thursday's and Sunday's slots were both missed: only the latest runs
+    assert roster_daemon.due(SUNDAY + timedelta(hours=1)) == [("roster", SPEC, SUNDAY.timestamp())]
+    # Past the window nothing is caught up
+    monkeypatch.setattr(daemon, "DAEMON_CATCHUP", 3600)
+    assert roster_daemon.due(SUNDAY + timedelta(hours=2)) == []
+
+
+def test_failed_runs_retry_with_backoff_then_give_up(roster_daemon, monkeypatch):
+    monkeypatch.setattr(daemon, "DAEMON_RETRIES", 3)
+    monkeypatch.setattr(daemon, "DAEMON_RETRY_DELAY", 60)
+    clock = [SUNDAY.timestamp() + 60]
+    monkeypatch.setattr(daemon.time, "time", lambda: clock[0])
+    slot = SUNDAY.timestamp()
+    key = run_key("roster", SPEC)
+
+    roster_daemon._finish("roster", SPEC, slot, "", "RuntimeError: boom", 1.0)
+    entry = roster_daemon.state[key]
+    assert (entry["status"], entry["attempts"], entry["next_try"]) == ("retrying", 1, clock[0] + 60)
+    assert "slot" not in entry
+    assert roster_daemon.due(utc(2025, 10, 19, 14, 1, 30)) == []
+    assert len(roster_daemon.due(utc(2025, 10, 19, 14, 2, 1))) == 1
+
+    roster_daemon._finish("roster", SPEC, slot, "", "RuntimeError: boom", 1.0)
+    entry = roster_daemon.state[key]
+    assert (entry["status"], entry["attempts"], entry["next_try"]) == ("retrying", 2, clock[0] + 120)
+
+    roster_daemon._finish("roster", SPEC, slot, "", "RuntimeError: boom", 1.0)
+    entry = roster_daemon.state[key]
+    assert (entry["status"], entry["attempts"], entry["slot"]) == ("failed", 3, slot)
+    assert "retry_slot" not in entry and "next_try" not in entry
+    # Given up: the slot isn't due again, the next scheduled one is
+    assert roster_daemon.due(utc(2025, 10, 19, 18, 0)) == []
+    assert len(roster_daemon.due(utc(2025, 10, 21, 14, 5))) == 1
+
+
+def test_league_clients_are_shared_within_a_tick(tmp_path, monkeypatch):
+    built = []
+    monkeypatch.setattr(espn_cache, "cached_league", lambda *a, **kw: built.append(a) or object())
+    leagues = []
+    monkeypatch.setattr(daemon, "run_job", lambda job, spec, clients, today: leagues.append(clients.get(spec)) or "ok")
+    spec = dict(SPEC, jobs=["roster", "summary"])
+    d = Daemon([spec], schedules={"roster": "0 14 * * SUN", "summary": "0 14 * * WED"}, state_dir=str(tmp_path))
+
+    assert [r[0] for r in d.tick(SUNDAY, force=("roster", "summary"))] == ["ok", "ok"]
+    assert len(built) == 1 and leagues[0] is leagues[1]
+    # The next tick reads fresh standings
+    d.tick(SUNDAY + timedelta(days=3), force=("summary",))
+    assert len(built) == 2 and leagues[2] is not leagues[0]
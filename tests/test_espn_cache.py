@@ -0,0 +1,38 @@
+import os
+
+import espn_cache
+from espn_cache import ResponseCache, cache_key
+
+
+def test_lookup_survives_a_concurrent_evict(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    cache.store("k", b"{}")
+
+    def evicted(path, *args, **kwargs):
+        # evict() on another thread removes the entry between the reads and the touch
+        cache.remove("k")
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(espn_cache.os, "utime", evicted)
+    assert cache.lookup("k") is None
+
+
+def test_lookup_without_body_misses_once_the_body_is_gone(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store("k", b"{}")
+    assert cache.lookup("k", read_body=False)["size"] == 2
+    os.remove(os.path.join(str(tmp_path), "k.body"))
+    assert cache.lookup("k", read_body=False) is None
+    assert cache.lookup("k") is None
+
+
+def test_cache_key_separates_logins():
+    params = {"view": ["mTeam", "mStandings"]}
+    alice = {"SWID": "{alice}", "espn_s2": "s2-a"}
+    bob = {"SWID": "{bob}", "espn_s2": "s2-b"}
+    assert cache_key(1, 2025, params, cookies=alice) == cache_key(1, 2025, dict(params), cookies=dict(alice))
+    assert cache_key(1, 2025, params, cookies=alice) != cache_key(1, 2025, params, cookies=bob)
+    assert cache_key(1, 2025, params, cookies=alice) != cache_key(1, 2025, params)
+    assert cache_key(1, 2025, params, cookies={}) == cache_key(1, 2025, params)
+    # The cookies themselves never end up in the file name
+    assert "s2-a" not in cache_key(1, 2025, params, cookies=alice)
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+import main
+from benchmarks.synthetic import full_league_json
+from espn_stream import CHUNK_SIZE, project_bytes
+
+TRICKY = {
+    "teams": [
+        {"id": 1, "location": "Ångström \"Quoted\" \\ Back", "nickname": "東京 ✓ é", "record": {
+            "overall": {"wins": 3, "losses": 0, "pointsFor": 1234.565, "pointsAgainst": -1.5e-3, "ties": None}},
+         "roster": {"entries": [[[[[[[[{"deep": [1, {"x": "}]{[\""}]}]]]]]]], {}, [], "", 0]}},
+        {"id": 2, "location": "", "nickname": "Plain", "record": {"overall": {
+            "wins": 0, "losses": 12, "pointsFor": 0, "pointsAgainst": 1e3}}, "extra": [True, False, None]},
+        {"id": 3, "location": "Keyé", "record": {"home": {"wins": 1}}},
+        {"id": 4, "record": [], "location": {"not": "a string"}},
+    ],
+    "escé\"key": {"teams": "not this one"},
+    "members": [{"displayName": "𝔘𝔫𝔦𝔠𝔬𝔡𝔢 beyond the BMP"}] * 3,
+}
+SPECS = [
+    True,
+    main.TEAM_ROW_FIELDS,
+    {"teams": [{"roster": True, "location": True}], "members": [{"displayName": True}]},
+    {"teams": [{"record": {"overall": True}}], "escé\"key": {"teams": True}},
+    {"nothing": True},
+]
+
+
+def reference(value, spec):
+    # What project() should return: json.loads, then keep only the spec's paths
+    if spec is True or not isinstance(value, (dict, list)):
+        return value
+    if isinstance(spec, dict) and isinstance(value, dict):
+        return {k: reference(v, spec[k]) for k, v in value.items() if k in spec}
+    if isinstance(spec, list) and isinstance(value, list):
+        return [reference(v, spec[0]) for v in value]
+    return None
+
+
+def bodies():
+    yield "tricky", json.dumps(TRICKY, ensure_ascii=False).encode("utf-8")
+    yield "tricky-ascii", json.dumps(TRICKY, indent=2).encode("utf-8")
+    yield "league", json.dumps(full_league_json(6, 4, seed=5)).encode("utf-8")
+    # leagueHistory answers with a one-element array
+    yield "history", json.dumps([TRICKY]).encode("utf-8")
+
+
+@pytest.mark.parametrize("name,body", list(bodies()), ids=lambda v: v if isinstance(v, str) else None)
+@pytest.mark.parametrize("spec", SPECS)
+def test_project_bytes_matches_json_loads_at_every_chunk_size(name, body, spec):
+    data = json.loads(body)
+    expected = [reference(v, spec) for v in data] if isinstance(data, list) and isinstance(spec, dict) \
+        else reference(data, spec)
+    sizes = list(range(1, 65)) if name != "league" else [1, 2, 3, 7, 16, 61, 64]
+    for size in sizes + [CHUNK_SIZE]:
+        assert project_bytes(body, spec, chunk_size=size) == expected, size
+
+
+@pytest.mark.parametrize("body", [b'{"teams": [1, 2}', b'{"teams": ', b'{"a": 1} x', b'{"a" 1}', b"[1, 2,]"])
+def test_malformed_bodies_raise(body):
+    for size in (1, 3, CHUNK_SIZE):
+        with pytest.raises(ValueError):
+            project_bytes(body, {"teams": True, "a": True}, chunk_size=size)
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+from espn_api.requests.espn_requests import ESPNAccessDenied, ESPNUnknownError, EspnFantasyRequests
+
+import espn_cache
+import http_transport
+from benchmarks.espn_server import ServerConfig, start_server
+
+
+def espn_request(base_url: str, year: int = 2025) -> EspnFantasyRequests:
+    req = EspnFantasyRequests("nfl", year, 1, cookies={"espn_s2": "s2", "SWID": "{swid}"})
+    for attr in ("ENDPOINT", "LEAGUE_ENDPOINT", "NEWS_ENDPOINT"):
+        setattr(req, attr, base_url + getattr(req, attr).split(".com", 1)[1])
+    return req
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    transport = http_transport.Transport()
+    transport.retries = 2
+    monkeypatch.setattr(http_transport, "_default_transport", transport)
+    yield transport
+    transport.close()
+
+
+def test_throttled_league_get_backs_off_and_honours_retry_after(transport, tmp_path):
+    # --error-rate 1 --retry-after 1: every request is answered 429/503 with Retry-After: 1
+    server, base_url = start_server(ServerConfig(error_rate=1.0, retry_after=1, teams=4, activity=0))
+    try:
+        req = espn_request(base_url)
+        espn_cache.install_cache(req, espn_cache.ResponseCache(str(tmp_path)))
+        limiter = transport.limiter(base_url)
+        rate = limiter.rate
+        start = time.monotonic()
+        with pytest.raises(ESPNUnknownError):
+            req.league_get(params={"view": "mTeam"})
+        elapsed = time.monotonic() - start
+        # The first try and two retries, all over the transport: no unthrottled fallback GET
+        assert server.stub.stats["requests"] == 3
+        assert elapsed >= 2.0
+        assert limiter.rate == pytest.approx(rate / 8)
+
+        server.stub.config.error_rate = 0.0
+        assert req.league_get(params={"view": "mTeam"})["id"] == 1
+        assert server.stub.stats["requests"] == 4
+        assert limiter.rate > rate / 8
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class Response:
+    def __init__(self, status_code: int, content: bytes = b"{}"):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+
+
+class RecordingTransport:
+    def __init__(self, responses):
+        self.responses = responses
+        self.urls = []
+
+    def get(self, url, params=None, headers=None, cookies=None, timeout=None):
+        self.urls.append(url)
+        for fragment, response in self.responses:
+            if fragment in url:
+                return response
+        return Response(404)
+
+
+def test_401_retries_the_alternate_endpoint_over_the_transport(monkeypatch, tmp_path):
+    fake = RecordingTransport([("/leagueHistory/", Response(200, b'[{"id": 1, "seasonId": 2025}]')),
+                               ("/segments/", Response(401))])
+    monkeypatch.setattr(http_transport, "_default_transport", fake)
+    req = espn_request("http://espn.test")
+    espn_cache.install_cache(req, espn_cache.ResponseCache(str(tmp_path)))
+    assert req.league_get(params={"view": "mTeam"}) == {"id": 1, "seasonId": 2025}
+    assert len(fake.urls) == 2
+    assert "/leagueHistory/1?seasonId=2025" in req.LEAGUE_ENDPOINT
+
+
+def test_401_on_both_endpoints_raises_access_denied(monkeypatch, tmp_path):
+    fake = RecordingTransport([("/leagueHistory/", Response(401)), ("/segments/", Response(401))])
+    monkeypatch.setattr(http_transport, "_default_transport", fake)
+    req = espn_request("http://espn.test")
+    original = req.LEAGUE_ENDPOINT
+    espn_cache.install_cache(req, espn_cache.ResponseCache(str(tmp_path)))
+    with pytest.raises(ESPNAccessDenied):
+        req.league_get(params={"view": "mTeam"})
+    assert req.LEAGUE_ENDPOINT == original
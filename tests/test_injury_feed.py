@@ -0,0 +1,47 @@
+import os
+from types import SimpleNamespace
+
+import injury_feed
+import weekly_summary
+from team_table import TeamTable
+
+
+class StatusRequests:
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+    def league_get(self, params=None, headers=None, extend=""):
+        return {"players": [{"id": pid, "player": {"injuryStatus": status}} for pid, status in self.statuses.items()]}
+
+
+def league(statuses, league_id=7):
+    roster = [SimpleNamespace(playerId=pid, name=f"Player {pid}", position="RB", injuryStatus="ACTIVE")
+              for pid in statuses]
+    team = SimpleNamespace(team_name="Team One", team_id=3, wins=1, losses=0, points_for=100.0, points_against=90.0,
+                           roster=roster)
+    return SimpleNamespace(league_id=league_id, year=2025, teams=[team], espn_request=StatusRequests(statuses))
+
+
+def feed_text(lg) -> str:
+    lines = weekly_summary.get_injury_feed(lg, TeamTable.from_league(lg))
+    # Changes are tagged with the team's row, found by team id
+    assert all(row == 0 for row, line in lines if line.startswith("- Team One:"))
+    return "\n".join(line for _, line in lines)
+
+
+def test_rendering_the_feed_leaves_the_history_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(injury_feed, "INJURY_DIR", str(tmp_path))
+    monkeypatch.setattr(injury_feed, "_default_cache", injury_feed.StatusCache(ttl=0))
+    lg = league({1: "OUT", 2: "ACTIVE"})
+    first = feed_text(lg)
+    assert "Currently injured:" in first
+    # An undelivered render (a failed send, a dry run) must not swallow the changes
+    assert feed_text(lg) == first
+    assert not os.listdir(tmp_path)
+
+    weekly_summary.save_injury_history(lg)
+    lg.espn_request.statuses[2] = "QUESTIONABLE"
+    feed = feed_text(lg)
+    assert "Status changes since the last report:" in feed
+    assert "Player 2 (RB) Active -> Questionable" in feed
+    assert "Player 1" not in feed
@@ -0,0 +1,78 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+from lineup_efficiency import BENCH_SLOTS, count_vectors, solve_lineups
+
+QB, RB, WR, TE, DST, K, OP, FLEX, BENCH, IR = 0, 2, 4, 6, 16, 17, 7, 23, 20, 21
+ELIGIBLE = {
+    QB: [QB, OP, BENCH, IR],
+    RB: [RB, FLEX, OP, BENCH, IR],
+    WR: [WR, FLEX, OP, BENCH, IR],
+    TE: [TE, FLEX, OP, BENCH, IR],
+    DST: [DST, BENCH, IR],
+    K: [K, BENCH, IR],
+}
+SLOT_SETS = [
+    {QB: 1, RB: 2, WR: 2, TE: 1, FLEX: 1, DST: 1, K: 1},
+    {QB: 1, RB: 2, WR: 3, TE: 1, FLEX: 2, OP: 1, DST: 1, K: 1},
+    {QB: 2, RB: 1, WR: 1},
+    {FLEX: 3},
+]
+
+
+def brute_force(lineup, slots):
+    """Best total over every assignment of players to slot instances (a slot may stay empty)."""
+    players = [(points, [s for s in eligible if s in slots]) for _, points, eligible in lineup]
+    kinds = sorted(slots)
+
+    @lru_cache(maxsize=None)
+    def best(i, left):
+        if i == len(players):
+            return 0.0
+        points, fits = players[i]
+        out = best(i + 1, left)
+        for s in fits:
+            k = kinds.index(s)
+            if left[k]:
+                out = max(out, points + best(i + 1, left[:k] + (left[k] - 1,) + left[k + 1:]))
+        return out
+
+    return best(0, tuple(slots[s] for s in kinds))
+
+
+def random_lineup(rng, size):
+    lineup = []
+    for _ in range(size):
+        position = rng.choice((QB, RB, RB, WR, WR, WR, TE, DST, K))
+        # Whole points make ties between players common; defenses can go negative
+        points = float(rng.randint(-4 if position == DST else 0, 30))
+        slot = rng.choice(ELIGIBLE[position])
+        lineup.append([slot, points, list(ELIGIBLE[position])])
+    return lineup
+
+
+@pytest.mark.parametrize("slots", SLOT_SETS)
+def test_solve_lineups_matches_brute_force(slots):
+    rng = random.Random(len(slots))
+    lineups = [random_lineup(rng, rng.randint(0, 12)) for _ in range(40)]
+    actual, optimal = solve_lineups(lineups, slots)
+    for r, lineup in enumerate(lineups):
+        assert actual[r] == pytest.approx(sum(p for s, p, _ in lineup if s not in BENCH_SLOTS))
+        assert optimal[r] == pytest.approx(brute_force(lineup, slots)), lineup
+
+
+def test_negative_scorers_leave_the_slot_empty():
+    lineup = [[DST, -3.0, list(ELIGIBLE[DST])], [QB, 20.0, list(ELIGIBLE[QB])]]
+    actual, optimal = solve_lineups([lineup], {QB: 1, DST: 1})
+    assert actual.tolist() == [17.0] and optimal.tolist() == [20.0]
+
+
+def test_count_vectors_enumerates_flex_fills():
+    accepts = {RB: {RB}, WR: {WR}, TE: {TE}, FLEX: {RB, WR, TE}}
+    vectors = count_vectors({RB: 1, WR: 1, FLEX: 2}, accepts, [RB, WR, TE])
+    assert sorted(map(tuple, vectors.tolist())) == sorted(
+        {(1 + a, 1 + b, c) for a in range(3) for b in range(3) for c in range(3) if a + b + c == 2})
+    assert np.all(vectors.sum(axis=1) == 4)
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def output(monkeypatch, tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    monkeypatch.setattr(metrics, "METRICS_OUTPUT", str(path))
+    return path
+
+
+def test_disabled_by_default_and_writes_nothing(output, capsys):
+    assert not metrics.enabled
+    with metrics.run("luck", league="1"):
+        with metrics.span("fetch") as s:
+            pass
+        metrics.count("fetch.bytes", nbytes=100)
+        metrics.record("parse", seconds=1.0)
+    assert s is metrics._NOOP
+    assert metrics._stages == {}
+    assert not output.exists()
+    assert capsys.readouterr().err == ""
+
+
+def test_enabled_run_writes_one_json_line_per_stage(output, monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    with metrics.run("luck", league="1"):
+        for _ in range(2):
+            with metrics.span("fetch"):
+                pass
+        metrics.count("fetch.bytes", nbytes=100)
+        metrics.count("fetch.bytes", nbytes=50)
+    with pytest.raises(KeyError):
+        with metrics.run("summary"):
+            with metrics.span("render"):
+                raise KeyError("x")
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(line["job"], line["stage"]) for line in lines] == [
+        ("luck", "fetch"), ("luck", "fetch.bytes"), ("luck", "total"), ("summary", "render"), ("summary", "total")]
+    fetch, nbytes, total = lines[:3]
+    assert fetch["calls"] == 2 and fetch["seconds"] >= 0.0
+    assert (nbytes["calls"], nbytes["bytes"]) == (2, 150)
+    assert total["seconds"] >= fetch["seconds"] and total["error"] is None
+    assert {line["run_id"] for line in lines[:3]} == {fetch["run_id"]} != {lines[3]["run_id"]}
+    assert all(line["league"] == "1" for line in lines[:3])
+    # A failed run still reports, with the error named; the render span closed on the way out
+    assert lines[4]["error"] == "KeyError" and lines[3]["calls"] == 1
+    assert metrics._stages == {}
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import pytest
+
+import batch
+import main
+import run_journal
+from benchmarks.smtp_server import SmtpConfig, start_server
+from personalize import MARK, ReportTemplate, deliver
+from roster_updates import build_digest
+from team_table import TeamTable
+
+# "Bears" is a prefix of "Bears II": lines must land on the row they were written for
+NAMES = ["Bears II", "Bears", "Lions", "Packers"]
+
+
+def ranked_table():
+    table = TeamTable.from_rows([{"name": name, "wins": w, "pf": pf, "pa": 100.0}
+                                 for name, w, pf in zip(NAMES, [5, 3, 4, 1], [900.0, 950.0, 800.0, 700.0])])
+    return main.rank_table(table)
+
+
+def test_luck_template_slots_follow_table_rows():
+    table = ranked_table()
+    builder = main.build_luck_report(table)
+    assert builder.body() == main.build_markdown(table)
+    template = builder.template([0, 2, 1, 3])
+
+    bears = template.fill(table.row_of(table.team_id[1]))
+    assert bears.startswith("### Your team: Bears\n- Luck Rankings: Standings 3, ")
+    marked = [line for line in bears.splitlines() if MARK in line]
+    line = next(line for line in main.build_markdown(table).splitlines() if line.startswith("| Bears |"))
+    assert marked == [line.replace("| ", f"| {MARK}", 1)]
+    # Standings: Bears II (5-), Lions (4-), Bears (3-), Packers (1-)
+    assert "\nRivals: Lions (one spot ahead), Packers (one spot behind)\n" in bears
+    assert template.fill(None) == main.build_markdown(table)
+
+
+def test_roster_blocks_and_compiled_round_trip():
+    table = TeamTable.from_rows([{"name": name, "wins": 0, "pf": 0.0, "pa": 0.0} for name in NAMES])
+    changes = [["Added A"], ["Dropped B", "Added C"], [], ["Traded D"]]
+    builder = build_digest(table, changes, datetime(2025, 10, 7), datetime(2025, 10, 10))
+    template = ReportTemplate.from_compiled(builder.compiled(), table.name, [0, 1, 2, 3])
+
+    bears = template.fill(1)
+    assert f"**{MARK}Bears**\n- Dropped B\n- Added C\n" in bears
+    assert f"**{MARK}Bears II**" not in bears
+    assert "- Roster Updates: Dropped B; Added C\n" in bears
+    assert "Rivals: Bears II (one spot ahead), Lions (one spot behind)\n- Bears II: Added A\n" in bears
+    # "No changes" lines are marked but list nothing in the header
+    lions = template.fill(2)
+    assert f"**{MARK}Lions**: No changes" in lions
+    assert lions.startswith("### Your team: Lions\nRivals:")
+
+
+def test_luck_job_rivals_follow_the_standings(monkeypatch, tmp_path):
+    # PF/PA ranks match the standings, so every luck is 0 and the luck table runs by PF/PA ascending:
+    # the reverse of the standings
+    records = [("First", 9, 1400.0, 800.0), ("Second", 7, 1300.0, 900.0), ("Third", 5, 1200.0, 1000.0),
+               ("Fourth", 3, 1100.0, 1100.0)]
+    payload = {"teams": [{"id": k + 1, "location": name, "nickname": "", "record": {"overall": {
+        "wins": w, "losses": 12 - w, "pointsFor": pf, "pointsAgainst": pa}}}
+        for k, (name, w, pf, pa) in enumerate(records)]}
+    monkeypatch.setattr(run_journal, "_default_journal", run_journal.RunJournal(str(tmp_path)))
+    monkeypatch.setattr(batch, "fetch_league_json", lambda *a, **kw: payload)
+    captured = {}
+
+    def fake_deliver(job, digest, template, managers, row_of, subject):
+        captured.update(template=template, row_of=row_of)
+        return len(managers), []
+
+    monkeypatch.setattr(batch, "deliver", fake_deliver)
+    spec = {"league_id": "1", "season": "2025", "managers": {"first@example.com": 1, "third@example.com": 3}}
+    assert batch.run_league(spec)["sent"]
+    template, row_of = captured["template"], captured["row_of"]
+    assert "Rivals: Second (one spot behind)\n" in template.fill(row_of(1))
+    assert "Rivals: Second (one spot ahead), Fourth (one spot behind)\n" in template.fill(row_of(3))
+    # The shared report is still the luck table
+    assert [line.split(" | ")[0] for line in template.fill(None).splitlines()[2:]] == \
+        ["| Fourth", "| Third", "| Second", "| First"]
+
+
+@pytest.fixture
+def smtp_server():
+    server, port = start_server(SmtpConfig(refuse=["gone@example.com"]))
+    yield server.stub, {"smtp_server": "127.0.0.1", "smtp_port": port, "username": "", "password": "",
+                        "sender": "league@example.com", "starttls": False}
+    server.shutdown()
+    server.server_close()
+
+
+def test_partial_delivery_returns_the_failures(monkeypatch, tmp_path, smtp_server):
+    stub, smtp = smtp_server
+    journal = run_journal.RunJournal(str(tmp_path))
+    monkeypatch.setattr(run_journal, "_default_journal", journal)
+    table = ranked_table()
+    builder = main.build_luck_report(table)
+    journal.store("luck", "d", builder.body())
+    template = builder.template(table.order.tolist())
+    managers = {"a@example.com": 1, "gone@example.com": 2, "b@example.com": 3}
+
+    sent, failed = deliver("luck", "d", template, managers, table.row_of, "Luck", smtp)
+    assert sent == 2
+    assert len(failed) == 1 and failed[0].startswith("gone@example.com: ")
+    assert [journal.delivered("luck", "d", r) for r in managers] == [True, False, True]
+
+    # A rerun only retries the failed copy
+    stub.config.refuse.clear()
+    assert deliver("luck", "d", template, managers, table.row_of, "Luck", smtp) == (1, [])
+    assert sorted(m[2][0] for m in stub.messages) == ["a@example.com", "b@example.com", "gone@example.com"]
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from playoff_odds import PLAYOFF_BATCH, build_playoff_odds_lines, playoff_bye_counts, score_model, simulate_playoff_odds
+
+
+def schedule(n_teams: int, n_weeks: int):
+    """Circle-method (week, home, away) arrays for the rest of the season."""
+    slots = list(range(n_teams))
+    week, home, away = [], [], []
+    for w in range(n_weeks):
+        for k in range(n_teams // 2):
+            week.append(w)
+            home.append(slots[k])
+            away.append(slots[-1 - k])
+        slots = [slots[0]] + [slots[-1]] + slots[1:-1]
+    return np.array(week), np.array(home), np.array(away)
+
+
+def reference_odds(wins, pf, mean, std, week, home, away, n_weeks, playoff_teams, byes, n_sims, seed):
+    # One season at a time, seeded by sorting (wins, PF) like main.standings_sort, on the same draws
+    rng = np.random.default_rng(seed)
+    n_teams = len(wins)
+    playoff, bye, total = np.zeros(n_teams), np.zeros(n_teams), np.zeros(n_teams)
+    done = 0
+    while done < n_sims:
+        batch = min(PLAYOFF_BATCH, n_sims - done)
+        draws = np.maximum(rng.normal(mean, std, (batch, max(n_weeks, 1), n_teams)), 0.0)
+        for sim in range(batch):
+            w, p = list(map(float, wins)), list(map(float, pf))
+            for k in range(len(week)):
+                h, a = draws[sim, week[k], home[k]], draws[sim, week[k], away[k]]
+                w[home[k]] += 1.0 if h > a else 0.5 if h == a else 0.0
+                w[away[k]] += 1.0 if a > h else 0.5 if h == a else 0.0
+                p[home[k]] += h
+                p[away[k]] += a
+            seeds = sorted(range(n_teams), key=lambda t: (-w[t], -p[t], t))
+            for rank, t in enumerate(seeds):
+                playoff[t] += rank < playoff_teams
+                bye[t] += rank < byes
+            total += w
+        done += batch
+    return playoff / n_sims, bye / n_sims, total / n_sims
+
+
+@pytest.mark.parametrize("n_teams,n_weeks,playoff_teams", [(4, 3, 2), (8, 5, 6), (10, 1, 4)])
+def test_vectorized_odds_match_a_season_by_season_loop(n_teams, n_weeks, playoff_teams):
+    rng = np.random.default_rng(n_teams)
+    wins = rng.integers(0, 6, n_teams)
+    pf = rng.uniform(500, 900, n_teams).round(2)
+    past = rng.normal(105, 20, (6, n_teams))
+    mean, std = score_model(past)
+    week, home, away = schedule(n_teams, n_weeks)
+    byes = playoff_bye_counts(playoff_teams)
+    odds = simulate_playoff_odds(wins, pf, mean, std, week, home, away, n_weeks, playoff_teams,
+                                 n_sims=400, seed=11)
+    playoff, bye, projected = reference_odds(wins, pf, mean, std, week, home, away, n_weeks,
+                                             playoff_teams, byes, 400, 11)
+    np.testing.assert_allclose(odds["playoff"], playoff)
+    np.testing.assert_allclose(odds["bye"], bye)
+    np.testing.assert_allclose(odds["wins"], projected)
+    assert odds["playoff"].sum() == pytest.approx(playoff_teams)
+
+
+def test_finished_season_is_decided_by_the_standings():
+    # No games left: seeds are wins, then PF
+    wins, pf = [9, 9, 7, 10], [1000.0, 1100.0, 1200.0, 900.0]
+    empty = np.zeros(0, dtype=np.int64)
+    odds = simulate_playoff_odds(wins, pf, np.full(4, 100.0), np.full(4, 10.0), empty, empty, empty, 0,
+                                 playoff_teams=3, byes=1, n_sims=50, seed=0)
+    assert odds["playoff"].tolist() == [1.0, 1.0, 0.0, 1.0]
+    assert odds["bye"].tolist() == [0.0, 0.0, 0.0, 1.0]
+
+
+def test_bye_counts():
+    assert [playoff_bye_counts(n) for n in (2, 4, 6, 7, 8)] == [0, 0, 2, 1, 0]
+
+
+def test_tied_odds_are_listed_in_standings_order():
+    # Everyone clinched or eliminated: equal odds fall back to current wins, then PF
+    odds = {"playoff": np.array([1.0, 1.0, 0.0, 1.0]), "bye": np.zeros(4), "wins": np.array([8.0, 9.0, 5.0, 9.0])}
+    lines = build_playoff_odds_lines(["A", "B", "C", "D"], odds, [8, 9, 5, 9], [1200.0, 1000.0, 1300.0, 1100.0])
+    assert [row for row, _ in lines] == [3, 1, 0, 2]
@@ -0,0 +1,73 @@
+import random
+from typing import Dict, List
+
+import pytest
+
+import main
+import ranking
+
+NAMES = ["Zebras", "aardvarks", "Ångström Athletics", "Émile's Eagles", "Ølstykke Owls", "Team 10", "Team 2",
+         "Team 1", "Müller Mayhem", "東京 Titans", "Señor Sacks", "Zoë's Zealots", "Björk Bombers", "Ärger FC"]
+
+
+def legacy_rank_rows(rows: List[Dict]) -> List[Dict]:
+    # main.rank_rows before the vectorized engine, kept verbatim as the reference
+    standings_sorted = main.stable_sort(rows, main.standings_sort)
+    standings_rank = main.tie_rank_map(standings_sorted, lambda r: f"{r['wins']}|{int(round(r['pf']))}")
+    pfpa_sorted = main.stable_sort(rows, main.pfpa_sort)
+    pfpa_rank = main.tie_rank_map(pfpa_sorted, lambda r: f"{main.round2(r['pfpa']):.2f}")
+    enriched = []
+    for r in rows:
+        s, p = standings_rank[r["name"]], pfpa_rank[r["name"]]
+        enriched.append({
+            "name": r["name"], "pf": r["pf"], "pa": r["pa"], "pfpa": main.round2(r["pfpa"]),
+            "pfpaRank": p["rank"], "pfpaDisp": p["display"],
+            "standingsRank": s["rank"], "standingsDisp": s["display"],
+            "luck": p["rank"] - s["rank"],
+        })
+    enriched.sort(key=lambda x: (-x["luck"], x["pfpa"], x["name"]))
+    return enriched
+
+
+def row(name: str, wins: int, pf: float, pa: float) -> Dict:
+    return {"name": name, "wins": wins, "pf": pf, "pa": pa, "pfpa": (pf / pa) if pa > 0 else 0.0}
+
+
+def random_league(rng: random.Random, n: int) -> List[Dict]:
+    rows = []
+    for name in rng.sample(NAMES, n):
+        wins = rng.randrange(4)
+        # Coarse points so wins/PF and PF/PA ties are common; some teams have no PA yet
+        pf = rng.choice((0.0, 100.0, 100.4, 99.6, 250.25, 1234.565, 1234.575, 987.5))
+        pa = rng.choice((0.0, 100.0, 50.0, 200.0, 987.5, 1234.565))
+        rows.append(row(name, wins, pf, pa))
+    return rows
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_rank_rows_matches_the_legacy_sort(seed):
+    rng = random.Random(seed)
+    rows = random_league(rng, rng.randrange(1, len(NAMES) + 1))
+    assert main.rank_rows(rows) == legacy_rank_rows(rows)
+
+
+def test_ties_zero_pa_and_non_ascii_names():
+    rows = [row("Ångström Athletics", 3, 1200.0, 1000.0), row("Zebras", 3, 1200.3, 1000.25),
+            row("aardvarks", 3, 1199.6, 0.0), row("東京 Titans", 1, 900.0, 0.0), row("Émile's Eagles", 1, 900.0, 750.0)]
+    out = main.rank_rows(rows)
+    assert out == legacy_rank_rows(rows)
+    by_name = {r["name"]: r for r in out}
+    # 1200.0, 1200.3 and 1199.6 all round to 1200 points: a three-way tie on 3 wins
+    assert {by_name[n]["standingsDisp"] for n in ("Ångström Athletics", "Zebras", "aardvarks")} == {"T1"}
+    assert by_name["aardvarks"]["pfpa"] == 0.0 and by_name["東京 Titans"]["pfpaDisp"] == "T4"
+
+
+def test_rank_leagues_ranks_each_league_on_its_own():
+    rng = random.Random(7)
+    leagues = [random_league(rng, n) for n in (4, 1, 9, 14)]
+    assert ranking.rank_leagues(leagues) == [legacy_rank_rows(rows) for rows in leagues]
+
+
+def test_round2_array_matches_round2_on_half_cent_boundaries():
+    values = [1234.565, 1234.575, 0.005, 0.015, 2.675, 1.005, -1.005, 0.0, 99.995, 1 / 3]
+    assert ranking.round2_array(values).tolist() == [main.round2(v) for v in values]
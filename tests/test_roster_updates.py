@@ -0,0 +1,59 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import email_smtp
+import roster_updates
+import run_journal
+
+
+class League:
+    league_id = 4242
+    year = 2025
+
+    def __init__(self):
+        self.teams = [SimpleNamespace(team_name=name, team_id=k + 1, wins=k, losses=3 - k, points_for=100.0 * k,
+                                      points_against=90.0) for k, name in enumerate(("Alpha", "Bravo", "Charlie"))]
+
+    def recent_activity(self, size=25, offset=0):
+        return []
+
+
+def clock(day: int):
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2025, 10, day, 9, 0, tzinfo=tz)
+    return Clock
+
+
+@pytest.fixture
+def sent(monkeypatch, tmp_path):
+    out = []
+    monkeypatch.setattr(run_journal, "_default_journal", run_journal.RunJournal(str(tmp_path)))
+    monkeypatch.setattr(email_smtp, "send_via_smtp", lambda recipient, subject, markdown, **smtp:
+                        out.append((recipient, markdown)))
+    return out
+
+
+def test_digest_is_rendered_once_and_keyed_by_its_window(monkeypatch, sent):
+    renders = []
+    build = roster_updates.build_markdown
+    monkeypatch.setattr(roster_updates, "build_markdown", lambda *a: renders.append(a) or build(*a))
+    monkeypatch.setattr(roster_updates, "datetime", clock(10))
+    league = League()
+
+    assert roster_updates.send_digest(league, "a@example.com", {})
+    assert not roster_updates.send_digest(league, "a@example.com", {})
+    # A new recipient gets the stored rendering
+    assert roster_updates.send_digest(league, "b@example.com", {})
+    assert len(renders) == 1
+    assert [r for r, _ in sent] == ["a@example.com", "b@example.com"]
+    assert "(Oct 07 - Oct 10)" in sent[0][1]
+
+    # Same (empty) activity a day later: the header's dates changed, so it is a new digest
+    monkeypatch.setattr(roster_updates, "datetime", clock(11))
+    assert roster_updates.send_digest(league, "a@example.com", {})
+    assert len(renders) == 2
+    assert "(Oct 08 - Oct 11)" in sent[-1][1]
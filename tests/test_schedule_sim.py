@@ -0,0 +1,102 @@
+import numpy as np
+
+from schedule_sim import actual_wins, schedule_luck, simulate_schedules
+
+
+def round_robin(n_teams: int, n_weeks: int, seed: int = 0):
+    """Scores and opponent scores for a circle-method schedule; odd counts get a bye a week (NaN)."""
+    rng = np.random.default_rng(seed)
+    slots = list(range(n_teams)) + ([None] if n_teams % 2 else [])
+    points = rng.normal(110, 20, (n_weeks, n_teams)).round(1)
+    scores = np.full((n_weeks, n_teams), np.nan)
+    opp = np.full_like(scores, np.nan)
+    for w in range(n_weeks):
+        for k in range(len(slots) // 2):
+            a, b = slots[k], slots[-1 - k]
+            if a is None or b is None:
+                continue
+            scores[w, a], scores[w, b] = points[w, a], points[w, b]
+            opp[w, a], opp[w, b] = points[w, b], points[w, a]
+        slots = [slots[0]] + [slots[-1]] + slots[1:-1]
+    return scores, opp
+
+
+def test_odd_team_count_keeps_every_week():
+    scores, opp = round_robin(5, 10)
+    assert np.isnan(scores).any(axis=1).all()
+    luck = schedule_luck(scores, opp, n_sims=2000, seed=1)
+    np.testing.assert_array_equal(luck["actual"], actual_wins(scores, opp))
+    # Two games a week: every simulated season hands out exactly 20 wins, byes give none
+    assert luck["actual"].sum() == 20
+    assert np.isclose(luck["mean"].sum(), 20)
+    assert np.all((luck["percentile"] > 0) & (luck["percentile"] < 100))
+
+
+def test_bye_teams_sit_out_the_simulated_week():
+    # Week 0: team 4 has the bye; the other four always split into two games
+    scores, opp = round_robin(5, 1)
+    luck = schedule_luck(scores, opp, n_sims=500, seed=2)
+    assert luck["mean"][np.isnan(scores[0])] == 0
+    assert np.isclose(luck["mean"].sum(), 2)
+
+
+def test_unplayed_weeks_are_ignored():
+    scores, opp = round_robin(6, 8)
+    scores[6:], opp[6:] = np.nan, np.nan
+    luck = schedule_luck(scores, opp, n_sims=1000, seed=3)
+    assert luck["actual"].sum() == 18
+    assert np.isclose(luck["mean"].sum(), 18)
+
+
+def exact_win_distribution(scores):
+    """P(team finishes with k/2 wins) over every pairing of every week, each equally likely."""
+    from itertools import product
+
+    def pairings(teams):
+        if not teams:
+            yield []
+            return
+        first, rest = teams[0], teams[1:]
+        for k, other in enumerate(rest):
+            for tail in pairings(rest[:k] + rest[k + 1:]):
+                yield [(first, other)] + tail
+
+    n_weeks, n_teams = scores.shape
+    weekly = []
+    for w in range(n_weeks):
+        # Teams without a score sit out; with an odd count left, pairing with None is the bye
+        playing = [t for t in range(n_teams) if not np.isnan(scores[w, t])]
+        weekly.append([[g for g in games if None not in g]
+                       for games in pairings(playing + ([None] if len(playing) % 2 else []))])
+    dist = np.zeros((n_teams, 2 * n_weeks + 1))
+    schedules = list(product(*weekly))
+    for schedule in schedules:
+        half = np.zeros(n_teams, dtype=np.int64)
+        for w, games in enumerate(schedule):
+            for a, b in games:
+                half[a] += 2 * (scores[w, a] > scores[w, b]) + (scores[w, a] == scores[w, b])
+                half[b] += 2 * (scores[w, b] > scores[w, a]) + (scores[w, a] == scores[w, b])
+        dist[np.arange(n_teams), half] += 1
+    return dist / len(schedules)
+
+
+def test_simulated_schedules_match_exact_enumeration():
+    # Four teams, three weeks (27 schedules), with a tie in week two
+    scores = np.array([[90.0, 120.0, 101.0, 75.0], [110.0, 110.0, 80.0, 95.0], [70.0, 88.0, 130.0, 99.0]])
+    exact = exact_win_distribution(scores)
+    hist = simulate_schedules(scores, n_sims=100000, seed=4)
+    np.testing.assert_allclose(hist / hist.sum(axis=1, keepdims=True), exact, atol=0.01)
+
+
+def test_odd_weeks_match_exact_enumeration():
+    # Five teams: week one everyone scores (a random bye), week two team 4 had the real bye
+    scores = np.array([[90.0, 120.0, 101.0, 75.0, 99.0], [110.0, 70.0, 80.0, 95.0, np.nan]])
+    exact = exact_win_distribution(scores)
+    hist = simulate_schedules(scores, n_sims=100000, seed=5)
+    np.testing.assert_allclose(hist / hist.sum(axis=1, keepdims=True), exact, atol=0.01)
+
+
+def test_processes_split_the_simulations():
+    scores, _ = round_robin(6, 5)
+    hist = simulate_schedules(scores, n_sims=3001, seed=9, processes=2)
+    assert (hist.sum(axis=1) == 3001).all()
@@ -0,0 +1,97 @@
+import pytest
+
+from benchmarks.smtp_server import SmtpConfig, start_server
+from email_smtp import SmtpOutbox
+
+
+@pytest.fixture
+def smtp():
+    servers = []
+
+    def serve(**config):
+        server, port = start_server(SmtpConfig(**config))
+        servers.append(server)
+        return server.stub, port
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def outbox(port, **kw):
+    kw.setdefault("backoff", 0)
+    return SmtpOutbox("127.0.0.1", port, "", "", "league@example.com", starttls=False, timeout=5, **kw)
+
+
+def test_messages_share_one_connection(smtp):
+    stub, port = smtp()
+    box = outbox(port)
+    ids = [box.add(f"m{i}@example.com", f"Report {i}", f"body {i}") for i in range(5)]
+    results = box.flush()
+    assert [r["id"] for r in results] == ids
+    assert all("error" not in r and r["refused"] == {} for r in results)
+    assert stub.connections == 1
+    assert [m[2] for m in stub.messages] == [[f"m{i}@example.com"] for i in range(5)]
+
+
+def test_reconnects_after_messages_per_connection(smtp):
+    stub, port = smtp()
+    box = outbox(port, per_connection=2)
+    for i in range(5):
+        box.add(f"m{i}@example.com", "Report", "body")
+    assert all("error" not in r for r in box.flush())
+    assert stub.connections == 3
+    assert len(stub.messages) == 5
+
+
+def test_refused_recipient_fails_only_its_message(smtp):
+    stub, port = smtp(refuse=["gone@example.com"])
+    box = outbox(port)
+    ok1 = box.add("a@example.com", "Report", "body")
+    bad = box.add("gone@example.com", "Report", "body")
+    ok2 = box.add("b@example.com", "Report", "body")
+    results = {r["id"]: r for r in box.flush()}
+    assert "error" in results[bad] and "550" in results[bad]["error"]
+    assert "error" not in results[ok1] and "error" not in results[ok2]
+    assert sorted(m[2][0] for m in stub.messages) == ["a@example.com", "b@example.com"]
+
+
+def test_partially_refused_message_reports_refused_recipients(smtp):
+    stub, port = smtp(refuse=["gone@example.com"])
+    box = outbox(port)
+    box.add("a@example.com, gone@example.com", "Report", "body")
+    [result] = box.flush()
+    assert "error" not in result
+    assert result["refused"] == {"gone@example.com": 550}
+    assert stub.messages[0][2] == ["a@example.com"]
+
+
+def test_transient_failure_is_retried_on_a_new_connection(smtp):
+    stub, port = smtp(fail_first=1)
+    box = outbox(port)
+    box.add("a@example.com", "Report", "body")
+    [result] = box.flush()
+    assert "error" not in result
+    assert stub.connections == 2
+    assert len(stub.messages) == 1
+
+
+def test_recipients_split_into_batches(smtp):
+    stub, port = smtp()
+    box = outbox(port, max_recipients=2)
+    msg_id = box.add([f"m{i}@example.com" for i in range(5)], "Report", "body")
+    results = box.flush()
+    assert [r["id"] for r in results] == [msg_id] * 3
+    assert [len(m[2]) for m in stub.messages] == [2, 2, 1]
+
+
+def test_render_only_batch_needs_no_smtp_secrets(monkeypatch, tmp_path):
+    import batch
+    import run_journal
+    from benchmarks.synthetic import full_league_json
+    monkeypatch.setattr(batch, "fetch_league_json", lambda *a, **kw: full_league_json(10, 14, 14, seed=int(a[0])))
+    monkeypatch.setattr(run_journal, "_default_journal", run_journal.RunJournal(str(tmp_path)))
+    results = batch.run_batch([{"league_id": "1", "season": "2025"}, {"league_id": "2", "season": "2025"}])
+    assert [r.get("error") for r in results] == [None, None]
+    assert all(r["markdown"].startswith("| Team Name |") and not r["sent"] for r in results)
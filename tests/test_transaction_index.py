@@ -0,0 +1,50 @@
+import json
+import random
+from types import SimpleNamespace
+
+from activity_log import ActivityLog
+from transaction_index import WAIVER_ACTION, RankedCounter, TransactionIndex
+
+
+def ranked(totals, n=None):
+    out = sorted(totals.items(), key=lambda kv: (-kv[1], kv[0]))
+    return out if n is None else out[:n]
+
+
+def test_ranked_counter_matches_a_full_sort():
+    rng = random.Random(3)
+    counter, totals = RankedCounter(), {}
+    for step in range(5000):
+        key = rng.randrange(60)
+        # Zero bids push a second entry for the same total; negative amounts move keys down
+        amount = rng.choice((0, 1, 1, 2, 5, -1))
+        counter.add(key, amount)
+        totals[key] = totals.get(key, 0) + amount
+        if step % 97 == 0:
+            for n in (1, 5, 59, 60, None):
+                assert counter.top(n) == ranked(totals, n)
+    assert counter.top() == ranked(totals)
+    assert len(counter) == len(totals)
+    assert counter[7] == totals.get(7, 0)
+    # Stale entries are dropped as they are met, or the heap is rebuilt
+    assert len(counter._heap) <= 2 * len(totals) + 64
+
+
+def test_late_activity_is_tagged_with_the_leagues_final_week(tmp_path):
+    log = ActivityLog(1, 2025, str(tmp_path))
+    day = 24 * 3600 * 1000
+    with open(log.path, "w", encoding="utf-8") as f:
+        for k, (date, action, bid) in enumerate(((3 * day, WAIVER_ACTION, 12), (10 * day, "FA ADDED", 0),
+                                                 (40 * day, WAIVER_ACTION, 30), (200 * day, "FA ADDED", 0))):
+            f.write(json.dumps({"date": date, "team_id": 1, "team": "One", "action": action, "player_id": k,
+                                "player": f"P{k}", "position": "WR", "bid": bid}) + "\n")
+    index = TransactionIndex(1, 2025, str(tmp_path))
+    # Eighteen one-week NFL periods; the league's season ends with period 14
+    index.week_ends = [(7 * w) * day for w in range(1, 19)]
+    index.sync(log, SimpleNamespace(current_week=15, finalScoringPeriod=14))
+    assert [r["week"] for r in index.records] == [1, 2, 6, 14]
+    assert index.latest_week() == 14
+    # The latest week with bids, not the latest week with any activity
+    assert index.latest_bid_week() == 6
+    assert index.latest_bid_week(5) == 1
+    assert index.latest_bid_week(0) == 0
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+from weekly_store import WeeklyStore
+
+# Two teams playing each other every week: week -> (team 1 score, team 2 score)
+SCORES = {1: (100.0, 90.0), 2: (80.5, 120.0), 3: (111.0, 111.0), 4: (95.0, 70.0)}
+
+
+def league(current_week: int, scores=SCORES):
+    teams = [SimpleNamespace(team_id=t + 1, scores=[scores[w][t] for w in sorted(scores)]) for t in range(2)]
+    return SimpleNamespace(league_id=9, year=2025, currentMatchupPeriod=current_week,
+                           settings=SimpleNamespace(reg_season_count=14), teams=teams)
+
+
+class Fetcher:
+    def __init__(self, scores=SCORES):
+        self.scores = scores
+        self.weeks = []
+
+    def __call__(self, lg, week):
+        self.weeks.append(week)
+        a, b = self.scores[week]
+        return {1: (a, 2, b), 2: (b, 1, a)}
+
+
+def test_sync_fetches_only_new_weeks(tmp_path):
+    fetch = Fetcher()
+    weeks = WeeklyStore(9, 2025, str(tmp_path)).sync(league(3), fetch)
+    assert fetch.weeks == [1, 2]
+    assert [w[1] for w in weeks] == [(100.0, 2, 90.0), (80.5, 2, 120.0)]
+
+    # A later run (a fresh store read back from disk) fetches just the week that finished since
+    fetch = Fetcher()
+    weeks = WeeklyStore(9, 2025, str(tmp_path)).sync(league(4), fetch)
+    assert fetch.weeks == [3]
+    assert [w[2][0] for w in weeks] == [90.0, 120.0, 111.0]
+
+    fetch = Fetcher()
+    WeeklyStore(9, 2025, str(tmp_path)).sync(league(4), fetch)
+    assert fetch.weeks == []
+
+
+def test_stat_correction_refetches_the_stored_week(tmp_path):
+    WeeklyStore(9, 2025, str(tmp_path)).sync(league(4), Fetcher())
+    corrected = {**SCORES, 2: (84.25, 120.0)}
+    fetch = Fetcher(corrected)
+    weeks = WeeklyStore(9, 2025, str(tmp_path)).sync(league(4, corrected), fetch)
+    assert fetch.weeks == [2]
+    assert weeks[1][1] == (84.25, 2, 120.0)
+    assert weeks[1][2] == (120.0, 1, 84.25)
+
+
+def test_drop_week_and_weeks_that_are_no_longer_completed(tmp_path):
+    store = WeeklyStore(9, 2025, str(tmp_path))
+    store.sync(league(5), Fetcher())
+    store.drop_week(2)
+    store.drop_week(7)
+    assert sorted(store.weeks) == [1, 3, 4]
+
+    # Back to week 3 (say the schedule was reset): weeks 3 and 4 leave the store, 2 is refetched
+    fetch = Fetcher()
+    weeks = store.sync(league(3), fetch)
+    assert fetch.weeks == [2]
+    assert len(weeks) == 2
+    assert sorted(WeeklyStore(9, 2025, str(tmp_path)).weeks) == [1, 2]
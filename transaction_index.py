@@ -0,0 +1,199 @@
+import os
+import json
+import heapq
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from activity_log import ACTIVITY_DIR
+
+# Season-long transaction index over the activity log. Records the roster job (or any
+# ingest) appended to the log are folded in once, from a byte offset, and tagged with
+# their scoring period. Records are addressed by position with secondary indexes by team,
+# player, week and action, and the totals the reports read (FAAB spent per team, moves
+# per player, bids per week) are kept ranked as they change, so top-n queries don't
+# rescan the season. The index is saved next to the log.
+INDEX_VERSION = 2
+# Kickoff of a period's last game plus this long still counts as that period
+PERIOD_GRACE_MS = 24 * 3600 * 1000
+
+WAIVER_ACTION = "WAIVER ADDED"
+# A trade is logged from both sides; only the sending side counts as a move
+TRADE_RECEIVED = "TRADE_RECEIVED"
+
+
+class RankedCounter:
+    """
+    Totals per key, plus a max-heap of (-total, key) for top-n queries. add() pushes the
+    new total in O(log n) and leaves the key's old entry in place; top() skips entries
+    that no longer match the key's total and drops them for good.
+    """
+
+    def __init__(self):
+        self.totals: Dict[Hashable, float] = {}
+        self._heap: List[Tuple[float, Hashable]] = []
+
+    def add(self, key: Hashable, amount: float = 1) -> None:
+        new = self.totals.get(key, 0) + amount
+        self.totals[key] = new
+        heapq.heappush(self._heap, (-new, key))
+        if len(self._heap) > 2 * len(self.totals) + 64:
+            # Mostly superseded entries: rebuild from the totals
+            self._heap = [(-total, k) for k, total in self.totals.items()]
+            heapq.heapify(self._heap)
+
+    def __getitem__(self, key: Hashable) -> float:
+        return self.totals.get(key, 0)
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        if n is None or n >= len(self.totals):
+            return [(key, total) for key, total in sorted(self.totals.items(), key=lambda kv: (-kv[1], kv[0]))]
+        live: List[Tuple[float, Hashable]] = []
+        seen = set()
+        while self._heap and len(live) < n:
+            neg, key = heapq.heappop(self._heap)
+            if key in seen or self.totals.get(key) != -neg:
+                continue
+            seen.add(key)
+            live.append((neg, key))
+        for entry in live:
+            heapq.heappush(self._heap, entry)
+        return [(key, -neg) for neg, key in live]
+
+
+def period_ends(pro_schedule: Dict) -> List[int]:
+    """Per scoring period (1-based, in order), when it ends: last kickoff plus the grace."""
+    ends: Dict[int, int] = {}
+    for team in pro_schedule.get("settings", {}).get("proTeams", []):
+        for period, games in (team.get("proGamesByScoringPeriod") or {}).items():
+            for game in games or []:
+                if game.get("date"):
+                    ends[int(period)] = max(ends.get(int(period), 0), int(game["date"]))
+    return [ends[p] + PERIOD_GRACE_MS for p in sorted(ends)]
+
+
+class TransactionIndex:
+    def __init__(self, league_id, season, root: str = ACTIVITY_DIR):
+        self.path = os.path.join(root, f"{league_id}_{season}.index.json")
+        self._reset()
+        self._load()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self.week_ends: List[int] = []
+        self.records: List[Dict] = []
+        self.by_team: Dict[int, List[int]] = {}
+        self.by_player: Dict[int, List[int]] = {}
+        self.by_week: Dict[int, List[int]] = {}
+        self.by_action: Dict[str, List[int]] = {}
+        self.faab = RankedCounter()
+        self.churn = RankedCounter()
+        # week -> [(-bid, position)], highest bid first
+        self.week_bids: Dict[int, List[Tuple[float, int]]] = {}
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self.offset = int(data.get("offset", 0))
+        self.week_ends = [int(t) for t in data.get("week_ends", [])]
+        for record in data.get("records", []):
+            self._add(record)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {"version": INDEX_VERSION, "offset": self.offset, "week_ends": self.week_ends, "records": self.records}
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def week_of(self, date_ms: int, default: int = 0, last: int = 0) -> int:
+        # last: the league's final scoring period; later activity is tagged with it, not with
+        # whatever NFL period it fell in
+        if not self.week_ends:
+            return default
+        week = min(bisect_left(self.week_ends, date_ms) + 1, len(self.week_ends))
+        return min(week, last) if last else week
+
+    def _add(self, record: Dict) -> None:
+        pos = len(self.records)
+        self.records.append(record)
+        team_id, player_id, week, action = record.get("team_id"), record.get("player_id"), record["week"], record["action"]
+        if team_id is not None:
+            self.by_team.setdefault(team_id, []).append(pos)
+        if player_id is not None:
+            self.by_player.setdefault(player_id, []).append(pos)
+            if action != TRADE_RECEIVED:
+                self.churn.add(player_id)
+        self.by_week.setdefault(week, []).append(pos)
+        self.by_action.setdefault(action, []).append(pos)
+        bid = record.get("bid") or 0
+        if action == WAIVER_ACTION and team_id is not None:
+            self.faab.add(team_id, bid)
+            insort(self.week_bids.setdefault(week, []), (-bid, pos))
+
+    def sync(self, log, league=None) -> int:
+        """Fold in records appended to the activity log since the last sync; returns how many."""
+        try:
+            if os.path.getsize(log.path) < self.offset:
+                # The log was cleared or rewritten: index it again from the start
+                self._reset()
+        except OSError:
+            pass
+        records, offset = log.read_from(self.offset)
+        if offset == self.offset:
+            return 0
+        if league is not None and not self.week_ends:
+            try:
+                self.week_ends = period_ends(league.espn_request.get_pro_schedule())
+            except Exception:
+                self.week_ends = []
+        default = getattr(league, "current_week", 0) if league is not None else 0
+        last = getattr(league, "finalScoringPeriod", 0) if league is not None else 0
+        for record in records:
+            self._add(dict(record, week=self.week_of(record["date"], default, last)))
+        self.offset = offset
+        self.save()
+        return len(records)
+
+    def for_team(self, team_id: int) -> List[Dict]:
+        return [self.records[i] for i in self.by_team.get(team_id, [])]
+
+    def for_player(self, player_id: int) -> List[Dict]:
+        return [self.records[i] for i in self.by_player.get(player_id, [])]
+
+    def for_week(self, week: int) -> List[Dict]:
+        return [self.records[i] for i in self.by_week.get(week, [])]
+
+    def for_action(self, action: str) -> List[Dict]:
+        return [self.records[i] for i in self.by_action.get(action, [])]
+
+    def faab_spent(self, team_id: int) -> float:
+        return self.faab[team_id]
+
+    def top_bids(self, week: int, n: int = 5) -> List[Dict]:
+        return [self.records[pos] for _, pos in self.week_bids.get(week, [])[:n]]
+
+    def player_churn(self, n: int = 5) -> List[Tuple[Dict, int]]:
+        """Most-moved players: (latest record for the player, number of moves)."""
+        return [(self.records[self.by_player[pid][-1]], int(moves)) for pid, moves in self.churn.top(n)]
+
+    def latest_week(self) -> int:
+        return max(self.by_week) if self.by_week else 0
+
+    def latest_bid_week(self, upto: Optional[int] = None) -> int:
+        """The latest week (no later than upto) with at least one waiver bid; 0 if none."""
+        weeks = [w for w, bids in self.week_bids.items() if bids and (upto is None or w <= upto)]
+        return max(weeks) if weeks else 0
+
+
+def index_for(league, root: Optional[str] = None) -> TransactionIndex:
+    return TransactionIndex(league.league_id, league.year, root or ACTIVITY_DIR)
@@ -0,0 +1,78 @@
+import os
+import json
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from allplay import completed_weeks, week_scores
+
+# Per-league store of finalized weekly scores, so weekly_summary only fetches weeks it hasn't
+# seen. A stored week is refetched only when the scores espn_api already loaded with the
+# League (team.scores) disagree with it, i.e. after an ESPN stat correction. A summary run
+# syncs once and hands the weeks to every section that reads scores.
+STORE_DIR = os.environ.get("WEEKLY_STORE_DIR", ".cache/weekly").strip()
+
+WeekScores = Dict[int, Tuple[float, int, float]]
+
+
+class WeeklyStore:
+    def __init__(self, league_id, season, root: str = STORE_DIR):
+        self.path = os.path.join(root, f"{league_id}_{season}.json")
+        self.weeks: Dict[int, WeekScores] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.weeks = {
+            int(w): {int(tid): (float(s), int(o), float(os_)) for tid, (s, o, os_) in teams.items()}
+            for w, teams in data.get("weeks", {}).items()
+        }
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {"weeks": {str(w): {str(tid): list(v) for tid, v in teams.items()} for w, teams in self.weeks.items()}}
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def put_week(self, week: int, scores: WeekScores) -> None:
+        self.weeks[week] = scores
+
+    def drop_week(self, week: int) -> None:
+        self.weeks.pop(week, None)
+
+    def corrected_weeks(self, league) -> List[int]:
+        # Weeks whose stored scores no longer match the schedule scores loaded with the League
+        out = []
+        for week, scores in self.weeks.items():
+            for team in league.teams:
+                team_scores = getattr(team, "scores", None) or []
+                stored = scores.get(team.team_id)
+                if stored is None or week > len(team_scores) or team_scores[week - 1] is None:
+                    continue
+                if round(float(team_scores[week - 1]), 2) != round(stored[0], 2):
+                    out.append(week)
+                    break
+        return out
+
+    def sync(self, league, fetch: Callable[[object, int], WeekScores] = week_scores) -> List[WeekScores]:
+        """Fetch new and corrected weeks, then return completed weeks in order."""
+        weeks = completed_weeks(league)
+        todo = sorted(set(w for w in weeks if w not in self.weeks) | set(self.corrected_weeks(league)))
+        for week in todo:
+            self.put_week(week, fetch(league, week))
+        # Weeks that are no longer "completed" (e.g. settings changed) are dropped
+        gone = [w for w in self.weeks if w not in set(weeks)]
+        for week in gone:
+            self.drop_week(week)
+        if todo or gone:
+            self.save()
+        return [self.weeks[w] for w in weeks]
+
+
+def store_for(league, root: Optional[str] = None) -> WeeklyStore:
+    return WeeklyStore(league.league_id, league.year, root or STORE_DIR)
@@ -1,244 +1,286 @@
+from __future__ import annotations
+
 import os
-import pytz
 from datetime import datetime
-from espn_api.football import League
-
-
-def send_email(subject: str, body: str) -> None:
-  # Determine email method
-  sendgrid_api_key = os.environ.get("SENDGRID_API_KEY")
-  recipient_email = os.environ.get("RECIPIENT_EMAIL")
-  sender_email = os.environ.get("SENDER_EMAIL")
-  if sendgrid_api_key:
-    from email_sendgrid import send_via_sendgrid
-    send_via_sendgrid(
-      to_emails=recipient_email,
-      subject=subject,
-      html_content=body,
-      sendgrid_api_key=sendgrid_api_key,
-      from_email=sender_email
-    )
-  elif os.environ.get("SMTP_SERVER"):
-    from email_smtp import send_via_smtp
-    send_via_smtp(
-      subject=subject,
-      html_body=body,
-      from_email=sender_email,
-      to_emails=recipient_email,
-      smtp_server=os.environ.get("SMTP_SERVER"),
-      smtp_port=int(os.environ.get("SMTP_PORT", "587")),
-      smtp_username=os.environ.get("SMTP_USERNAME"),
-      smtp_password=os.environ.get("SMTP_PASSWORD")
-    )
-  else:
-    # Fallback to printing the body
-    print(body)
-
-
-def compute_luck_and_sos(league: League) -> str:
-  teams = league.teams
-  pf = {team.team_id: 0 for team in teams}
-  pa = {team.team_id: 0 for team in teams}
-
-  # Sum points for and points against for each team
-  scoreboard = league.scoreboard()
-  weeks = len(scoreboard)
-  for week_matchups in scoreboard:
-    for matchup in week_matchups:
-      home = matchup.home_team
-      away = matchup.away_team
-      pf[home.team_id] += home.score
-      pa[home.team_id] += away.score
-      pf[away.team_id] += away.score
-      pa[away.team_id] += home.score
-
-  # Calculate expected wins by comparing PF to every other team
-  expected_wins = {}
-  n_teams = len(teams)
-  for team in teams:
-    wins_vs_all = 0
-    for opponent in teams:
-      if opponent.team_id == team.team_id:
-        continue
-      if pf[team.team_id] > pf[opponent.team_id]:
-        wins_vs_all += 1
-      elif pf[team.team_id] == pf[opponent.team_id]:
-        wins_vs_all += 0.5
-    expected_win_rate = wins_vs_all / (n_teams - 1) if n_teams > 1 else 0
-    expected_wins[team.team_id] = expected_win_rate * weeks
-
-  entries = []
-  for team in teams:
-    tid = team.team_id
-    luck_value = team.wins - expected_wins.get(tid, 0)
-    sos_value = pf[tid] - pa[tid]
-    entries.append({
-      "team": team,
-      "luck": luck_value,
-      "sos": sos_value,
-    })
-
-  entries.sort(key=lambda x: (x["luck"], x["sos"]), reverse=True)
-  lines = []
-  for entry in entries:
-    t = entry["team"]
-    lines.append(f"{t.team_name}: Luck {entry['luck']:.2f}, SOS {entry['sos']:.1f}, Record {t.wins}-{t.losses}")
-
-  return "\n".join(lines)
-
-
-def get_injury_feed(league: League) -> str:
-  # Placeholder for future injury integration
-  return "Injury feed integration coming soon."
-
-
-def get_faab_history(league: League) -> str:
-  # Placeholder for FAAB history retrieval
-  return "FAAB history feature coming soon."
-
-
-def get_trade_projections(league: League) -> str:
-  # Placeholder for trade impact projections
-  return "Trade-impact projections feature coming soon."
-
-
-def get_weekly_writeup(league: League) -> str:
-  # Placeholder for AI-generated weekly write-ups
-  return "Weekly AI write-up coming soon."
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from espn_cache import cached_league
+import metrics
 
+# espn_api is only needed for type hints here; cached_league imports it when a league is built
+if TYPE_CHECKING:
+  from espn_api.football import League
+  from personalize import ReportBuilder
+  from team_table import TeamTable
 
-def get_manager_roasts(league: League) -> str:
-  # Placeholder for manager roast mode
-  parts = []
-  for team in league.teams:
-    parts.append(f"{team.team_name}: It's nothing personal, but this feature will roast managers soon!")
-  return "\n".join(parts)
-
-
-def main() -> None:
-  # Load required environment variables
-  league_id = os.environ.get("LEAGUE_ID")
-  season = os.environ.get("SEASON")
-  espn_s2 = os.environ.get("ESPN_S2")
-  swid = os.environ.get("SWID")
-
-  if not all([league_id, season, espn_s2, swid]):
-    import os
-import pytz
-from datetime import datetime
-from espn_api.football import League
+# Every section reads the one TeamTable built per run (TeamTable.from_league: rows follow
+# league.teams) and returns (row, text) pairs; row is None for lines about no one team.
+# Sections that need weekly scores get the completed weeks from one weekly_store sync.
+Lines = List[Tuple[Optional[int], str]]
 
 
-# Helper function to send an email via SendGrid or SMTP.
-def send_email(subject: str, body: str) -> None:
+# Helper function to send an email via SendGrid or SMTP. Returns False when it only printed.
+def send_email(subject: str, body: str, recipient: str = None) -> bool:
   sendgrid_api_key = os.environ.get("SENDGRID_API_KEY")
-  recipient_email = os.environ.get("RECIPIENT_EMAIL")
+  recipient_email = recipient or os.environ.get("RECIPIENT_EMAIL")
   sender_email = os.environ.get("SENDER_EMAIL")
   if sendgrid_api_key:
     from email_sendgrid import send_via_sendgrid
-    send_via_sendgrid(
-      to_emails=recipient_email,
-      subject=subject,
-      html_content=body,
-      sendgrid_api_key=sendgrid_api_key,
-      from_email=sender_email
-    )
+    send_via_sendgrid(sendgrid_api_key, sender_email, recipient_email, subject, body)
   elif os.environ.get("SMTP_SERVER"):
     from email_smtp import send_via_smtp
     send_via_smtp(
-      subject=subject,
-      html_body=body,
-      from_email=sender_email,
-      to_emails=recipient_email,
       smtp_server=os.environ.get("SMTP_SERVER"),
-      smtp_port=int(os.environ.get("SMTP_PORT", "587")),
-      smtp_username=os.environ.get("SMTP_USERNAME"),
-      smtp_password=os.environ.get("SMTP_PASSWORD")
+      smtp_port=int(os.environ.get("SMTP_PORT") or 587),
+      username=os.environ.get("SMTP_USERNAME"),
+      password=os.environ.get("SMTP_PASSWORD"),
+      sender=sender_email,
+      recipient=recipient_email,
+      subject=subject,
+      markdown=body
     )
   else:
     # Fallback to printing the body
     print(body)
+    return False
+  return True
 
 
 # Compute luck and strength of schedule index for each team.
-def compute_luck_and_sos(league: League) -> str:
-  teams = league.teams
-  pf = {team.team_id: 0 for team in teams}
-  pa = {team.team_id: 0 for team in teams}
-
-  # Sum points for and points against for each team
-  scoreboard = league.scoreboard()
-  weeks = len(scoreboard)
-  for week_matchups in scoreboard:
-    for matchup in week_matchups:
-      home = matchup.home_team
-      away = matchup.away_team
-      pf[home.team_id] += home.score
-      pa[home.team_id] += away.score
-      pf[away.team_id] += away.score
-      pa[away.team_id] += home.score
-
-  # Calculate expected wins by comparing PF to every other team
-  expected_wins = {}
-  n_teams = len(teams)
-  for team in teams:
-    wins_vs_all = 0
-    for opponent in teams:
-      if opponent.team_id == team.team_id:
-        continue
-      if pf[team.team_id] > pf[opponent.team_id]:
-        wins_vs_all += 1
-      elif pf[team.team_id] == pf[opponent.team_id]:
-        wins_vs_all += 0.5
-    expected_win_rate = wins_vs_all / (n_teams - 1) if n_teams > 1 else 0
-    expected_wins[team.team_id] = expected_win_rate * weeks
-
-  entries = []
-  for team in teams:
-    tid = team.team_id
-    luck_value = team.wins - expected_wins.get(tid, 0)
-    sos_value = pf[tid] - pa[tid]
-    entries.append({
-      "team": team,
-      "luck": luck_value,
-      "sos": sos_value,
-    })
-
-  entries.sort(key=lambda x: (x["luck"], x["sos"]), reverse=True)
-  lines = []
-  for entry in entries:
-    t = entry["team"]
-    lines.append(f"{t.team_name}: Luck {entry['luck']:.2f}, SOS {entry['sos']:.1f}, Record {t.wins}-{t.losses}")
-
-  return "\n".join(lines)
-
+def compute_luck_and_sos(league: League, table: TeamTable, weekly: list) -> Lines:
+  from allplay import score_matrix, luck_and_sos
 
-# Placeholder for future injury integration.
-def get_injury_feed(league: League) -> str:
-  return "Injury feed integration coming soon."
+  # Week x team score matrix over completed regular-season weeks (weekly_store sync output)
+  scores, opp, opp_idx = score_matrix(table.team_id.tolist(), weekly)
 
+  # Expected wins from week-by-week all-play, SOS from opponents' all-play strength
+  stats = luck_and_sos(scores, opp, opp_idx, table.wins)
+  table["luck"] = stats["luck"]
+  table["sos"] = stats["sos"]
 
-# Placeholder for FAAB history retrieval.
-def get_faab_history(league: League) -> str:
-  return "FAAB history feature coming soon."
+  luck = table["luck"].tolist()
+  sos = table["sos"].tolist()
+  wins = table.wins.tolist()
+  losses = table.losses.tolist()
+  lines = []
+  for i in table.order_by("luck", "sos", descending=True).tolist():
+    lines.append((i, f"{table.name[i]}: Luck {luck[i]:.2f}, SOS {sos[i]:.3f}, Record {wins[i]}-{losses[i]}"))
+
+  return lines
+
+
+# Replay the season under random schedules to get a distribution-based luck score.
+def get_schedule_luck(league: League, table: TeamTable, weekly: list) -> Lines:
+  from allplay import score_matrix
+  from schedule_sim import schedule_luck, build_schedule_luck_lines
+  if not weekly:
+    return [(None, "No completed weeks yet.")]
+  scores, opp, _ = score_matrix(table.team_id.tolist(), weekly)
+  luck = schedule_luck(scores, opp)
+  return build_schedule_luck_lines(table.name, luck)
+
+
+# Simulate the rest of the regular season to estimate playoff and bye chances.
+def get_playoff_odds(league: League, table: TeamTable, weekly: list) -> Lines:
+  from allplay import score_matrix
+  from playoff_odds import remaining_schedule, score_model, simulate_playoff_odds, build_playoff_odds_lines
+  team_ids = table.team_id.tolist()
+  scores, _, _ = score_matrix(team_ids, weekly)
+  mean, std = score_model(scores)
+  week, home, away, n_weeks = remaining_schedule(league, team_ids)
+  odds = simulate_playoff_odds(
+    table.wins,
+    table.pf,
+    mean, std, week, home, away, n_weeks,
+    playoff_teams=league.settings.playoff_team_count,
+  )
+  return build_playoff_odds_lines(table.name, odds, table.wins, table.pf)
+
+
+# Optimal-vs-actual lineups for every team and completed week: points left on the bench.
+def get_lineup_efficiency(league: League, table: TeamTable) -> Lines:
+  from lineup_efficiency import season_efficiency, build_efficiency_lines
+  team_ids, weeks, actual, optimal = season_efficiency(league)
+  # Efficiency columns come in team_ids order; put them in table rows
+  order = [0] * len(table)
+  for j, tid in enumerate(team_ids):
+    order[table.row_of(tid)] = j
+  return build_efficiency_lines(table.name, weeks, actual[:, order], optimal[:, order])
+
+
+# Normalized inputs of the report, used as its run journal key: the week, team records,
+# every stored weekly score line, how far the transaction log reaches and who is injured.
+def summary_inputs(league: League, table: TeamTable, weekly: list) -> dict:
+  from activity_log import log_for
+  from injury_feed import current_statuses, is_injured
+  from transaction_index import index_for
+  log = log_for(league)
+  log.ingest(league)
+  index = index_for(league)
+  index.sync(log, league)
+  return {
+    "week": league.currentMatchupPeriod,
+    "teams": sorted(zip(table.team_id.tolist(), table.name, table.wins.tolist(), table.losses.tolist())),
+    "scores": [sorted([int(tid), *line] for tid, line in week.items()) for week in weekly],
+    "transactions": [len(index.records), index.records[-1]["date"] if index.records else None],
+    "injuries": sorted([pid, status] for pid, status in current_statuses(league)[1].items() if is_injured(status)),
+  }
+
+
+# Injury status changes for rostered players since the last delivered report (statuses are
+# fetched in batches and cached across leagues; see injury_feed).
+def get_injury_feed(league: League, table: TeamTable) -> Lines:
+  from injury_feed import current_statuses, history_for, build_injury_lines
+  players, statuses = current_statuses(league)
+  history = history_for(league)
+  return build_injury_lines(players, statuses, history.changes(statuses), history.statuses is None, table.row_of)
+
+
+# Remember the statuses a delivered report went out with, so the next one lists changes
+# since then. Only called once delivery succeeded: a render that was never sent moves nothing.
+def save_injury_history(league: League) -> None:
+  from injury_feed import current_statuses, history_for
+  history_for(league).save(current_statuses(league)[1])
+
+
+# FAAB spent per team, this week's biggest bids and the most-moved players, from the
+# season transaction index (only activity newer than the log's cursor is fetched).
+def get_faab_history(league: League, table: TeamTable) -> Lines:
+  from activity_log import log_for
+  from transaction_index import index_for
+  log = log_for(league)
+  log.ingest(league)
+  index = index_for(league)
+  index.sync(log, league)
+
+  team_ids = table.team_id.tolist()
+  lines = []
+  if getattr(league.settings, "faab", True):
+    budget = getattr(league.settings, "acquisition_budget", 0) or 0
+    spent = [index.faab_spent(tid) for tid in team_ids]
+    lines.append((None, "FAAB spent:"))
+    for i in sorted(range(len(table)), key=lambda i: (-spent[i], table.name[i])):
+      left = f" (${budget - spent[i]:g} left)" if budget else ""
+      lines.append((i, f"- {table.name[i]}: ${spent[i]:g}{left}"))
+    # This week is the league's current scoring period (never past its last one); report the
+    # most recent week up to it that actually had bids
+    this_week = getattr(league, "scoringPeriodId", 0) or league.current_week
+    final = getattr(league, "finalScoringPeriod", 0)
+    week = index.latest_bid_week(min(this_week, final) if final else this_week)
+    top = index.top_bids(week) if week else []
+    if top:
+      lines.append((None, f"Top bids, week {week}:"))
+      for record in top:
+        row = table.row_of(record["team_id"]) if record.get("team_id") is not None else None
+        lines.append((row, f"- {record['player']} to {record['team']}: ${record['bid']:g}"))
+  churn = index.player_churn()
+  if churn:
+    lines.append((None, "Most-moved players:"))
+    for record, moves in churn:
+      lines.append((None, f"- {record['player']}: {moves} moves"))
+  return lines or [(None, "No transactions yet.")]
 
 
 # Placeholder for trade impact projections.
-def get_trade_projections(league: League) -> str:
-  return "Trade-impact projections feature coming soon."
+def get_trade_projections(league: League, table: TeamTable) -> Lines:
+  return [(None, "Trade-impact projections feature coming soon.")]
 
 
 # Placeholder for AI-generated weekly write-ups.
-def get_weekly_writeup(league: League) -> str:
-  return "Weekly AI write-up coming soon."
+def get_weekly_writeup(league: League, table: TeamTable) -> Lines:
+  return [(None, "Weekly AI write-up coming soon.")]
 
 
 # Placeholder for manager roast mode.
-def get_manager_roasts(league: League) -> str:
+def get_manager_roasts(league: League, table: TeamTable) -> Lines:
   parts = []
-  for team in league.teams:
-    parts.append(f"{team.team_name}: It's nothing personal, but this feature will roast managers soon!")
-  return "\n".join(parts)
+  for row, name in enumerate(table.name):
+    parts.append((row, f"{name}: It's nothing personal, but this feature will roast managers soon!"))
+  return parts
+
+
+# Build all report sections into a personalize.ReportBuilder, timing each one. Lines keep
+# the team row they were written for, so personalized copies never re-parse the text.
+def build_summary(league: League, table: TeamTable = None, weekly: list = None) -> ReportBuilder:
+  from personalize import ReportBuilder
+  from team_table import TeamTable
+  from weekly_store import store_for
+  table = table or TeamTable.from_league(league)
+  if weekly is None:
+    weekly = store_for(league).sync(league)
+  builder = ReportBuilder(table.name)
+
+  def section(title: str, build, *args) -> None:
+    with metrics.span(f"section:{title}"):
+      lines = build(league, table, *args)
+    builder.text("\n\n")
+    builder.heading(f"## {title}\n")
+    for k, (row, line) in enumerate(lines):
+      builder.line(row, line if k + 1 == len(lines) else line + "\n")
+
+  builder.heading("# Weekly Fantasy Report")
+  section("Injury Report", get_injury_feed)
+  section("FAAB History", get_faab_history)
+  section("Playoff Odds", get_playoff_odds, weekly)
+  section("Trade Impact Projections", get_trade_projections)
+  section("Weekly AI Write-up", get_weekly_writeup)
+  section("Manager Roasts", get_manager_roasts)
+  section("Luck and Strength of Schedule Index", compute_luck_and_sos, weekly)
+  section("Schedule Luck (Simulated Schedules)", get_schedule_luck, weekly)
+  section("Lineup Efficiency (Points Left on the Bench)", get_lineup_efficiency)
+  return builder
+
+
+# The report as Markdown.
+def build_report(league: League, table: TeamTable = None, weekly: list = None) -> str:
+  return build_summary(league, table, weekly).body()
+
+
+# Build and send the report for a loaded League, to recipient or as a personalized copy to
+# each of managers (email -> team id). Returns False when the same report was already
+# delivered to everyone (or it was only printed); raises RuntimeError naming the managers
+# whose copy failed once the others are sent.
+def send_summary(league: League, recipient: str, managers: dict = None) -> bool:
+  import pytz
+  from run_journal import default_journal, input_digest
+  from team_table import TeamTable
+  from weekly_store import store_for
+
+  # Determine the date in the user's timezone (Eastern Time)
+  tz = pytz.timezone("America/New_York")
+  today = datetime.now(tz).date()
+
+  # Skip the whole report when nothing changed since the copy already sent
+  journal = default_journal()
+  table = TeamTable.from_league(league)
+  # One sync per run: only weeks not yet in the local store (or changed by stat corrections) are fetched
+  weekly = store_for(league).sync(league)
+  digest = input_digest("summary", summary_inputs(league, table, weekly))
+  if all(journal.delivered("summary", digest, r) for r in (managers or [recipient])):
+    print("Scores unchanged since the last delivered report. Skipping email.")
+    return False
+
+  subject = f"Fantasy Weekly Report - {today.strftime('%B %d, %Y')}"
+  if managers:
+    # Every section's line for the manager's team gathered up top, rivals by record
+    from personalize import deliver, render_template
+    standings = table.order_by("wins", "pf", descending=True).tolist()
+    template = render_template("summary", digest, lambda: build_summary(league, table, weekly), table.name, standings)
+    sent, failed = deliver("summary", digest, template, managers, table.row_of, subject)
+    if failed:
+      # The history moves only once everyone has the report listing these changes
+      raise RuntimeError("Delivery failed for " + "; ".join(failed))
+    save_injury_history(league)
+    return sent > 0
+
+  body = journal.render("summary", digest, lambda: build_report(league, table, weekly))
+
+  # Send the email
+  with metrics.span("deliver"):
+    if not send_email(subject, body, recipient):
+      return False
+  journal.mark_delivered("summary", digest, recipient)
+  save_injury_history(league)
+  return True
 
 
 # Main entry point for the weekly summary program.
@@ -252,57 +294,12 @@ def main() -> None:
     print("Missing league credentials. Please set LEAGUE_ID, SEASON, ESPN_S2, and SWID.")
     return
 
-  # Create the League instance
-  league = League(league_id, int(season), espn_s2=espn_s2, swid=swid)
-
-  # Determine the date in the user's timezone (Eastern Time)
-  tz = pytz.timezone("America/New_York")
-  today = datetime.now(tz).date()
-
-  # Build all report sections
-  sections = []
-  sections.append("# Weekly Fantasy Report")
-  sections.append("## Injury Report\n" + get_injury_feed(league))
-  sections.append("## FAAB History\n" + get_faab_history(league))
-  sections.append("## Trade Impact Projections\n" + get_trade_projections(league))
-  sections.append("## Weekly AI Write-up\n" + get_weekly_writeup(league))
-  sections.append("## Manager Roasts\n" + get_manager_roasts(league))
-  sections.append("## Luck and Strength of Schedule Index\n" + compute_luck_and_sos(league))
-
-  body = "\n\n".join(sections)
-  subject = f"Fantasy Weekly Report - {today.strftime('%B %d, %Y')}"
-
-  # Send the email
-  send_email(subject, body)
-
-
-if __name__ == "__main__":
-  main()
-print("Missing league credentials. Please set LEAGUE_ID, SEASON, ESPN_S2, and SWID.")
-    return
-
-  # Create League instance
-  league = League(league_id, int(season), espn_s2=espn_s2, swid=swid)
-
-  # Determine today's date in Eastern Time
-  tz = pytz.timezone("America/New_York")
-  today = datetime.now(tz).date()
-
-  # Build the email body with all sections
-  sections = []
-  sections.append("# Weekly Fantasy Report")
-  sections.append("## Injury Report\n" + get_injury_feed(league))
-  sections.append("## FAAB History\n" + get_faab_history(league))
-  sections.append("## Trade Impact Projections\n" + get_trade_projections(league))
-  sections.append("## Weekly AI Write-up\n" + get_weekly_writeup(league))
-  sections.append("## Manager Roasts\n" + get_manager_roasts(league))
-  sections.append("## Luck and Strength of Schedule Index\n" + compute_luck_and_sos(league))
-
-  body = "\n\n".join(sections)
-  subject = f"Fantasy Weekly Report - {today.strftime('%B %d, %Y')}"
-
-  # Send the email
-  send_email(subject, body)
+  with metrics.run("summary", league_id=league_id, season=season):
+    # Create the League instance (shares the on-disk ESPN cache with the other jobs)
+    with metrics.span("league"):
+      league = cached_league(league_id, season, espn_s2=espn_s2, swid=swid)
+    from personalize import load_managers
+    send_summary(league, os.environ.get("RECIPIENT_EMAIL") or "", load_managers())
 
 
 if __name__ == "__main__":